@@ -0,0 +1,117 @@
+"""
+Mede a velocidade do load (linhas/s) em cada configuração, com dados sintéticos.
+
+Para cada tamanho (por padrão 10 mil, 100 mil e 1 milhão de filmes) e cada configuração
+(perfil padrão, perfil de carga em massa, com e sem transações em pedaços), carrega os
+filmes num banco novo (só inserções) e depois carrega de novo com uma fração deles
+alterada (o caso das execuções diárias). Serve para escolher LOAD_BULK,
+LOAD_TRANSACTION_ROWS, LOAD_REBUILD_INDEX_MIN e LOAD_BATCH_SIZE com números.
+
+Uso:
+    python bench_load.py [--tamanhos 10000,100000,1000000] [--alteradas 0.1] [--lote 50000] [--normalizado] [--pasta .]
+
+Rode com --pasta no mesmo disco do banco de verdade: o custo de sincronizar com o disco muda muito de um para outro.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import polars as pl
+from load import MIN_LINHAS_RECRIAR_INDICES, PRAGMAS_CARGA_MASSA, load_data_to_sqlite
+
+# Nome: (pragmas, linhas por transação, mínimo de linhas para recriar os índices)
+CONFIGURACOES = {
+    "padrao": (None, 0, None),
+    "massa": (PRAGMAS_CARGA_MASSA, 0, MIN_LINHAS_RECRIAR_INDICES),
+    "massa+tx100k": (PRAGMAS_CARGA_MASSA, 100_000, MIN_LINHAS_RECRIAR_INDICES),
+    "massa sem recriar": (PRAGMAS_CARGA_MASSA, 0, None),
+}
+
+
+def filmes_sinteticos(quantidade: int) -> pl.DataFrame:
+    """Filmes com o mesmo schema dos dados tratados (listas, datas, textos de tamanho parecido)."""
+    i = pl.int_range(quantidade, dtype=pl.Int64)
+    return pl.select(
+        i.alias("Id"),
+        pl.format("Filme {}", i).alias("Titulo"),
+        pl.format("Movie {}", i).alias("Titulo_Original"),
+        pl.concat_list(pl.format("Diretor {}", i % 50_000)).alias("Diretores"),
+        pl.concat_list(pl.format("Gênero {}", i % 19), pl.format("Gênero {}", (i + 7) % 19)).alias("Generos"),
+        (pl.date(1950, 1, 1) + pl.duration(days=i % 27_000)).alias("Data_Lancamento"),
+        ((i * 7919) % 10_000 / 10).alias("Popularidade"),
+        ((i * 31) % 100 / 10).alias("Media_Votos"),
+        ((i * 97) % 20_000).alias("Numero_Votos"),
+        pl.format("Sinopse do filme {}: " + "uma história longa o bastante para parecer real. " * 4, i).alias("Sinopse"),
+        pl.concat_list(pl.format("Produtora {}", i % 20_000), pl.format("Produtora {}", (i + 3) % 20_000)).alias(
+            "Produtoras"
+        ),
+        (i % 1000 * 100_000).alias("Orcamento"),
+        (i % 1000 * 250_000).alias("Receita"),
+        (80 + i % 100).alias("Duração"),
+        pl.lit("en").alias("Idioma_Original"),
+        pl.lit("Released").alias("Status"),
+        pl.format("/poster{}.jpg", i).alias("poster_path"),
+        pl.format("/backdrop{}.jpg", i).alias("backdrop_path"),
+        pl.concat_list(pl.lit("popular")).alias("Listas"),
+        pl.lit("2026-01-01T00:00:00").alias("Atualizado_Em"),
+    )
+
+
+def alterar(df: pl.DataFrame, fracao: float) -> pl.DataFrame:
+    """Muda popularidade e votos de uma fração dos filmes, como numa execução diária."""
+    passo = max(int(1 / fracao), 1) if fracao > 0 else df.height + 1
+    alterado = pl.col("Id") % passo == 0
+    return df.with_columns(
+        pl.when(alterado).then(pl.col("Popularidade") + 1).otherwise(pl.col("Popularidade")).alias("Popularidade"),
+        pl.when(alterado).then(pl.col("Numero_Votos") + 1).otherwise(pl.col("Numero_Votos")).alias("Numero_Votos"),
+    )
+
+
+def _carregar(df: pl.DataFrame, db_path: str, configuracao: tuple, lote: int, normalizado: bool) -> tuple[float, dict]:
+    """Roda o load (sem as mensagens dele) e devolve os segundos e as contagens."""
+    pragmas, linhas_por_transacao, min_recriar = configuracao
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        contagens = load_data_to_sqlite(
+            df,
+            db_path,
+            "movies",
+            tamanho_lote=lote,
+            normalizado=normalizado,
+            pragmas=pragmas,
+            linhas_por_transacao=linhas_por_transacao,
+            min_linhas_recriar_indices=min_recriar,
+        )
+    return time.perf_counter() - inicio, contagens
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", default="10000,100000,1000000")
+    parser.add_argument("--alteradas", type=float, default=0.1, help="Fração dos filmes alterada na segunda carga")
+    parser.add_argument("--lote", type=int, default=50_000, help="LOAD_BATCH_SIZE")
+    parser.add_argument("--normalizado", action="store_true", help="Grava também o schema normalizado")
+    parser.add_argument("--pasta", default=None, help="Onde criar os bancos de teste (padrão: pasta temporária do sistema)")
+    args = parser.parse_args()
+
+    print(f"{'filmes':>10}  {'configuração':<20}{'inicial (s)':>12}{'linhas/s':>12}{'diária (s)':>12}{'linhas/s':>12}")
+    for tamanho in (int(t) for t in args.tamanhos.split(",")):
+        df = filmes_sinteticos(tamanho)
+        diario = alterar(df, args.alteradas)
+        for nome, configuracao in CONFIGURACOES.items():
+            with tempfile.TemporaryDirectory(dir=args.pasta) as pasta:
+                db_path = os.path.join(pasta, "bench.db")
+                inicial, _ = _carregar(df, db_path, configuracao, args.lote, args.normalizado)
+                segundos, contagens = _carregar(diario, db_path, configuracao, args.lote, args.normalizado)
+            print(
+                f"{tamanho:>10}  {nome:<20}{inicial:>12.2f}{tamanho / inicial:>12,.0f}"
+                f"{segundos:>12.2f}{tamanho / segundos:>12,.0f}  ({contagens['atualizadas']} atualizadas)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
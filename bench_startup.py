@@ -0,0 +1,90 @@
+"""
+Mede o tempo de inicialização da CLI e de cada subcomando e compara com um orçamento.
+
+Para cada subcomando, mede (em processos novos, N vezes, mediana) o tempo de
+importar só o que ele usa, e confere que as dependências pesadas que ele não
+precisa não foram carregadas. Sai com código 1 se algo passar do orçamento.
+
+Uso:
+    python bench_startup.py [--repeticoes 5] [--orcamento-cli-ms 150] [--orcamento-etapa-ms 1500]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+# O que cada subcomando importa de verdade e o que ele NÃO deveria importar
+ETAPAS = {
+    "extract": (["cache", "checkpoint", "extraction", "load"], []),
+    "transform": (["transform", "utils"], ["tmdbsimple", "requests"]),
+    "load": (["load"], ["tmdbsimple", "requests"]),
+    "quality": (["data_quality"], ["tmdbsimple", "requests"]),
+    "search": (["busca"], ["polars", "tmdbsimple", "requests"]),
+}
+
+
+def _medir(codigo: str, repeticoes: int) -> tuple[float, str]:
+    """Roda `codigo` num Python novo `repeticoes` vezes e devolve a mediana (ms) e a última saída."""
+    tempos = []
+    saida = ""
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = subprocess.run(
+            [sys.executable, "-c", codigo], cwd=DIRETORIO, capture_output=True, text=True, check=True
+        )
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        saida = resultado.stdout.strip()
+    return statistics.median(tempos), saida
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--orcamento-cli-ms", type=float, default=150.0)
+    parser.add_argument("--orcamento-etapa-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    falhas = []
+
+    base_ms, _ = _medir("pass", args.repeticoes)
+    cli_ms, carregados = _medir(
+        "import sys, cli; cli.construir_parser(); "
+        "print(','.join(m for m in ('polars', 'tmdbsimple', 'requests') if m in sys.modules))",
+        args.repeticoes,
+    )
+    print(f"{'etapa':<12}{'total (ms)':>12}{'sem o Python (ms)':>20}  pesados carregados")
+    print(f"{'(python)':<12}{base_ms:>12.1f}{0:>20.1f}")
+    print(f"{'cli':<12}{cli_ms:>12.1f}{cli_ms - base_ms:>20.1f}  {carregados or '-'}")
+    if cli_ms - base_ms > args.orcamento_cli_ms:
+        falhas.append(f"cli: {cli_ms - base_ms:.1f} ms > {args.orcamento_cli_ms} ms")
+    if carregados:
+        falhas.append(f"cli: importou {carregados} só para montar o parser")
+
+    for etapa, (modulos, proibidos) in ETAPAS.items():
+        codigo = (
+            f"import sys; import {', '.join(modulos)}; "
+            f"print(','.join(m for m in {proibidos!r} if m in sys.modules))"
+        )
+        etapa_ms, indevidos = _medir(codigo, args.repeticoes)
+        print(f"{etapa:<12}{etapa_ms:>12.1f}{etapa_ms - base_ms:>20.1f}  {indevidos or '-'}")
+        if etapa_ms - base_ms > args.orcamento_etapa_ms:
+            falhas.append(f"{etapa}: {etapa_ms - base_ms:.1f} ms > {args.orcamento_etapa_ms} ms")
+        if indevidos:
+            falhas.append(f"{etapa}: importou {indevidos} sem precisar")
+
+    if falhas:
+        print("\nFora do orçamento:")
+        for falha in falhas:
+            print(f" - {falha}")
+        return 1
+
+    print("\nTudo dentro do orçamento.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
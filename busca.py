@@ -0,0 +1,163 @@
+import re
+import sqlite3
+
+# Busca de texto (FTS5) nos títulos e sinopses da tabela de filmes.
+#
+# O índice é uma tabela virtual FTS5 de conteúdo externo (<tabela>_busca): guarda só o
+# índice invertido e lê o texto da própria tabela de filmes, sem duplicar. Gatilhos na
+# tabela de filmes mantêm o índice em dia a cada inserção, atualização (só quando o texto
+# muda) ou remoção, então o UPSERT do load já sincroniza só os filmes que mudaram.
+# O tokenizador unicode61 com remove_diacritics 2 ignora acentos: "acao" acha "Ação".
+# Este módulo não importa polars: a busca pela CLI abre rápido.
+
+COLUNAS_BUSCA = ("Titulo", "Titulo_Original", "Sinopse")
+
+# Quando uma carga insere pelo menos esta fração da tabela de filmes, é mais rápido tirar os
+# gatilhos e reconstruir o índice inteiro no fim (medido: ~45 µs por filme inserido pelos
+# gatilhos contra ~6 µs por filme da tabela no 'rebuild'). Atualizações que não mexem no
+# texto (popularidade, votos...) quase não custam nada aos gatilhos e não entram na conta.
+FRACAO_RECONSTRUIR_BUSCA = 0.1
+
+# Peso de cada coluna no bm25 (na ordem de COLUNAS_BUSCA): achar no título vale mais que na sinopse
+PESOS_BUSCA = (10.0, 5.0, 1.0)
+
+# Palavras que aparecem em quase toda sinopse: não ajudam a achar nada e obrigariam a
+# ordenar quase a tabela inteira pelo bm25. Saem da consulta (se sobrar alguma outra)
+PALAVRAS_VAZIAS = frozenset(
+    "a o as os um uma uns umas de da do das dos em na no nas nos num numa por pela pelo para "
+    "com sem e é ou que se ao aos à às the of and in on to for with an".split()
+)
+
+
+def tabela_busca(table_name: str) -> str:
+    """Nome da tabela FTS5 de uma tabela de filmes (ex: movies_busca)."""
+    return f"{table_name}_busca"
+
+
+def criar_indice_busca(cursor: sqlite3.Cursor, table_name: str) -> bool:
+    """
+    Cria (se não existirem) a tabela FTS5 e os gatilhos que a mantêm sincronizada com a tabela de filmes.
+    Se a tabela de filmes já tinha filmes, o índice é montado com todos eles.
+
+    Returns:
+        bool: True se o índice acabou de ser criado.
+    """
+    busca = tabela_busca(table_name)
+    existe = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (busca,)).fetchone()
+    colunas = ", ".join(COLUNAS_BUSCA)
+    novos = ", ".join(f"new.{coluna}" for coluna in COLUNAS_BUSCA)
+    antigos = ", ".join(f"old.{coluna}" for coluna in COLUNAS_BUSCA)
+    texto_mudou = " OR ".join(f"old.{coluna} IS NOT new.{coluna}" for coluna in COLUNAS_BUSCA)
+
+    cursor.execute(
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {busca} USING fts5(
+            {colunas}, content='{table_name}', content_rowid='Id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS {busca}_insercao AFTER INSERT ON {table_name} BEGIN
+            INSERT INTO {busca} (rowid, {colunas}) VALUES (new.Id, {novos});
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS {busca}_remocao AFTER DELETE ON {table_name} BEGIN
+            INSERT INTO {busca} ({busca}, rowid, {colunas}) VALUES ('delete', old.Id, {antigos});
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS {busca}_atualizacao AFTER UPDATE OF {colunas} ON {table_name}
+            WHEN {texto_mudou} BEGIN
+            INSERT INTO {busca} ({busca}, rowid, {colunas}) VALUES ('delete', old.Id, {antigos});
+            INSERT INTO {busca} (rowid, {colunas}) VALUES (new.Id, {novos});
+        END"""
+    )
+    if existe is None:
+        # O "rank" da tabela passa a ser o bm25 com os pesos das colunas: ORDER BY rank é ordenado pelo próprio FTS5
+        pesos = ", ".join(str(peso) for peso in PESOS_BUSCA)
+        cursor.execute(f"INSERT INTO {busca} ({busca}, rank) VALUES ('rank', 'bm25({pesos})')")
+        reconstruir_indice_busca(cursor, table_name)
+    return existe is None
+
+
+def remover_gatilhos_busca(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """Tira os gatilhos de sincronização (antes de uma carga grande; veja FRACAO_RECONSTRUIR_BUSCA)."""
+    busca = tabela_busca(table_name)
+    for gatilho in ("insercao", "remocao", "atualizacao"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {busca}_{gatilho}")
+
+
+def reconstruir_indice_busca(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """Monta o índice de novo a partir da tabela de filmes (depois de uma carga sem os gatilhos)."""
+    busca = tabela_busca(table_name)
+    cursor.execute(f"INSERT INTO {busca} ({busca}) VALUES ('rebuild')")
+
+
+def otimizar_indice_busca(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """Junta os segmentos do índice num só (depois de cargas grandes, deixa as buscas mais rápidas)."""
+    busca = tabela_busca(table_name)
+    cursor.execute(f"INSERT INTO {busca} ({busca}) VALUES ('optimize')")
+
+
+def consulta_fts(texto: str, prefixo: bool = True) -> str:
+    """
+    Transforma o texto digitado numa consulta FTS5 segura: cada palavra entre aspas (todas precisam
+    aparecer), sem as PALAVRAS_VAZIAS, e, com `prefixo`, a última vale como começo de palavra
+    ("o poderoso chef" vira '"poderoso" "chef"*', que acha "O Poderoso Chefão").
+    """
+    digitados = re.findall(r"\w+", texto)
+    termos = [termo for termo in digitados if termo.lower() not in PALAVRAS_VAZIAS] or digitados
+    ultima_digitada = prefixo and termos and termos[-1] == digitados[-1]
+    # Prefixo de uma letra só percorreria o índice inteiro (o índice de prefixos é de 2 e 3 letras):
+    # com outras palavras na consulta, a letra solta (palavra ainda sendo digitada) fica de fora.
+    # Um número solto fica, como palavra inteira ("toy story 2")
+    if ultima_digitada and len(termos[-1]) == 1 and termos[-1].isalpha() and len(termos) > 1:
+        termos, ultima_digitada = termos[:-1], False
+    if not termos:
+        return ""
+    consulta = " ".join(f'"{termo}"' for termo in termos)
+    return consulta + "*" if ultima_digitada and len(termos[-1]) > 1 else consulta
+
+
+def buscar(
+    conn: sqlite3.Connection,
+    texto: str,
+    limite: int = 20,
+    table_name: str = "movies",
+    prefixo: bool = True,
+) -> list[dict]:
+    """
+    Busca filmes pelo título, título original e sinopse, do mais para o menos relevante (bm25).
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco dos filmes.
+        texto (str): O que foi digitado (veja consulta_fts; acentos e maiúsculas não importam).
+        limite (int): Máximo de resultados.
+        table_name (str): Nome da tabela de filmes.
+        prefixo (bool): A última palavra vale como começo de palavra.
+
+    Returns:
+        list[dict]: {"Id", "Titulo", "Data_Lancamento", "trecho", "relevancia"} de cada filme achado;
+            "trecho" é o pedaço do texto com os termos entre [colchetes] e "relevancia" é o bm25
+            (quanto menor, mais relevante).
+    """
+    consulta = consulta_fts(texto, prefixo)
+    if not consulta:
+        return []
+    busca = tabela_busca(table_name)
+    # Primeiro os `limite` melhores só no índice (o trecho é montado só para eles), depois os dados do filme
+    cursor = conn.execute(
+        f"""WITH melhores AS (
+                SELECT rowid, snippet({busca}, -1, '[', ']', '…', 12) AS trecho, rank
+                FROM {busca}
+                WHERE {busca} MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            )
+            SELECT m.Id, m.Titulo, m.Data_Lancamento, melhores.trecho, melhores.rank AS relevancia
+            FROM melhores JOIN {table_name} m ON m.Id = melhores.rowid
+            ORDER BY melhores.rank""",
+        (consulta, limite),
+    )
+    colunas = [descricao[0] for descricao in cursor.description]
+    return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
@@ -0,0 +1,114 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class DetailCache:
+    """
+    Cache em disco (SQLite) das respostas de detalhes de filmes do TMDB.
+
+    A chave é o ID do filme + idioma + conjunto de `append_to_response`.
+    Entradas mais velhas que `ttl_segundos` são tratadas como ausentes e,
+    quando o cache passa de `max_entradas`, as menos usadas recentemente
+    (LRU) são removidas. Os contadores `hits` e `misses` ficam disponíveis
+    em `estatisticas()`.
+    """
+
+    def __init__(self, db_path: str = "cache_detalhes.db", ttl_segundos: float = 30 * 24 * 3600, max_entradas: int = 100_000):
+        self.db_path = db_path
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Uma conexão só, protegida pelo lock, para ser usada pelas threads de extração
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS detalhes (
+                chave TEXT PRIMARY KEY,
+                movie_id INTEGER NOT NULL,
+                resposta TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_detalhes_movie_id ON detalhes (movie_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_detalhes_ultimo_acesso ON detalhes (ultimo_acesso)")
+        self._conn.commit()
+        self._entradas = self._conn.execute("SELECT COUNT(*) FROM detalhes").fetchone()[0]
+
+    @staticmethod
+    def montar_chave(movie_id: int, language: str, append_to_response: str) -> str:
+        """Monta a chave do cache. A ordem dos itens do append_to_response não importa."""
+        append = ",".join(sorted(item.strip() for item in append_to_response.split(",") if item.strip()))
+        return f"{movie_id}|{language}|{append}"
+
+    def obter(self, movie_id: int, language: str, append_to_response: str) -> dict | None:
+        """Devolve a resposta guardada, ou None se não existir ou estiver vencida."""
+        registro = self.obter_com_data(movie_id, language, append_to_response)
+        return None if registro is None else registro[0]
+
+    def obter_com_data(self, movie_id: int, language: str, append_to_response: str) -> tuple[dict, float] | None:
+        """Como `obter`, mas junto com o momento (epoch) em que a resposta veio da API."""
+        chave = self.montar_chave(movie_id, language, append_to_response)
+        agora = time.time()
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT resposta, criado_em FROM detalhes WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None or agora - linha[1] > self.ttl_segundos:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE detalhes SET ultimo_acesso = ? WHERE chave = ?", (agora, chave))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(linha[0]), linha[1]
+
+    def salvar(self, movie_id: int, language: str, append_to_response: str, resposta: dict) -> None:
+        """Guarda a resposta da API e faz a remoção LRU se o cache passar do limite."""
+        chave = self.montar_chave(movie_id, language, append_to_response)
+        agora = time.time()
+        with self._lock:
+            existia = self._conn.execute("SELECT 1 FROM detalhes WHERE chave = ?", (chave,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detalhes (chave, movie_id, resposta, criado_em, ultimo_acesso) VALUES (?, ?, ?, ?, ?)",
+                (chave, movie_id, json.dumps(resposta, ensure_ascii=False), agora, agora),
+            )
+            if existia is None:
+                self._entradas += 1
+            if self._entradas > self.max_entradas:
+                # Remove um pouco mais que o excesso (10% do limite) para não ficar apagando a cada escrita
+                remover = self._entradas - int(self.max_entradas * 0.9)
+                self._conn.execute(
+                    "DELETE FROM detalhes WHERE chave IN (SELECT chave FROM detalhes ORDER BY ultimo_acesso LIMIT ?)",
+                    (remover,),
+                )
+                self._entradas -= remover
+            self._conn.commit()
+
+    def invalidar(self, movie_ids) -> int:
+        """Remove do cache todas as entradas dos filmes informados (em qualquer idioma)."""
+        ids = [(int(movie_id),) for movie_id in movie_ids]
+        with self._lock:
+            antes = self._conn.total_changes
+            self._conn.executemany("DELETE FROM detalhes WHERE movie_id = ?", ids)
+            self._conn.commit()
+            removidas = self._conn.total_changes - antes
+            self._entradas -= removidas
+        return removidas
+
+    def estatisticas(self) -> dict:
+        """Contadores de uso do cache nesta execução."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+            "entradas": self._entradas,
+        }
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+
+
+class CheckpointJournal:
+    """
+    Diário de progresso da extração, usado para retomar uma execução interrompida.
+
+    É um arquivo JSON Lines só de acréscimo, com dois tipos de entrada:
+    - "pagina": uma página de uma lista coletada, com os registros básicos dos filmes;
+    - "parte": uma parte Parquet gravada, com os IDs dos filmes que estão nela.
+
+    Cada entrada é gravada com fsync, então o que está no diário sobrevive a
+    uma queda de energia ou a um Ctrl-C logo depois.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.paginas: dict[tuple[str, int], list[dict]] = {}
+        self.partes: list[str] = []
+        self.ids_concluidos: set[int] = set()
+        self._lock = threading.Lock()
+        self._carregar()
+
+    def _carregar(self) -> None:
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                try:
+                    entrada = json.loads(linha)
+                except json.JSONDecodeError:
+                    # Última linha cortada no meio da escrita: o resto é ignorado
+                    break
+                if entrada["tipo"] == "pagina":
+                    # Diários antigos só tinham a lista de populares
+                    self.paginas[(entrada.get("lista", "popular"), entrada["pagina"])] = entrada["filmes"]
+                elif entrada["tipo"] == "parte":
+                    self.partes.append(entrada["arquivo"])
+                    self.ids_concluidos.update(entrada["ids"])
+
+    def _registrar(self, entrada: dict) -> None:
+        with self._lock:
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            with open(self.caminho, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+
+    def registrar_pagina(self, lista: str, pagina: int, filmes: list[dict]) -> None:
+        """Marca uma página de uma lista como coletada."""
+        self._registrar({"tipo": "pagina", "lista": lista, "pagina": pagina, "filmes": filmes})
+        self.paginas[(lista, pagina)] = filmes
+
+    def registrar_parte(self, arquivo: str, ids: list[int]) -> None:
+        """Marca uma parte Parquet (e os filmes dentro dela) como concluída."""
+        self._registrar({"tipo": "parte", "arquivo": arquivo, "ids": ids})
+        self.partes.append(arquivo)
+        self.ids_concluidos.update(ids)
+
+    def limpar(self) -> None:
+        """Apaga o diário, para começar uma extração do zero."""
+        with self._lock:
+            if os.path.exists(self.caminho):
+                os.remove(self.caminho)
+            self.paginas.clear()
+            self.partes.clear()
+            self.ids_concluidos.clear()
@@ -0,0 +1,135 @@
+import argparse
+import sys
+
+# Este módulo precisa abrir rápido: nada de polars/tmdbsimple/requests aqui em cima.
+# Cada subcomando importa só o que usa, dentro da sua função.
+
+
+def _cmd_extract(args) -> int:
+    from instrumentation import execucao
+    from main import carregar_configuracao, extrair
+
+    config = carregar_configuracao(resume=args.resume)
+    with execucao("extract", config["RELATORIO_PATH"]):
+        extraiu = extrair(config, resume=args.resume)
+    if not extraiu:
+        print("Ih, não veio nada da API. Parando por aqui.")
+        return 1
+    return 0
+
+
+def _cmd_transform(args) -> int:
+    from instrumentation import execucao
+    from main import carregar_configuracao, transformar
+
+    config = carregar_configuracao()
+    with execucao("transform", config["RELATORIO_PATH"]):
+        transformar(config)
+    return 0
+
+
+def _cmd_explain(args) -> int:
+    from main import carregar_configuracao, explicar_transformacao
+
+    explicar_transformacao(carregar_configuracao(), perfil=not args.sem_perfil)
+    return 0
+
+
+def _cmd_load(args) -> int:
+    from instrumentation import execucao
+    from main import carregar_configuracao, carregar
+
+    config = carregar_configuracao()
+    with execucao("load", config["RELATORIO_PATH"]):
+        carregar(config)
+    return 0
+
+
+def _cmd_quality(args) -> int:
+    from instrumentation import execucao
+    from main import carregar_configuracao, verificar_qualidade
+
+    config = carregar_configuracao()
+    with execucao("quality", config["RELATORIO_PATH"]):
+        relatorio = verificar_qualidade(config)
+    return 0 if relatorio["aprovado"] else 1
+
+
+def _cmd_search(args) -> int:
+    import sqlite3
+    from busca import buscar
+    from main import carregar_configuracao
+
+    config = carregar_configuracao()
+    conn = sqlite3.connect(config["DB_PATH"])
+    try:
+        resultados = buscar(conn, " ".join(args.texto), limite=args.limite, table_name=config["TABLE_NAME"])
+    finally:
+        conn.close()
+    if not resultados:
+        print("Nenhum filme encontrado.")
+        return 1
+    for filme in resultados:
+        print(f"{filme['Id']:>10}  {filme['Titulo']} ({filme['Data_Lancamento'] or '?'})")
+        print(f"{'':>10}  {filme['trecho']}")
+    return 0
+
+
+def _cmd_run(args) -> int:
+    from main import main
+
+    main(resume=args.resume)
+    return 0
+
+
+def construir_parser() -> argparse.ArgumentParser:
+    """Monta o parser da linha de comando com os subcomandos da pipeline."""
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Pipeline ETL de filmes do TMDB. As configurações vêm do .env (veja main.carregar_configuracao).",
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    extract = subparsers.add_parser("extract", help="Busca os filmes na API e salva os dados brutos.")
+    extract.add_argument("--resume", action="store_true", help="Retoma uma extração interrompida a partir do checkpoint.")
+    extract.set_defaults(func=_cmd_extract)
+
+    transform = subparsers.add_parser("transform", help="Trata os dados brutos e grava o Parquet tratado.")
+    transform.set_defaults(func=_cmd_transform)
+
+    explain = subparsers.add_parser(
+        "explain", help="Mostra o plano otimizado da transformação e o tempo de cada nó (não grava nada)."
+    )
+    explain.add_argument("--sem-perfil", action="store_true", help="Só mostra o plano, sem executar.")
+    explain.set_defaults(func=_cmd_explain)
+
+    load = subparsers.add_parser("load", help="Carrega o Parquet tratado no SQLite.")
+    load.set_defaults(func=_cmd_load)
+
+    quality = subparsers.add_parser("quality", help="Relatório de qualidade dos dados brutos (sai com 1 se reprovar nos limites).")
+    quality.set_defaults(func=_cmd_quality)
+
+    search = subparsers.add_parser("search", help="Busca filmes no banco pelo título ou sinopse (sem acento também).")
+    search.add_argument("texto", nargs="+", help="O que buscar (ex: poderoso chef).")
+    search.add_argument("--limite", type=int, default=20, help="Máximo de resultados.")
+    search.set_defaults(func=_cmd_search)
+
+    run = subparsers.add_parser("run", help="Roda a pipeline inteira (extract, transform e load).")
+    run.add_argument("--resume", action="store_true", help="Retoma uma extração interrompida a partir do checkpoint.")
+    run.set_defaults(func=_cmd_run)
+
+    return parser
+
+
+def executar(argv: list[str] | None = None) -> int:
+    """Ponto de entrada da linha de comando. Devolve o código de saída."""
+    args = construir_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except Exception as e:
+        print(f"Ocorreu um erro feio no meio do caminho: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(executar())
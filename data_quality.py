@@ -1,120 +1,228 @@
-import tmdbsimple as tmdb
-from datetime import datetime
-import polars as pl
-from pathlib import Path
+from datetime import date
+import json
 import os
-from dotenv import load_dotenv
+import polars as pl
+
+# --- Relatório de qualidade dos dados brutos ---
+# Todas as verificações viram uma única agregação (um select só), executada numa
+# única leitura dos dados pelo engine de streaming. O resultado é um relatório
+# estruturado (dicionário/JSON) e, com limites, um veredito que pode barrar o load.
+
+# Limites padrão: taxas máximas (fração das linhas) por "coluna.métrica" e mínimo de linhas
+LIMITES_PADRAO = {
+    "min_linhas": 1,
+    "max_taxa": {
+        "id.nulos": 0.0,
+        "title.nulos": 0.01,
+        "vote_count.negativos": 0.0,
+        "budget.negativos": 0.0,
+        "revenue.negativos": 0.0,
+        "runtime.negativos": 0.0,
+        "vote_average.fora_escala": 0.0,
+        "release_date.formato_invalido": 0.05,
+        # Filmes sem data de atualização são os que falharam na busca de detalhes
+        "details_fetched_at.nulos": 0.2,
+    },
+}
+
+# Quantis guardados das colunas numéricas (pNN), usados também como esboço da distribuição
+QUANTIS = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Ordem das métricas na tabela impressa (os quantis só vão para o JSON)
+ORDEM_METRICAS = (
+    "nulos", "vazios", "zeros", "negativos", "listas_vazias", "distintos_aprox", "min", "max", "media",
+    "desvio_padrao", "formato_invalido", "futuras", "fora_escala", "erros",
+)
+FORMATO_DATA = r"^\d{4}-\d{2}-\d{2}$"
+
+
+class QualidadeReprovada(Exception):
+    """Os dados não passaram nos limites de qualidade (o relatório fica em `relatorio`)."""
+
+    def __init__(self, relatorio: dict):
+        self.relatorio = relatorio
+        reprovadas = [v["verificacao"] for v in relatorio["verificacoes"] if v["passou"] is False]
+        super().__init__(f"Qualidade dos dados reprovada em: {', '.join(reprovadas)}")
+
+
+def carregar_limites(caminho: str | None = None) -> dict:
+    """
+    Devolve os limites de qualidade: os padrões, atualizados pelo arquivo JSON em `caminho`
+    (mesmo formato de LIMITES_PADRAO; as chaves de "max_taxa" do arquivo se somam às padrão).
+    """
+    limites = {"min_linhas": LIMITES_PADRAO["min_linhas"], "max_taxa": dict(LIMITES_PADRAO["max_taxa"])}
+    if caminho:
+        with open(caminho, encoding="utf-8") as arquivo:
+            personalizados = json.load(arquivo)
+        limites["min_linhas"] = personalizados.get("min_linhas", limites["min_linhas"])
+        limites["max_taxa"].update(personalizados.get("max_taxa", {}))
+    return limites
+
+
+def montar_verificacoes(schema: pl.Schema) -> list[pl.Expr]:
+    """
+    Monta todas as métricas de qualidade como expressões de agregação, com nomes "coluna|métrica".
+
+    Para toda coluna: nulos. Texto: vazios. Números: zeros, negativos, mínimo, máximo, média,
+    desvio padrão e os QUANTIS. Listas: listas vazias. Colunas que não são listas: contagem
+    aproximada de valores distintos (HyperLogLog). Além disso: datas fora do formato AAAA-MM-DD e
+    no futuro ('release_date'), avaliações fora da escala 0-10 ('vote_average') e filmes cuja
+    busca de detalhes falhou ('status' começando com "Erro" ou "Falha").
+    """
+    hoje = date.today()
+    expressoes = [pl.len().alias("linhas")]
+    for coluna, tipo in schema.items():
+        c = pl.col(coluna)
+        expressoes.append(c.null_count().alias(f"{coluna}|nulos"))
+        if not isinstance(tipo, (pl.List, pl.Struct)):
+            expressoes.append(c.approx_n_unique().alias(f"{coluna}|distintos_aprox"))
+        if tipo == pl.String:
+            expressoes.append((c == "").sum().alias(f"{coluna}|vazios"))
+        elif tipo.is_numeric():
+            expressoes += [
+                (c == 0).sum().alias(f"{coluna}|zeros"),
+                (c < 0).sum().alias(f"{coluna}|negativos"),
+                c.min().cast(pl.Float64).alias(f"{coluna}|min"),
+                c.max().cast(pl.Float64).alias(f"{coluna}|max"),
+                c.mean().alias(f"{coluna}|media"),
+                c.std().alias(f"{coluna}|desvio_padrao"),
+                *(c.quantile(q, interpolation="linear").alias(f"{coluna}|p{round(q * 100):02d}") for q in QUANTIS),
+            ]
+        elif isinstance(tipo, pl.List):
+            expressoes.append((c.list.len() == 0).sum().alias(f"{coluna}|listas_vazias"))
+
+    if schema.get("release_date") == pl.String:
+        data = pl.col("release_date")
+        expressoes += [
+            (~data.str.contains(FORMATO_DATA) & (data != "")).sum().alias("release_date|formato_invalido"),
+            (data.str.to_date("%Y-%m-%d", strict=False) > hoje).sum().alias("release_date|futuras"),
+        ]
+    if "vote_average" in schema:
+        nota = pl.col("vote_average")
+        expressoes.append(((nota < 0) | (nota > 10)).sum().alias("vote_average|fora_escala"))
+    if schema.get("status") == pl.String:
+        status = pl.col("status")
+        expressoes.append((status.str.starts_with("Erro") | status.str.starts_with("Falha")).sum().alias("status|erros"))
+    return expressoes
+
+
+def avaliar_limites(relatorio: dict, limites: dict) -> list[dict]:
+    """Compara as métricas do relatório com os limites. Verificações de colunas ausentes ficam com passou=None."""
+    linhas = relatorio["linhas"]
+    verificacoes = [{
+        "verificacao": "min_linhas",
+        "valor": linhas,
+        "limite": limites["min_linhas"],
+        "passou": linhas >= limites["min_linhas"],
+    }]
+    for chave, taxa_maxima in limites["max_taxa"].items():
+        coluna, metrica = chave.split(".", 1)
+        quantidade = relatorio["colunas"].get(coluna, {}).get(metrica)
+        if quantidade is None:
+            verificacoes.append({"verificacao": chave, "valor": None, "limite": taxa_maxima, "passou": None})
+            continue
+        taxa = quantidade / linhas if linhas else 0.0
+        verificacoes.append({
+            "verificacao": chave,
+            "valor": round(taxa, 6),
+            "quantidade": quantidade,
+            "limite": taxa_maxima,
+            "passou": taxa <= taxa_maxima,
+        })
+    return verificacoes
+
+
+def relatorio_qualidade(df: pl.DataFrame | pl.LazyFrame, limites: dict | None = None) -> dict:
+    """
+    Calcula todas as métricas de qualidade numa única leitura dos dados e avalia os limites.
+
+    Args:
+        df (pl.DataFrame | pl.LazyFrame): Os dados brutos.
+        limites (dict | None): Limites no formato de LIMITES_PADRAO (padrão: LIMITES_PADRAO).
+
+    Returns:
+        dict: {"linhas", "colunas": {coluna: {métrica: valor}}, "verificacoes": [...], "aprovado"}.
+    """
+    lf = df if isinstance(df, pl.LazyFrame) else df.lazy()
+    metricas = lf.select(montar_verificacoes(lf.collect_schema())).collect(engine="streaming").row(0, named=True)
+
+    relatorio = {"linhas": metricas.pop("linhas"), "colunas": {}}
+    for nome, valor in metricas.items():
+        coluna, metrica = nome.split("|", 1)
+        relatorio["colunas"].setdefault(coluna, {})[metrica] = valor
+
+    relatorio["verificacoes"] = avaliar_limites(relatorio, limites or LIMITES_PADRAO)
+    relatorio["aprovado"] = all(v["passou"] is not False for v in relatorio["verificacoes"])
+    return relatorio
+
+
+def imprimir_relatorio_qualidade(relatorio: dict) -> None:
+    """Mostra o relatório de qualidade de forma legível: uma tabela por coluna e as verificações."""
+    print(f"ANALISE DE QUALIDADE DE DADOS ({relatorio['linhas']} linhas)")
+    presentes = {metrica for valores in relatorio["colunas"].values() for metrica in valores}
+    metricas = [metrica for metrica in ORDEM_METRICAS if metrica in presentes]
+    tabela = pl.DataFrame(
+        [{"coluna": coluna, **valores} for coluna, valores in relatorio["colunas"].items()],
+        schema_overrides={metrica: pl.Float64 for metrica in metricas},
+    ).select("coluna", *metricas)
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, tbl_width_chars=200, float_precision=2):
+        print(tabela)
+
+    print("\nVERIFICAÇÕES:")
+    for v in relatorio["verificacoes"]:
+        situacao = {True: "ok", False: "REPROVADA", None: "ignorada (coluna ausente)"}[v["passou"]]
+        print(f" - {v['verificacao']}: {v['valor']} (limite {v['limite']}) -> {situacao}")
+    print("APROVADO" if relatorio["aprovado"] else "REPROVADO")
+
+
+def salvar_relatorio_qualidade(relatorio: dict, caminho: str) -> None:
+    """Grava o relatório de qualidade em JSON."""
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2, default=str)
 
-load_dotenv() #carregar as variaveis .env
 
 #Verificação da qualidades dos dados
-def verificar_qualidades_dados_lazy(df):
+def verificar_qualidades_dados_lazy(df, limites: dict | None = None):
+    """
+    Roda a análise de qualidade (veja relatorio_qualidade) e mostra o resultado.
+    Mantida para quem já usava: devolve o LazyFrame de entrada, como antes.
+    """
     if not isinstance(df, pl.LazyFrame):
         lf = df.lazy()
     else:
         lf = df
 
-    print("ANALISE DE QUALIDADE DE DADOS")
-
-    schema = lf.collect(streaming=True).schema #type: ignore
-    colunas = list(schema.keys())
-
-    resultados = {}
-    #1 Contagem de valores nulos por coluna
-    null_counts = lf.select([
-        pl.col(col).null_count().alias(f"{col}_null")
-        for col in lf.collect_schema().names()
-    ]).collect()
-    print(null_counts)
-    print("\n")
-
-    #2 Contagem de strings vazias em colunas de texto
-    string_cols = [col for col, 
-                   dtype in schema.items() 
-                   if dtype == pl.Utf8]
-    if string_cols:
-        print("String Vazias por Coluna:")
-        string_vazia = lf.select([
-            pl.col(col).filter(pl.col(col) == "").count().alias(f"{col}_vazio")
-            for col in string_cols
-        ]).collect()
-        print(string_vazia)
-        print("\n")
-    
-    #3 Contagem de zeros em colunas numéricas
-    num_cols = [col for col,
-                dtype in schema.items()
-                if dtype in [pl.Int64, pl.Float64]]
-    if num_cols:
-        print("VALORES ZERO POR COLUNA NUMERICA")
-        zeros = lf.select([
-            pl.col(col).filter(pl.col(col) == 0).count().alias(f"{col}_zero")
-            for col in num_cols
-        ]).collect()
-        print(zeros)
-
-    #4 Listas vazias em colunas de lista
-    list_cols = [col for col,
-                 dtype in schema.items()
-                 if str(dtype).startswith('List')]
-    if list_cols:
-        print("LISTAS VAZIAS POR COLUNA:")
-        list_vazias = lf.select([
-            pl.col(col).filter(pl.col(col).list.len() == 0).count().alias(f"{col}_list_vazias")
-            for col in list_cols
-        ]).collect()
-        print(list_vazias)
-        print("\n")
-
-    
-    #5 Estastísticas resumidas para colunas numéricas
-    if num_cols:
-        print("ESTATÍSTICAS RESUMIDAS PARA COLUNAS NUMÉRICAS")
-        stats = lf.select(num_cols).collect().describe()
-        print(stats)
-        print("\n")
-
-    #6 Verificar datas inválidas ou futuras
-    if 'release_date' in lf.collect_schema().names():
-        print("ANÁLISE DE DATAS DE LANÇAMENTOS")
-
-        #Contar datas em formato inválido
-        data_invalida = lf.filter(
-            ~pl.col('release_date').str.contains(r'^\d{4}-\d{2}-\d{2}$') &
-            (pl.col('release_date') != "")
-        ).select(pl.count()).collect().item()
-        print(f"Datas em formato inválido: {data_invalida}")
-
-    #Adicionar verificação para datas futuras
-
-
-    #7 Verificar valores negativos onde não faz sentido
-    neg_cols = ['vote_count', 'budget', 'revenue', 'runtime']
-    neg_cols_presentes = [col for col in neg_cols
-                          if col in lf.collect_schema().names()]
-    if neg_cols_presentes:
-        print("VALORES NEGATIVOS EM COLUNAS QUE DEVERIAM SER POSITIVAS:")
-        negativos = lf.select([
-            pl.col(col).filter(pl.col(col) < 0).count().alias(f"{col}_negativo")
-            for col in neg_cols_presentes
-        ]).collect()
-        print(negativos)
-        print("\n")
-
-
-    #8 Verificar valores de avaliação fora da escala esperada
-    if 'vote_average' in lf.collect_schema().names():
-        print("VALORES DE AVALIAÇÃO FORA DA ESCALA (0-10):")
-        fora_escala = lf.filter(
-            (pl.col('vote_average') < 0) | (pl.col('vote_average') > 10)
-        ).select(pl.count()).collect().item()
-        print(f"Avaliações fora da escala 0-10: {fora_escala}")
-        print("\n")
-
-    print("FIM DA VERIFICACAO")    
+    imprimir_relatorio_qualidade(relatorio_qualidade(lf, limites))
+    print("FIM DA VERIFICACAO")
     return lf
 
-import polars as pl
+
+# Cada tratamento tem duas formas:
+# - expressoes_*: devolve {coluna: expressão} e é o que o plano fundido de transform.py junta
+#   numa única projeção;
+# - tratar_*: aplica as mesmas expressões num LazyFrame, para usar uma etapa isolada.
+#
+# As expressões são todas linha a linha (nada de sort, unique, over ou joins), para que o plano
+# inteiro rode no engine de streaming do Polars (TRANSFORM_STREAMING). Um tratamento novo que
+# precise olhar outras linhas deve ficar fora do plano, numa etapa própria (veja encoding.py).
+
+
+def texto_ou_padrao(expr: pl.Expr, padrao: str | None) -> pl.Expr:
+    """
+    Converte para string e tira os espaços das pontas; vazio ou nulo vira `padrao`.
+    Faz numa expressão só o que antes era strip + replace("", None) + fill_null.
+    """
+    limpo = expr.cast(pl.String, strict=False).str.strip_chars()
+    return pl.when(limpo.str.len_bytes() > 0).then(limpo).otherwise(pl.lit(padrao, dtype=pl.String))
+
+
+def expressoes_titulos() -> dict[str, pl.Expr]:
+    """Expressão da coluna 'title': limpa, vazios viram nulo e o resto fica em caixa de título."""
+    return {"title": texto_ou_padrao(pl.col("title"), None).str.to_titlecase()}
+
 
 def tratar_titulos(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
@@ -131,40 +239,27 @@ def tratar_titulos(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
         lf = df.lazy()
     else:
         lf = df
-    # 1. Limpeza e Padronização da coluna 'title'
-    # Garante que 'title' é uma string, remove espaços em branco de início/fim,
-    # padroniza strings vazias ("") para nulos.
-    lf = lf.with_columns([
-        pl.col('title')
-        .cast(pl.Utf8, strict=False)  # Converte para string, falhas resultam em nulos
-        .str.strip_chars()            # Remove espaços em branco do início e fim
-        .replace("", None)            # Converte strings vazias para nulos
-        .alias("title")
-    ])
-
-    # 2. Remoção de valores nulos
+    # Limpa, padroniza vazios para nulo e capitaliza a primeira letra de cada palavra
+    lf = lf.with_columns(**expressoes_titulos())
+
     # Linhas onde 'title' é nulo são descartadas.
     lf = lf.filter(
         pl.col("title").is_not_null()
     )
 
-    # 3. Conversão para caixa padrão (Título)
-    # A primeira letra de cada palavra em 'title' é capitalizada.
-    lf = lf.with_columns([
-        pl.col("title").str.to_titlecase().alias("title")
-    ])
-
     return lf
 
-# Requisição para obter o mapeamento de IDS de gêneros para nomes
-def mapeamento_genero(api_key: str):
-    tmdb.API_KEY = api_key
-    genre = tmdb.Genres()
-    response = genre.movie_list()
-
-    id_nome = {g["id"]: g["name"] for g in response["genres"]}
+def expressoes_generos(genero_mapa: dict) -> dict[str, pl.Expr]:
+    """Expressão da coluna 'genero': a lista de IDs de 'genre_ids' vira a lista de nomes (IDs sem nome viram texto)."""
+    return {
+        "genero": pl.col("genre_ids")
+        .cast(pl.List(pl.Int64), strict=False)
+        .fill_null([])
+        .list.eval(
+            pl.element().replace_strict(genero_mapa, default=pl.element().cast(pl.String), return_dtype=pl.String)
+        )
+    }
 
-    return id_nome
 
 def tratar_generos(df: pl.DataFrame | pl.LazyFrame, genero_mapa: dict) -> pl.LazyFrame:
     """
@@ -181,28 +276,18 @@ def tratar_generos(df: pl.DataFrame | pl.LazyFrame, genero_mapa: dict) -> pl.Laz
         lf = df.lazy()
     else:
         lf = df
-    
-    lf = lf.with_columns([
-        pl.col("genre_ids")
-        .cast(pl.List(pl.Int64), strict=False) 
-        .fill_null(pl.lit([]).cast(pl.List(pl.Int64))) 
-        .alias("genre_ids_cleaned") 
-    ])
-
-    # Mapeia cada id da lista para seu respectivo nome
-    lf = lf.with_columns([
-        pl.col("genre_ids_cleaned")
-        .list.eval(pl.element().replace(genero_mapa, default=pl.element())) # Aplica o mapeamento para cada elemento da lista
-        .alias("genero")
-    ])
-
-
-    # Remover a coluna 'genre_id' original e o 'genre_ids_cleaned'
+
+    # Mapeia cada id da lista para seu respectivo nome e remove a coluna 'genre_ids' original
+    lf = lf.with_columns(**expressoes_generos(genero_mapa))
     lf = lf.drop("genre_ids")
-    lf = lf.drop("genre_ids_cleaned")
     return lf
 
 
+def expressoes_datas() -> dict[str, pl.Expr]:
+    """Expressão da coluna 'release_date': texto AAAA-MM-DD vira Date; o que não converte vira nulo."""
+    return {"release_date": pl.col("release_date").str.to_date(format="%Y-%m-%d", strict=False)}
+
+
 def tratar_datas(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata a coluna 'release_date', convertendo-a para o tipo Date do Polars.
@@ -221,22 +306,17 @@ def tratar_datas(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
 
     print(" - Iniciando tratamento da coluna 'release_date'.")
 
-    lf = lf.with_columns([
-        # Converte a coluna 'release_date' para o tipo Date
-        # Se a string não pode ser convertida, o valor sera nulo
-        pl.col("release_date")
-        .str.to_date(format="%Y-%m-%d", strict=False)
-        #.dt.strftime("%d-%m-%Y")
-        .alias("release_date")
-    ])
-
-    #lf = lf.filter(pl.col("release_date").is_not_null())
-    #print(" - Removidas linhas com 'release_date' inválida ou nula.")
+    lf = lf.with_columns(**expressoes_datas())
 
     print(" - Coluna 'release_date' tratada e convertida para o tipo Date.")
     return lf
 
 
+def expressoes_popularidade() -> dict[str, pl.Expr]:
+    """Expressão da coluna 'popularity': Float64, nulos viram 0.0, arredondada em 2 casas."""
+    return {"popularity": pl.col("popularity").cast(pl.Float64, strict=False).fill_null(0.0).round(2)}
+
+
 def tratar_popularidade(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata a coluna 'popularity', garantindo que é um Float64,
@@ -255,17 +335,19 @@ def tratar_popularidade(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
 
     print(" - Iniciando tratamento da coluna 'popularity'.")
 
-    lf = lf.with_columns([
-        pl.col("popularity")
-        .cast(pl.Float64, strict=False) # Garante que é Float64; se não for, vira nulo
-        .fill_null(0.0)                 # Preenche valores nulos com 0.0 (ou outro valor padrão)
-        .round(2)                       # Arredonda para 2 casas decimais
-        .alias("popularity")
-    ])
+    lf = lf.with_columns(**expressoes_popularidade())
 
     print(" - Coluna 'popularity' tratada.")
     return lf
 
+def expressoes_avaliacoes() -> dict[str, pl.Expr]:
+    """Expressões de 'vote_average' (Float64 entre 0 e 10) e 'vote_count' (Int64 não negativo); nulos viram 0."""
+    return {
+        "vote_average": pl.col("vote_average").cast(pl.Float64, strict=False).fill_null(0.0).clip(0.0, 10.0),
+        "vote_count": pl.col("vote_count").cast(pl.Int64, strict=False).fill_null(0).clip(lower_bound=0),
+    }
+
+
 def tratar_avaliacoes(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata as colunas 'vote_average' (Float64) e 'vote_count' (Int64),
@@ -285,25 +367,16 @@ def tratar_avaliacoes(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
 
     print(" - Iniciando tratamento das colunas 'vote_average' e 'vote_count'.")
 
-    lf = lf.with_columns([
-        # --- Tratamento de 'vote_average' ---
-        pl.col("vote_average")
-        .cast(pl.Float64, strict=False) # Garante Float64; falhas viram nulas
-        .fill_null(0.0)                 # Preenche nulos com 0.0 (filmes sem voto/média)
-        .clip(0.0, 10.0)                # Garante que a média fique entre 0 e 10
-        .alias("vote_average"),
-    
-        # --- Tratamento de 'vote_count' ---
-        pl.col("vote_count")
-        .cast(pl.Int64, strict=False)
-        .fill_null(0)
-        .clip(lower_bound=0)
-        .alias("vote_count")
-    ])
+    lf = lf.with_columns(**expressoes_avaliacoes())
 
     print(" - Colunas 'vote_average' e 'vote_count' tratadas.")
     return lf
 
+def expressoes_overview() -> dict[str, pl.Expr]:
+    """Expressão da coluna 'overview': limpa, vazios e nulos viram "Sem sinopse"."""
+    return {"overview": texto_ou_padrao(pl.col("overview"), "Sem sinopse")}
+
+
 def tratar_overview(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata a coluna 'overview', garantindo que é uma String,
@@ -322,18 +395,21 @@ def tratar_overview(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
 
     print(" - Iniciando tratamento da coluna 'overview'.")
 
-    lf = lf.with_columns([
-        pl.col("overview")
-        .cast(pl.String, strict=False)
-        .str.strip_chars()
-        .replace("",None)
-        .fill_null("Sem sinopse")
-        .alias("overview")
-    ])
+    lf = lf.with_columns(**expressoes_overview())
 
     print(" Coluna 'overview' tratada")
     return lf
 
+def _inteiro_nao_negativo(coluna: str) -> pl.Expr:
+    # Zero já é o valor de "ausente", então não precisa do replace(0, None) + fill_null(0) de antes
+    return pl.col(coluna).cast(pl.Int64, strict=False).fill_null(0).clip(lower_bound=0)
+
+
+def expressoes_financas() -> dict[str, pl.Expr]:
+    """Expressões de 'budget' e 'revenue': Int64 não negativo, nulos viram 0."""
+    return {"budget": _inteiro_nao_negativo("budget"), "revenue": _inteiro_nao_negativo("revenue")}
+
+
 def tratar_financas(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata as colunas 'budget' e 'revenue', garantindo a tipagem Int64,
@@ -352,24 +428,16 @@ def tratar_financas(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
 
     print(" - Iniciando tratamento das colunas 'budget' e 'revenue'.")
 
-    lf = lf.with_columns([
-        pl.col("budget")
-        .cast(pl.Int64, strict=False)
-        .replace(0, None)
-        .fill_null(0)  # Use 0 instead of "Valor ausente"
-        .clip(lower_bound=0)
-        .alias("budget"),
-        pl.col("revenue")
-        .cast(pl.Int64, strict=False)
-        .replace(0, None)
-        .fill_null(0)  # Use 0 instead of "Valor ausente"
-        .clip(lower_bound=0)
-        .alias("revenue")
-    ])
+    lf = lf.with_columns(**expressoes_financas())
 
     print(" - Colunas 'budget' e 'revenue' tratadas.")
     return lf
 
+def expressoes_duracao_em_minutos() -> dict[str, pl.Expr]:
+    """Expressão da coluna 'runtime': Int64 não negativo, nulos viram 0."""
+    return {"runtime": _inteiro_nao_negativo("runtime")}
+
+
 def tratar_duracao_em_minutos(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata a coluna 'runtime' (duração do filme), garantindo a tipagem Int64,
@@ -388,17 +456,18 @@ def tratar_duracao_em_minutos(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
 
     print(" - Iniciando tratamento da coluna 'runtime'.")
 
-    lf = lf.with_columns([
-        pl.col("runtime")
-        .cast(pl.Int64, strict=False)
-        .replace(0, None)
-        .fill_null(0)  # Use 0 instead of "Valor Ausente"
-        .clip(lower_bound=0)
-        .alias("runtime")
-    ])
+    lf = lf.with_columns(**expressoes_duracao_em_minutos())
     print(" Coluna 'runtime' tratada")
     return lf
 
+def expressoes_linguagem_e_titulo_originais() -> dict[str, pl.Expr]:
+    """Expressões de 'original_title' e 'original_language': limpas, vazios e nulos viram um valor padrão."""
+    return {
+        "original_title": texto_ou_padrao(pl.col("original_title"), "Titulo Original Ausente"),
+        "original_language": texto_ou_padrao(pl.col("original_language"), "Indeterminado"),
+    }
+
+
 def tratar_linguagem_e_titulo_originais(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata as colunas 'original_title' e 'original_language',
@@ -417,27 +486,21 @@ def tratar_linguagem_e_titulo_originais(df: pl.DataFrame | pl.LazyFrame) -> pl.L
 
     print(" - Iniciando tratamento das colunas 'original_title' e 'original_language'.")
 
-    lf = lf.with_columns([
-        # --- Tratamento de 'original_title ---
-        pl.col("original_title")
-        .cast(pl.String, strict=False)
-        .str.strip_chars()
-        .replace("",None)
-        .fill_null("Titulo Original Ausente")
-        .alias("original_title"),
-
-        # --- Tratamento de 'original_language ---
-        pl.col("original_language")
-        .cast(pl.String, strict=False)
-        .str.strip_chars()
-        .replace("",None)
-        .fill_null("Indeterminado")
-        .alias("original_language")
-    ])
+    lf = lf.with_columns(**expressoes_linguagem_e_titulo_originais())
 
     print(" - Colunas 'original_title' e 'original_language' tratadas.")
     return lf
 
+def expressoes_empresas_produtoras() -> dict[str, pl.Expr]:
+    """Expressão de 'production_companies': lista de strings limpas; nomes vazios viram "Empresa Desconhecida"."""
+    return {
+        "production_companies": pl.col("production_companies")
+        .cast(pl.List(pl.String), strict=False)
+        .fill_null([])
+        .list.eval(pl.element().str.strip_chars().replace("", "Empresa Desconhecida")) # Troca só nomes vazios
+    }
+
+
 def tratar_empresas_produtoras(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata a coluna 'production_companies' (List(String)),
@@ -456,19 +519,16 @@ def tratar_empresas_produtoras(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
         lf = df
 
     print(" - Iniciando tratamento da coluna 'production_companies'.")
-    
-    lf = lf.with_columns([
-        pl.col("production_companies")
-        .cast(pl.List(pl.String), strict=False)
-        .fill_null([])
-        .list.eval(
-            pl.element().str.strip_chars().str.replace("", "Empresa Desconhecida") 
-        )
-        .alias("production_companies")                                                                                                                               
-    ])
+
+    lf = lf.with_columns(**expressoes_empresas_produtoras())
     print(" - Coluna 'production_companies' tratada.")
     return lf
 
+def expressoes_status_do_filme() -> dict[str, pl.Expr]:
+    """Expressão da coluna 'status': limpa, vazios e nulos viram "Desconhecido", em caixa de título."""
+    return {"status": texto_ou_padrao(pl.col("status"), "Desconhecido").str.to_titlecase()}
+
+
 def tratar_status_do_filme(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
     Trata a coluna 'status' (String), garantindo a tipagem,
@@ -487,20 +547,20 @@ def tratar_status_do_filme(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
 
     print(" - Iniciando tratamento da coluna 'status'.")
 
-    lf = lf.with_columns([
-        pl.col("status")
-        .cast(pl.String, strict=False)    # Garante que é string; falhas viram nulo
-        .str.strip_chars()                # Remove espaços em branco do início e fim
-        .replace("", None)                # Converte strings vazias ("") para nulos
-        .fill_null("Desconhecido")        # Preenche nulos (e agora vazios) com um valor padrão
-        .str.to_titlecase()               # Opcional: Converte para Title Case (Ex: "released" -> "Released")
-        .alias("status")
-    ])
+    lf = lf.with_columns(**expressoes_status_do_filme())
 
     print(" - Coluna 'status' tratada.")
     return lf
 
-import polars as pl
+def expressoes_diretores() -> dict[str, pl.Expr]:
+    """Expressão de 'director': lista de nomes limpos; nomes vazios ou nulos viram "Diretor Desconhecido"."""
+    return {
+        "director": pl.col("director")
+        .cast(pl.List(pl.String), strict=False)
+        .fill_null([])
+        .list.eval(texto_ou_padrao(pl.element(), "Diretor Desconhecido"))
+    }
+
 
 def tratar_diretores(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
     """
@@ -520,17 +580,7 @@ def tratar_diretores(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
 
     print(" - Iniciando tratamento da coluna 'director'.")
 
-    lf = lf.with_columns([
-        pl.col("director")
-        .cast(pl.List(pl.String), strict=False)  # Garante que é List(String); falhas viram nulo
-        .fill_null([])                          # Preenche nulos (coluna inteira) com lista vazia
-        .list.eval(                               # Itera sobre cada elemento (nome do diretor) na lista
-            pl.element().str.strip_chars()      # Remove espaços em branco do início/fim de cada nome
-            .replace("", None)                  # Converte strings vazias para nulos
-            .fill_null("Diretor Desconhecido")  # Preenche nulos (nomes vazios) com um valor padrão
-        )
-        .alias("director")
-    ])
+    lf = lf.with_columns(**expressoes_diretores())
 
     print(" - Coluna 'director' tratada.")
     return lf
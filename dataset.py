@@ -0,0 +1,153 @@
+import os
+import shutil
+from urllib.parse import quote, unquote
+import polars as pl
+
+# Saída particionada (estilo Hive) dos dados tratados: diretorio/ano=2010/[idioma=en/]part-0.parquet
+#
+# Cada partição é um arquivo, ordenado por data de lançamento e com estatísticas por
+# grupo de linhas: filtros por ano (e idioma) pulam partições inteiras e filtros por data
+# pulam grupos dentro delas. As colunas da partição ("ano", "idioma") ficam só no caminho;
+# os arquivos continuam com todas as colunas dos dados tratados.
+#
+# Uma execução só reescreve as partições que ela toca: as que têm filmes novos e as que
+# tinham uma versão antiga de algum deles (ex: filme que mudou de data de lançamento).
+# Os filmes já gravados nelas são mantidos, e os que vieram de novo trocados pela versão nova.
+
+NOME_ARQUIVO = "part-0.parquet"
+PARTICAO_NULA = "__HIVE_DEFAULT_PARTITION__"
+
+
+def expressoes_particao(por_idioma: bool = False) -> dict[str, pl.Expr]:
+    """As colunas da partição: o ano de 'Data_Lancamento' e, com `por_idioma`, o 'Idioma_Original'."""
+    chaves = {"ano": pl.col("Data_Lancamento").dt.year()}
+    if por_idioma:
+        chaves["idioma"] = pl.col("Idioma_Original").cast(pl.String)
+    return chaves
+
+
+def caminho_particao(diretorio: str, valores: dict) -> str:
+    """Pasta de uma partição (ex: dataset/ano=2010/idioma=en). Valores nulos viram PARTICAO_NULA."""
+    partes = [
+        f"{coluna}={PARTICAO_NULA if valor is None else quote(str(valor), safe='')}" for coluna, valor in valores.items()
+    ]
+    return os.path.join(diretorio, *partes)
+
+
+def valores_particao(diretorio: str, pasta: str) -> dict:
+    """O contrário de caminho_particao: {coluna: valor (texto ou None)} a partir da pasta da partição."""
+    valores = {}
+    for parte in os.path.relpath(pasta, diretorio).split(os.sep):
+        coluna, valor = parte.split("=", 1)
+        valores[coluna] = None if valor == PARTICAO_NULA else unquote(valor)
+    return valores
+
+
+def listar_particoes(diretorio: str) -> list[str]:
+    """Os arquivos de todas as partições do dataset, em ordem."""
+    arquivos = []
+    for raiz, _, nomes in os.walk(diretorio):
+        if NOME_ARQUIVO in nomes:
+            arquivos.append(os.path.join(raiz, NOME_ARQUIVO))
+    return sorted(arquivos)
+
+
+def ler_dataset(diretorio: str) -> pl.LazyFrame:
+    """Abre (lazy) o dataset particionado, com as colunas da partição ("ano" e, se houver, "idioma")."""
+    return pl.scan_parquet(os.path.join(diretorio, "**", NOME_ARQUIVO), hive_partitioning=True)
+
+
+def _arquivos_por_particao(diretorio: str) -> dict[str, str]:
+    """{pasta da partição relativa ao diretório: arquivo Parquet dela}."""
+    arquivos = {}
+    for raiz, _, nomes in os.walk(diretorio):
+        for nome in nomes:
+            if nome.endswith(".parquet"):
+                arquivos[os.path.relpath(raiz, diretorio)] = os.path.join(raiz, nome)
+    return arquivos
+
+
+def gravar_particionado(
+    origem: str,
+    diretorio: str,
+    por_idioma: bool = False,
+    row_group_size: int = 64_000,
+    compressao: str = "zstd",
+    nivel_compressao: int | None = None,
+) -> dict:
+    """
+    Atualiza o dataset particionado com os dados tratados de uma execução.
+
+    Os dados novos são separados por partição numa única passada em streaming (numa pasta
+    temporária dentro do dataset). Depois, só as partições tocadas (veja o comentário do
+    módulo) são trocadas, uma de cada vez e de forma atômica (os.replace): as que não
+    existiam recebem o arquivo novo direto, as outras são mescladas com o que já havia.
+
+    Args:
+        origem (str): Parquet com os dados tratados da execução (TRANSFORMED_PARQUET).
+        diretorio (str): Pasta raiz do dataset.
+        por_idioma (bool): Particiona também por 'Idioma_Original' (ano=.../idioma=...).
+        row_group_size (int): Linhas por grupo de linhas (cada grupo tem suas estatísticas).
+        compressao (str): Compressão do Parquet (ex: "zstd", "snappy", "lz4").
+        nivel_compressao (int | None): Nível da compressão (None = padrão do Polars).
+
+    Returns:
+        dict: {"reescritas": partições gravadas, "removidas": partições que ficaram vazias, "total": partições no dataset}.
+    """
+    chaves = expressoes_particao(por_idioma)
+    opcoes = dict(
+        compression=compressao, compression_level=nivel_compressao, statistics=True, row_group_size=row_group_size
+    )
+    existentes = listar_particoes(diretorio)
+    for arquivo in existentes:
+        colunas = list(valores_particao(diretorio, os.path.dirname(arquivo)))
+        if colunas != list(chaves):
+            raise ValueError(
+                f"O dataset em '{diretorio}' foi particionado por {colunas}, não por {list(chaves)}. "
+                "Use outra pasta ou apague a antiga."
+            )
+
+    temporario = os.path.join(diretorio, "_novos")
+    shutil.rmtree(temporario, ignore_errors=True)
+    novos = pl.scan_parquet(origem)
+    novos.sink_parquet(
+        pl.PartitionByKey(temporario, by=chaves, include_key=False, per_partition_sort_by=["Data_Lancamento", "Id"]),
+        mkdir=True,
+        **opcoes,
+    )
+    novas = _arquivos_por_particao(temporario)
+
+    # Partições antigas com uma versão anterior de algum filme que veio agora
+    ids_novos = novos.select("Id").collect()["Id"].implode()
+    tocadas = set(novas)
+    if existentes:
+        antigas = pl.scan_parquet(existentes, hive_partitioning=True).filter(pl.col("Id").is_in(ids_novos))
+        for valores in antigas.select(*chaves).unique().collect().iter_rows(named=True):
+            tocadas.add(os.path.relpath(caminho_particao(diretorio, valores), diretorio))
+
+    reescritas = removidas = 0
+    for relativa in sorted(tocadas):
+        pasta = os.path.join(diretorio, relativa)
+        arquivo = os.path.join(pasta, NOME_ARQUIVO)
+        nova = novas.get(relativa)
+        if not os.path.exists(arquivo):
+            os.makedirs(pasta, exist_ok=True)
+            os.replace(nova, arquivo)
+            reescritas += 1
+            continue
+
+        partes = [pl.scan_parquet(arquivo).filter(~pl.col("Id").is_in(ids_novos))]
+        if nova is not None:
+            partes.append(pl.scan_parquet(nova))
+        with pl.StringCache():
+            particao = pl.concat(partes, how="diagonal_relaxed").sort("Data_Lancamento", "Id").collect()
+        if particao.is_empty():
+            shutil.rmtree(pasta)
+            removidas += 1
+            continue
+        particao.write_parquet(arquivo + ".tmp", **opcoes)
+        os.replace(arquivo + ".tmp", arquivo)
+        reescritas += 1
+
+    shutil.rmtree(temporario, ignore_errors=True)
+    return {"reescritas": reescritas, "removidas": removidas, "total": len(listar_particoes(diretorio))}
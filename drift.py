@@ -0,0 +1,184 @@
+import datetime
+import math
+import sqlite3
+
+# Acompanhamento de drift entre execuções.
+#
+# Cada execução guarda um esboço compacto dos dados brutos, tirado do relatório de
+# qualidade (data_quality.relatorio_qualidade): taxas de nulos/zeros/vazios/erros,
+# quantis, média e contagem aproximada de distintos por coluna. O drift é calculado
+# só a partir desses esboços, sem ler de novo os dados de execuções anteriores.
+
+# Métricas de contagem do relatório que viram taxa (fração das linhas) no esboço
+METRICAS_TAXA = (
+    "nulos", "vazios", "zeros", "negativos", "listas_vazias", "formato_invalido", "futuras", "fora_escala", "erros",
+)
+# Métricas guardadas como estão
+METRICAS_VALOR = ("media", "distintos_aprox", "p01", "p05", "p25", "p50", "p75", "p95", "p99")
+
+# Folga mínima antes de alertar: taxas em pontos absolutos, o resto relativo à média histórica
+PISO_TAXA = 0.05
+PISO_RELATIVO = 0.10
+SIGMAS = 3.0
+
+
+def montar_esboco(relatorio: dict) -> dict[tuple[str, str], float]:
+    """
+    Extrai do relatório de qualidade o esboço da execução: {(coluna, métrica): valor}.
+    Contagens viram taxas ("taxa_nulos", ...) para serem comparáveis entre execuções de tamanhos diferentes.
+    """
+    linhas = relatorio["linhas"]
+    esboco = {("*", "linhas"): float(linhas)}
+    for coluna, metricas in relatorio["colunas"].items():
+        for metrica, valor in metricas.items():
+            if valor is None:
+                continue
+            if metrica in METRICAS_TAXA:
+                esboco[(coluna, f"taxa_{metrica}")] = valor / linhas if linhas else 0.0
+            elif metrica in METRICAS_VALOR:
+                esboco[(coluna, metrica)] = float(valor)
+    return esboco
+
+
+class HistoricoEsbocos:
+    """
+    Histórico local (SQLite) dos esboços de cada execução.
+
+    São duas tabelas: 'execucoes' (uma linha por execução) e 'esbocos' (uma linha por
+    coluna e métrica). Uma execução ocupa algumas centenas de linhas pequenas, então
+    anos de execuções diárias continuam cabendo folgado num arquivo.
+    """
+
+    def __init__(self, db_path: str = "historico_qualidade.db"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS execucoes (
+                execucao TEXT PRIMARY KEY,
+                registrada_em TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS esbocos (
+                execucao TEXT NOT NULL REFERENCES execucoes (execucao),
+                coluna TEXT NOT NULL,
+                metrica TEXT NOT NULL,
+                valor REAL,
+                PRIMARY KEY (execucao, coluna, metrica)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_execucoes_registrada_em ON execucoes (registrada_em)")
+        self._conn.commit()
+
+    def registrar(self, esboco: dict[tuple[str, str], float], execucao: str | None = None) -> str:
+        """Guarda o esboço de uma execução e devolve o identificador dela (a data/hora UTC, por padrão)."""
+        registrada_em = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="microseconds")
+        execucao = execucao or registrada_em
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO execucoes (execucao, registrada_em) VALUES (?, ?)", (execucao, registrada_em)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO esbocos (execucao, coluna, metrica, valor) VALUES (?, ?, ?, ?)",
+                [(execucao, coluna, metrica, valor) for (coluna, metrica), valor in esboco.items()],
+            )
+        return execucao
+
+    def ultimas(self, n: int) -> list[dict[tuple[str, str], float]]:
+        """Os esboços das `n` execuções mais recentes, da mais nova para a mais velha."""
+        execucoes = [
+            linha[0]
+            for linha in self._conn.execute(
+                "SELECT execucao FROM execucoes ORDER BY registrada_em DESC LIMIT ?", (n,)
+            )
+        ]
+        esbocos = {execucao: {} for execucao in execucoes}
+        if execucoes:
+            marcadores = ", ".join("?" for _ in execucoes)
+            for execucao, coluna, metrica, valor in self._conn.execute(
+                f"SELECT execucao, coluna, metrica, valor FROM esbocos WHERE execucao IN ({marcadores})", execucoes
+            ):
+                esbocos[execucao][(coluna, metrica)] = valor
+        return [esbocos[execucao] for execucao in execucoes]
+
+    def fechar(self) -> None:
+        self._conn.close()
+
+
+def calcular_drift(
+    atual: dict[tuple[str, str], float],
+    historico: list[dict[tuple[str, str], float]],
+    min_execucoes: int = 3,
+) -> list[dict]:
+    """
+    Compara o esboço atual com o histórico e devolve os alertas de drift.
+
+    Uma métrica alerta quando se afasta da média histórica mais que a tolerância:
+    SIGMAS desvios padrão do histórico, com um piso (PISO_TAXA pontos para taxas,
+    PISO_RELATIVO da média para o resto) para não alertar em séries quase constantes.
+
+    Args:
+        atual (dict): Esboço da execução atual (veja montar_esboco).
+        historico (list[dict]): Esboços das execuções anteriores.
+        min_execucoes (int): Mínimo de execuções no histórico para uma métrica ser avaliada
+            (nunca menos de 2: o desvio padrão precisa de duas).
+
+    Returns:
+        list[dict]: Um alerta por métrica fora da tolerância, do maior desvio para o menor.
+    """
+    alertas = []
+    for (coluna, metrica), valor in atual.items():
+        anteriores = [esboco[(coluna, metrica)] for esboco in historico if esboco.get((coluna, metrica)) is not None]
+        if valor is None or len(anteriores) < max(min_execucoes, 2):
+            continue
+        media = sum(anteriores) / len(anteriores)
+        desvio = math.sqrt(sum((x - media) ** 2 for x in anteriores) / (len(anteriores) - 1))
+        piso = PISO_TAXA if metrica.startswith("taxa_") else PISO_RELATIVO * abs(media)
+        tolerancia = max(SIGMAS * desvio, piso)
+        distancia = abs(valor - media)
+        if distancia > tolerancia:
+            alertas.append({
+                "coluna": coluna,
+                "metrica": metrica,
+                "valor": valor,
+                "media_historica": media,
+                "desvio_historico": desvio,
+                "tolerancia": tolerancia,
+                "sigmas": distancia / desvio if desvio else None,
+                "execucoes_comparadas": len(anteriores),
+            })
+    return sorted(alertas, key=lambda alerta: abs(alerta["valor"] - alerta["media_historica"]) / alerta["tolerancia"], reverse=True)
+
+
+def acompanhar_drift(relatorio: dict, caminho_historico: str, janela: int = 14, min_execucoes: int = 3) -> list[dict]:
+    """
+    Monta o esboço da execução a partir do relatório de qualidade, compara com as últimas
+    `janela` execuções do histórico em `caminho_historico` e registra o esboço novo.
+
+    Returns:
+        list[dict]: Os alertas de drift (veja calcular_drift).
+    """
+    esboco = montar_esboco(relatorio)
+    historico = HistoricoEsbocos(caminho_historico)
+    try:
+        anteriores = historico.ultimas(janela)
+        alertas = calcular_drift(esboco, anteriores, min_execucoes)
+        historico.registrar(esboco)
+    finally:
+        historico.fechar()
+    if len(anteriores) < min_execucoes:
+        print(f" - Drift: só {len(anteriores)} execução(ões) no histórico, são precisas {min_execucoes} para comparar.")
+    return alertas
+
+
+def imprimir_alertas_drift(alertas: list[dict]) -> None:
+    """Mostra os alertas de drift, um por linha."""
+    if not alertas:
+        print(" - Drift: nenhuma métrica fora do normal das últimas execuções.")
+        return
+    print(f" - Drift: {len(alertas)} métrica(s) fora do normal das últimas execuções:")
+    for alerta in alertas:
+        print(
+            f"   ! {alerta['coluna']}.{alerta['metrica']} = {alerta['valor']:.4g} "
+            f"(média {alerta['media_historica']:.4g} ± {alerta['tolerancia']:.4g} em {alerta['execucoes_comparadas']} execuções)"
+        )
@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import polars as pl
+
+# Codificação compacta dos dados tratados:
+# - Generos vira List(Enum) com os nomes do mapeamento de gêneros (um conjunto fechado);
+# - Status e Idioma_Original viram Categorical (conjuntos abertos, mas com poucos valores);
+# - Produtoras e Diretores viram listas de IDs (UInt32), com tabelas de consulta (id, nome).
+#
+# As tabelas de consulta ficam em arquivos Parquet e só crescem: um nome nunca muda
+# de ID entre execuções, então linhas carregadas antes continuam válidas. O banco também
+# guarda uma cópia de cada uma (load.gravar_tabelas_de_consulta) e é ela que vale: os
+# arquivos começam dela, então apagar a pasta dos dicionários não renumera nada.
+
+# Coluna codificada -> nome da tabela de consulta (arquivo Parquet e tabela no SQLite)
+DICIONARIOS = {"Produtoras": "produtoras", "Diretores": "diretores"}
+SCHEMA_DICIONARIO = pl.Schema({"id": pl.UInt32, "nome": pl.String})
+
+# Categoria dos IDs de gênero que não estão no mapeamento
+GENERO_DESCONHECIDO = "Desconhecido"
+
+
+def tipo_generos(genero_mapa: dict) -> pl.Enum:
+    """Enum dos gêneros: os nomes do mapeamento, em ordem alfabética, mais GENERO_DESCONHECIDO."""
+    return pl.Enum(sorted(set(genero_mapa.values()) | {GENERO_DESCONHECIDO}))
+
+
+def carregar_dicionario(caminho: str) -> pl.DataFrame:
+    """Lê uma tabela de consulta (id, nome); se o arquivo não existe, devolve uma vazia."""
+    if not os.path.exists(caminho):
+        return pl.DataFrame(schema=SCHEMA_DICIONARIO)
+    return pl.read_parquet(caminho).cast(SCHEMA_DICIONARIO)
+
+
+def dicionario_do_banco(db_path: str, tabela: str) -> pl.DataFrame:
+    """Lê a tabela de consulta (id, nome) gravada no banco pelo load; vazia se o banco ou a tabela não existem."""
+    if not db_path or not os.path.exists(db_path):
+        return pl.DataFrame(schema=SCHEMA_DICIONARIO)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        existe = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone()
+        linhas = conn.execute(f"SELECT id, nome FROM {tabela} ORDER BY id").fetchall() if existe else []
+    finally:
+        conn.close()
+    return pl.DataFrame(linhas, schema=SCHEMA_DICIONARIO, orient="row")
+
+
+def conflitos_dicionario(dicionario: pl.DataFrame, outro: pl.DataFrame) -> pl.DataFrame:
+    """Os pares (id, nome) de `dicionario` em que o ID ou o nome já estão em `outro` com outro par."""
+    mesmo_id = dicionario.join(outro, on="id", how="inner", suffix="_outro").filter(pl.col("nome") != pl.col("nome_outro"))
+    mesmo_nome = dicionario.join(outro, on="nome", how="inner", suffix="_outro").filter(pl.col("id") != pl.col("id_outro"))
+    return pl.concat([mesmo_id.select(SCHEMA_DICIONARIO.names()), mesmo_nome.select(SCHEMA_DICIONARIO.names())]).unique()
+
+
+def mesclar_com_banco(dicionario: pl.DataFrame, banco: pl.DataFrame, tabela: str) -> pl.DataFrame:
+    """
+    Junta o dicionário do arquivo com o do banco, que manda: os IDs já gravados no banco continuam
+    os mesmos mesmo se o arquivo sumiu ou foi montado de novo.
+
+    Raises:
+        ValueError: Se o arquivo e o banco dão IDs diferentes para o mesmo nome (ou nomes diferentes
+            para o mesmo ID); aí os IDs já carregados decodificariam para os nomes errados.
+    """
+    conflitos = conflitos_dicionario(dicionario, banco)
+    if not conflitos.is_empty():
+        raise ValueError(
+            f"A tabela de consulta '{tabela}' do arquivo não bate com a do banco em {conflitos.height} nome(s) "
+            f"(ex: {conflitos.row(0)}). Apague o arquivo para que ele seja montado de novo a partir do banco."
+        )
+    return pl.concat([banco, dicionario.join(banco, on="id", how="anti")]).sort("id")
+
+
+def atualizar_dicionario(dicionario: pl.DataFrame, nomes: pl.Series) -> pl.DataFrame:
+    """
+    Acrescenta ao dicionário os nomes que ainda não têm ID, numerando a partir do maior ID existente.
+
+    Args:
+        dicionario (pl.DataFrame): Tabela de consulta atual (id, nome).
+        nomes (pl.Series): Nomes vistos nos dados (pode ter repetidos e nulos).
+
+    Returns:
+        pl.DataFrame: O dicionário com os nomes novos no fim.
+    """
+    novos = (
+        nomes.drop_nulls().unique().sort().to_frame("nome")
+        .join(dicionario, on="nome", how="anti")
+    )
+    if novos.is_empty():
+        return dicionario
+    proximo_id = 0 if dicionario.is_empty() else dicionario["id"].max() + 1
+    novos = novos.with_row_index("id", offset=proximo_id).cast(SCHEMA_DICIONARIO)
+    return pl.concat([dicionario, novos.select(SCHEMA_DICIONARIO.names())])
+
+
+def salvar_dicionario(dicionario: pl.DataFrame, caminho: str) -> None:
+    """Grava a tabela de consulta de forma atômica (arquivo .tmp + os.replace)."""
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    dicionario.write_parquet(caminho + ".tmp")
+    os.replace(caminho + ".tmp", caminho)
+
+
+def caminho_dicionario(diretorio: str, coluna: str) -> str:
+    """Caminho do arquivo Parquet da tabela de consulta de uma coluna (ex: dicionarios/produtoras.parquet)."""
+    return os.path.join(diretorio, f"{DICIONARIOS[coluna]}.parquet")
+
+
+def carregar_dicionarios(diretorio: str) -> dict[str, pl.DataFrame]:
+    """Lê todas as tabelas de consulta, por nome de tabela (produtoras, diretores)."""
+    return {DICIONARIOS[coluna]: carregar_dicionario(caminho_dicionario(diretorio, coluna)) for coluna in DICIONARIOS}
+
+
+def codificar_compacto(
+    lf: pl.LazyFrame, genero_mapa: dict, diretorio_dicionarios: str, db_path: str | None = None
+) -> pl.LazyFrame:
+    """
+    Aplica a codificação compacta nos dados já tratados (saída de transform.transform).
+
+    Para montar os IDs de Produtoras e Diretores, os nomes distintos das duas colunas
+    são lidos numa passada (só essas colunas) e as tabelas de consulta em
+    `diretorio_dicionarios` são atualizadas, a partir das do banco em `db_path` (se houver).
+    O resto continua lazy.
+
+    Args:
+        lf (pl.LazyFrame): Os dados tratados.
+        genero_mapa (dict): Mapeamento {ID: Nome do Gênero}, que define as categorias do Enum.
+        diretorio_dicionarios (str): Pasta das tabelas de consulta.
+        db_path (str | None): Banco onde o load grava as tabelas de consulta (veja mesclar_com_banco).
+
+    Returns:
+        pl.LazyFrame: Os dados com as colunas codificadas.
+    """
+    generos = tipo_generos(genero_mapa)
+    categorias = generos.categories.to_list()
+    expressoes = [
+        pl.col("Generos").list.eval(
+            pl.when(pl.element().is_in(categorias)).then(pl.element()).otherwise(pl.lit(GENERO_DESCONHECIDO))
+        ).cast(pl.List(generos)),
+        pl.col("Status").cast(pl.Categorical),
+        pl.col("Idioma_Original").cast(pl.Categorical),
+    ]
+
+    # Única etapa que não é linha a linha: uma agregação separada, que também roda em streaming
+    nomes = lf.select(
+        pl.col(coluna).explode().unique().implode() for coluna in DICIONARIOS
+    ).collect(engine="streaming")
+    for coluna in DICIONARIOS:
+        caminho = caminho_dicionario(diretorio_dicionarios, coluna)
+        tabela = DICIONARIOS[coluna]
+        dicionario = mesclar_com_banco(carregar_dicionario(caminho), dicionario_do_banco(db_path, tabela), tabela)
+        dicionario = atualizar_dicionario(dicionario, nomes[coluna].explode())
+        salvar_dicionario(dicionario, caminho)
+        print(f" - Tabela de consulta '{tabela}': {dicionario.height} nomes ({caminho}).")
+        expressoes.append(
+            pl.col(coluna).list.eval(
+                pl.element().replace_strict(dicionario["nome"], dicionario["id"], return_dtype=pl.UInt32)
+            )
+        )
+
+    return lf.with_columns(expressoes)
+
+
+def decodificar_nomes(ids: list, dicionario: dict[int, str]) -> list:
+    """Troca os IDs de uma lista codificada pelos nomes; o que não for ID (dados antigos) fica como está."""
+    return [dicionario.get(item, item) if isinstance(item, int) else item for item in ids]
@@ -0,0 +1,639 @@
+import os
+import glob
+import threading
+import time
+from datetime import datetime, timezone
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import polars as pl
+import requests # Importar a biblioteca requests para suas exceções
+from cache import DetailCache
+from checkpoint import CheckpointJournal
+from instrumentation import contar, definir
+from rate_limit import ControleAdaptativo, TokenBucket
+from utils import (
+    IDIOMA_DETALHES,
+    extrair_detalhes_filme,
+    montar_append,
+    obter_detalhes_completos_filme_unificado,
+)
+
+
+# Schema explícito dos dados brutos, usado tanto no DataFrame em memória quanto nas partes Parquet
+RAW_SCHEMA = pl.Schema({
+    "id": pl.Int64,
+    "genre_ids": pl.List(pl.Int64),
+    "title": pl.String,
+    "release_date": pl.String,
+    "popularity": pl.Float64,
+    "vote_average": pl.Float64,
+    "vote_count": pl.Int64,
+    "overview": pl.String,
+    "budget": pl.Int64,
+    "revenue": pl.Int64,
+    "runtime": pl.Int64,
+    "original_title": pl.String,
+    "original_language": pl.String,
+    "production_companies": pl.List(pl.String),
+    "status": pl.String,
+    "director": pl.List(pl.String),
+    "poster_path": pl.String,
+    "backdrop_path": pl.String,
+    "listas": pl.List(pl.String),
+    "details_fetched_at": pl.String,
+    # Títulos e sinopses nos idiomas extras (vazio quando só há o idioma principal)
+    "traducoes": pl.List(pl.Struct({"idioma": pl.String, "title": pl.String, "overview": pl.String})),
+})
+
+
+def detalhes_com_erro(status: str) -> dict:
+    """Monta o dicionário de detalhes usado quando não foi possível buscar o filme."""
+    return {
+        "budget": 0, "revenue": 0, "runtime": 0, "status": status,
+        "production_companies": [], "director": [status], "traducoes": []
+    }
+
+
+def marcar_atualizacao(detalhes: dict, obtidos_em: float | None = None) -> dict:
+    """
+    Registra no dicionário de detalhes o momento (UTC) em que eles foram obtidos da API:
+    `obtidos_em` (epoch, ex: o de uma resposta em cache) ou agora.
+    """
+    momento = datetime.now(timezone.utc) if obtidos_em is None else datetime.fromtimestamp(obtidos_em, timezone.utc)
+    detalhes["details_fetched_at"] = momento.strftime("%Y-%m-%dT%H:%M:%S")
+    return detalhes
+
+
+def buscar_detalhes_com_retentativas(
+    movie_id: int,
+    limitador: TokenBucket,
+    max_retries: int = 3,
+    base_wait_time: int = 1,
+    cache: DetailCache | None = None,
+    forcar_atualizacao: bool = False,
+    language: str = IDIOMA_DETALHES,
+    idiomas: list[str] | tuple[str, ...] = (),
+) -> dict:
+    """
+    Busca os detalhes de um filme respeitando o limitador de taxa global.
+    Se houver `cache` e a resposta estiver nele, nenhuma requisição é feita.
+
+    Mantém a mesma política de antes: em 429 respeita o Retry-After (ou faz
+    backoff exponencial), erros de rede são tentados de novo com backoff e
+    outros erros HTTP desistem na hora.
+
+    Args:
+        movie_id (int): ID do filme no TMDB.
+        limitador (TokenBucket): Limitador compartilhado entre as threads.
+        max_retries (int): Número máximo de tentativas.
+        base_wait_time (int): Espera base (em segundos) do backoff exponencial.
+        cache (DetailCache | None): Cache de respostas de detalhes.
+        forcar_atualizacao (bool): Ignora o que estiver no cache e busca de novo na API.
+        language (str): Idioma principal dos detalhes.
+        idiomas (list[str] | tuple[str, ...]): Idiomas extras, cujas traduções vêm na mesma chamada.
+
+    Returns:
+        dict: Os detalhes do filme ou um dicionário de erro com a mesma estrutura.
+    """
+    if cache is not None and not forcar_atualizacao:
+        em_cache = cache.obter_com_data(movie_id, language, montar_append(idiomas))
+        if em_cache is not None:
+            contar("cache.hits")
+            # A data é a da resposta guardada: uma nova execução com o cache quente gera os mesmos dados brutos
+            resposta_em_cache, obtida_em = em_cache
+            return marcar_atualizacao(extrair_detalhes_filme(resposta_em_cache, idiomas), obtida_em)
+        contar("cache.misses")
+
+    retries = 0
+    detalhes_completos = None
+
+    while retries < max_retries:
+        limitador.adquirir()
+        contar("api.detalhes")
+        inicio = time.monotonic()
+        sucesso = False
+        espera = 0
+        try:
+            detalhes_completos = obter_detalhes_completos_filme_unificado(
+                movie_id, cache=cache, language=language, idiomas=idiomas
+            )
+            if detalhes_completos.get("status") != "Erro":
+                marcar_atualizacao(detalhes_completos)
+            sucesso = True
+            break
+
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code
+
+            if status_code == 429:
+                retry_after_header = e.response.headers.get("Retry-After")
+                wait_time = int(retry_after_header) if retry_after_header else (base_wait_time * (2 ** retries))
+                print(f"Rate limit para filme {movie_id}. Tentativa {retries + 1}/{max_retries}. Esperando {wait_time}s...")
+                # O limite é da conta toda, então todas as threads param juntas
+                limitador.pausar(wait_time)
+                contar("api.retentativas_429")
+                retries += 1
+            else:
+                contar("api.erros_http")
+                print(f"Erro HTTP {status_code} ao buscar detalhes para o filme ID {movie_id} na tentativa {retries + 1}: {e}")
+                detalhes_completos = detalhes_com_erro(f"Erro HTTP {status_code}")
+                break
+        except requests.exceptions.RequestException as e:
+            print(f"Erro de requisição (não HTTP) ao buscar detalhes para o filme ID {movie_id} na tentativa {retries + 1}: {e}")
+            if retries < max_retries - 1:
+                espera = base_wait_time * (2 ** retries)
+                contar("api.retentativas_rede")
+                retries += 1
+            else:
+                detalhes_completos = detalhes_com_erro("Erro de Requisição")
+                break
+        except Exception as e:
+            print(f"Erro inesperado ao buscar detalhes para o filme ID {movie_id} na tentativa {retries + 1}: {e}")
+            contar("api.erros")
+            detalhes_completos = detalhes_com_erro("Erro Inesperado")
+            break
+        finally:
+            # A latência de cada resposta alimenta o controle adaptativo (se houver)
+            limitador.liberar(time.monotonic() - inicio, sucesso)
+        # O backoff de rede espera fora da vaga de concorrência (e fora da latência medida)
+        if espera:
+            time.sleep(espera)
+
+    if retries == max_retries and detalhes_completos is None:
+        print(f"Falha ao buscar detalhes para o filme ID {movie_id} após {max_retries} tentativas de rate limit.")
+        detalhes_completos = detalhes_com_erro("Falha Max Tentativas RL")
+
+    if detalhes_completos is None:
+        detalhes_completos = detalhes_com_erro("Erro Desconhecido Detalhes")
+
+    return detalhes_completos
+
+
+def montar_registro_completo(movie_basic: dict, detalhes_completos: dict) -> dict:
+    """Junta as informações básicas da lista com os detalhes estendidos do filme."""
+    return {
+        "id": movie_basic["id"],
+        "genre_ids": movie_basic.get("genre_ids", []),
+        "title": movie_basic.get("title", "Sem título"),
+        "release_date": movie_basic.get("release_date", ""),
+        "popularity": movie_basic.get("popularity", 0),
+        "vote_average": movie_basic.get("vote_average", 0),
+        "vote_count": movie_basic.get("vote_count", 0),
+        "overview": movie_basic.get("overview", ""),
+        "budget": detalhes_completos.get("budget", 0),
+        "revenue": detalhes_completos.get("revenue", 0),
+        "runtime": detalhes_completos.get("runtime", 0),
+        "original_title": movie_basic.get("original_title", ""),
+        "original_language": movie_basic.get("original_language", ""),
+        "production_companies": detalhes_completos.get("production_companies", []),
+        "status": detalhes_completos.get("status", "Desconhecido"),
+        "director": detalhes_completos.get("director", ["Não Disponível"]),
+        "poster_path": movie_basic.get("poster_path", ""),
+        "backdrop_path": movie_basic.get("backdrop_path", ""),
+        "listas": movie_basic.get("listas", []),
+        # Sem data quando a busca falhou: o filme conta como desatualizado na próxima execução
+        "details_fetched_at": detalhes_completos.get("details_fetched_at"),
+        "traducoes": detalhes_completos.get("traducoes", []),
+    }
+
+
+def buscar_registro_completo(
+    movie_basic: dict,
+    limitador: TokenBucket,
+    cache: DetailCache | None = None,
+    forcar_atualizacao: set[int] | None = None,
+    detalhes_conhecidos: dict[int, dict] | None = None,
+    language: str = IDIOMA_DETALHES,
+    idiomas: list[str] | tuple[str, ...] = (),
+) -> dict:
+    """
+    Busca os detalhes de um filme da lista e devolve o registro completo.
+    Filmes presentes em `detalhes_conhecidos` reaproveitam os detalhes já salvos, sem requisição.
+    """
+    movie_id = movie_basic["id"]
+    if detalhes_conhecidos and movie_id in detalhes_conhecidos:
+        contar("incremental.reaproveitados")
+        return montar_registro_completo(movie_basic, detalhes_conhecidos[movie_id])
+    print(f"Obtendo detalhes extras para o filme: {movie_basic.get('title', 'Sem título')} (ID: {movie_id})")
+    detalhes_completos = buscar_detalhes_com_retentativas(
+        movie_id,
+        limitador,
+        cache=cache,
+        forcar_atualizacao=bool(forcar_atualizacao) and movie_id in forcar_atualizacao,
+        language=language,
+        idiomas=idiomas,
+    )
+    return montar_registro_completo(movie_basic, detalhes_completos)
+
+
+# Listas de filmes do TMDB que o extrator sabe coletar (métodos de tmdb.Movies)
+ENDPOINTS_LISTAS = ("popular", "top_rated", "now_playing", "upcoming")
+
+
+def buscar_pagina_com_retentativas(
+    buscar_pagina: Callable[[str, int], list[dict]],
+    lista: str,
+    page: int,
+    limitador: TokenBucket,
+    max_retries: int = 3,
+    base_wait_time: int = 1,
+) -> list[dict] | None:
+    """
+    Busca uma página de lista do TMDB com a mesma política de retentativas dos detalhes.
+
+    Args:
+        buscar_pagina (Callable[[str, int], list[dict]]): Função que recebe a lista e o número da página e devolve os resultados.
+        lista (str): Nome da lista (ex: "popular").
+        page (int): Número da página.
+        limitador (TokenBucket): Limitador de taxa global.
+        max_retries (int): Número máximo de tentativas.
+        base_wait_time (int): Espera base (em segundos) do backoff exponencial.
+
+    Returns:
+        list[dict] | None: Os filmes da página, ou None se todas as tentativas falharem.
+    """
+    for retries in range(max_retries):
+        limitador.adquirir()
+        contar("api.paginas")
+        inicio = time.monotonic()
+        sucesso = False
+        espera = 0
+        try:
+            results = buscar_pagina(lista, page)
+            print(f"Página {page} de '{lista}' coletada com sucesso.")
+            sucesso = True
+            return results
+
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 429:
+                retry_after_header = e.response.headers.get("Retry-After")
+                wait_time = int(retry_after_header) if retry_after_header else (base_wait_time * (2 ** retries))
+                print(f"Rate limit na página {page} de '{lista}'. Tentativa {retries + 1}/{max_retries}. Esperando {wait_time}s...")
+                limitador.pausar(wait_time)
+                contar("api.retentativas_429")
+            else:
+                print(f"Erro HTTP na página {page} de '{lista}' (tentativa {retries + 1}/{max_retries}): {e}")
+                espera = base_wait_time * (2 ** retries)
+                contar("api.retentativas_pagina")
+        except Exception as e:
+            print(f"Erro na página {page} de '{lista}' (tentativa {retries + 1}/{max_retries}): {e}")
+            espera = base_wait_time * (2 ** retries)
+            contar("api.retentativas_pagina")
+        finally:
+            limitador.liberar(time.monotonic() - inicio, sucesso)
+        # O backoff espera fora da vaga de concorrência (e fora da latência medida)
+        if espera:
+            time.sleep(espera)
+
+    print(f"Página {page} de '{lista}' ignorada após {max_retries} tentativas.")
+    return None
+
+
+def iterar_filmes_completos(
+    buscar_pagina: Callable[[str, int], list[dict]],
+    listas: list[str],
+    num_pages: int,
+    limitador: TokenBucket,
+    max_workers: int = 8,
+    page_workers: int = 4,
+    cache: DetailCache | None = None,
+    forcar_atualizacao: set[int] | None = None,
+    detalhes_conhecidos: dict[int, dict] | None = None,
+    checkpoint: CheckpointJournal | None = None,
+    language: str = IDIOMA_DETALHES,
+    idiomas: list[str] | tuple[str, ...] = (),
+    reprocessar: list[dict] | None = None,
+) -> Iterator[dict]:
+    """
+    Coleta as páginas das listas em paralelo e busca os detalhes de cada filme
+    uma única vez, mesmo que ele apareça em várias páginas ou listas. Cada
+    registro sai com a coluna 'listas' dizendo em quais listas o filme apareceu.
+
+    Com uma lista só, os detalhes de cada página começam assim que ela chega.
+    Com várias, as páginas (baratas) são coletadas primeiro, para juntar os IDs
+    e as listas de cada filme antes da etapa de detalhes (a cara).
+
+    Páginas que falham são tentadas de novo individualmente; se mesmo assim
+    falharem, só elas ficam de fora. Os registros são devolvidos na ordem da
+    primeira aparição: lista, página e posição na página. Os filmes de `reprocessar`
+    que não apareceram nas páginas vêm por último.
+
+    Args:
+        buscar_pagina (Callable[[str, int], list[dict]]): Função que recebe a lista e o número da página e devolve os resultados.
+        listas (list[str]): Listas a coletar, na ordem de prioridade.
+        num_pages (int): Quantidade de páginas a coletar de cada lista.
+        limitador (TokenBucket): Limitador de taxa global (páginas e detalhes dividem o mesmo orçamento).
+        max_workers (int): Número máximo de requisições de detalhes simultâneas.
+        page_workers (int): Número máximo de páginas buscadas ao mesmo tempo.
+        cache (DetailCache | None): Cache de respostas de detalhes.
+        forcar_atualizacao (set[int] | None): IDs que devem ser buscados na API mesmo se estiverem no cache.
+        detalhes_conhecidos (dict[int, dict] | None): Detalhes já armazenados e ainda válidos, por ID
+            (modo incremental). Esses filmes não geram requisição de detalhes.
+        checkpoint (CheckpointJournal | None): Diário para retomar execuções. Páginas já registradas
+            não são buscadas de novo e filmes já gravados em partes são pulados.
+        language (str): Idioma principal dos detalhes.
+        idiomas (list[str] | tuple[str, ...]): Idiomas extras de título e sinopse (coluna 'traducoes').
+        reprocessar (list[dict] | None): Informações básicas de filmes cuja busca de detalhes falhou
+            numa execução anterior (a fila da quarentena). Eles são buscados de novo mesmo que não
+            apareçam nas páginas desta execução.
+
+    Yields:
+        dict: Registro completo de cada filme.
+    """
+    tarefas = [(lista, page) for lista in listas for page in range(1, num_pages + 1)]
+    vistos: set[int] = set(checkpoint.ids_concluidos) if checkpoint is not None else set()
+    vistos_lock = threading.Lock()
+
+    def _coletar_pagina(lista: str, page: int) -> list[dict]:
+        if checkpoint is not None and (lista, page) in checkpoint.paginas:
+            return checkpoint.paginas[(lista, page)]
+        results = buscar_pagina_com_retentativas(buscar_pagina, lista, page, limitador)
+        if results and checkpoint is not None:
+            checkpoint.registrar_pagina(lista, page, results)
+        return results or []
+
+    def _buscar(movie_basic: dict) -> dict:
+        return buscar_registro_completo(
+            movie_basic, limitador, cache, forcar_atualizacao, detalhes_conhecidos, language, idiomas
+        )
+
+    def _detalhar(filmes: Iterable[dict]) -> Iterator[dict]:
+        # Detalhes em janela deslizante, para a memória não crescer com o catálogo
+        janela = max(1, max_workers) * 4
+        proximos_filmes = iter(filmes)
+        detalhes = deque(detalhes_executor.submit(_buscar, movie_basic) for movie_basic in islice(proximos_filmes, janela))
+        try:
+            while detalhes:
+                registro = detalhes.popleft().result()
+                for movie_basic in islice(proximos_filmes, 1):
+                    detalhes.append(detalhes_executor.submit(_buscar, movie_basic))
+                yield registro
+        finally:
+            for detalhe in detalhes:
+                detalhe.cancel()
+
+    def _fila_reprocessamento() -> list[dict]:
+        # Só os filmes da fila que não vieram nas páginas (esses já foram buscados)
+        with vistos_lock:
+            pendentes = [movie_basic for movie_basic in reprocessar or [] if movie_basic["id"] not in vistos]
+            vistos.update(movie_basic["id"] for movie_basic in pendentes)
+        if pendentes:
+            print(f" - {len(pendentes)} filme(s) da quarentena de volta na fila de detalhes.")
+            contar("quarentena.reprocessados", len(pendentes))
+        return pendentes
+
+    with ThreadPoolExecutor(max_workers=max_workers) as detalhes_executor, \
+         ThreadPoolExecutor(max_workers=page_workers) as paginas_executor:
+
+        if len(listas) == 1:
+            def _coletar_e_detalhar(lista: str, page: int) -> list:
+                # A página (com as retentativas) vem fora do lock: só a checagem em `vistos` é exclusiva
+                resultados = _coletar_pagina(lista, page)
+                novos = []
+                with vistos_lock:
+                    for movie_basic in resultados:
+                        if movie_basic["id"] not in vistos:
+                            vistos.add(movie_basic["id"])
+                            novos.append({**movie_basic, "listas": [lista]})
+                # Os detalhes começam aqui, enquanto as outras páginas ainda estão chegando
+                return [detalhes_executor.submit(_buscar, movie_basic) for movie_basic in novos]
+
+            # Só uma janela de páginas fica em andamento, para a memória não crescer com o catálogo
+            janela = max(1, page_workers) * 2
+            proximas_tarefas = iter(tarefas)
+            paginas = deque(
+                paginas_executor.submit(_coletar_e_detalhar, *tarefa) for tarefa in islice(proximas_tarefas, janela)
+            )
+
+            try:
+                while paginas:
+                    detalhes = paginas.popleft().result()
+                    for tarefa in islice(proximas_tarefas, 1):
+                        paginas.append(paginas_executor.submit(_coletar_e_detalhar, *tarefa))
+                    for detalhe in detalhes:
+                        yield detalhe.result()
+            finally:
+                # Se quem consome parar no meio (erro, Ctrl-C), as páginas que faltam nem começam
+                for pagina in paginas:
+                    pagina.cancel()
+            yield from _detalhar(_fila_reprocessamento())
+            return
+
+        # Várias listas: junta todas as páginas, removendo filmes repetidos entre listas
+        paginas = [paginas_executor.submit(_coletar_pagina, *tarefa) for tarefa in tarefas]
+        unicos: dict[int, dict] = {}
+        for (lista, _), pagina in zip(tarefas, paginas):
+            for movie_basic in pagina.result():
+                movie_id = movie_basic["id"]
+                if movie_id in vistos:
+                    continue
+                if movie_id not in unicos:
+                    unicos[movie_id] = {**movie_basic, "listas": []}
+                if lista not in unicos[movie_id]["listas"]:
+                    unicos[movie_id]["listas"].append(lista)
+
+        total_aparicoes = sum(len(pagina.result()) for pagina in paginas)
+        print(f"{total_aparicoes} aparições em {len(listas)} listas viraram {len(unicos)} filmes únicos.")
+
+        vistos.update(unicos)
+        yield from _detalhar([*unicos.values(), *_fila_reprocessamento()])
+
+
+def iterar_filmes_tmdb(
+    listas: list[str],
+    num_pages: int,
+    language: str = "pt-BR",
+    idiomas: list[str] | None = None,
+    max_workers: int = 8,
+    requests_per_second: float = 20.0,
+    cache: DetailCache | None = None,
+    forcar_atualizacao: set[int] | None = None,
+    detalhes_conhecidos: dict[int, dict] | None = None,
+    checkpoint: CheckpointJournal | None = None,
+    adaptativo: bool = True,
+    max_requests_per_second: float = 50.0,
+    limitador: TokenBucket | None = None,
+    reprocessar: list[dict] | None = None,
+) -> Iterator[dict]:
+    """
+    Extrator genérico: busca os filmes de uma ou mais listas do TMDB (popular,
+    top_rated, now_playing, upcoming) com os detalhes estendidos e os diretores,
+    usando uma única chamada de detalhes por filme único.
+
+    Páginas e detalhes são buscados em paralelo (até `max_workers` detalhes por vez), sob um
+    único limitador de taxa que começa em `requests_per_second` requisições por segundo. Com
+    `adaptativo=True` (padrão), um ControleAdaptativo sobe a concorrência (até `max_workers`) e a
+    taxa (até `max_requests_per_second`) enquanto a API responde bem, e corta as duas em 429 ou
+    quando a latência sobe; com `adaptativo=False` os dois ficam fixos. Um `limitador` já criado
+    pode ser passado para acompanhar o estado de fora. Com `cache`,
+    filmes já guardados não geram requisição de detalhes (exceto os IDs em `forcar_atualizacao`).
+    No modo incremental, `detalhes_conhecidos` traz os detalhes já salvos no banco, que são
+    reaproveitados. Com `checkpoint`, páginas e filmes já concluídos numa execução anterior são pulados.
+    Os filmes de `reprocessar` (a fila da quarentena) são buscados de novo mesmo fora das páginas.
+
+    Listas e detalhes vêm em `language`. Com `idiomas` (ex: ["en-US", "es-ES"]), título e sinopse
+    desses idiomas vêm na coluna 'traducoes', pedidos na mesma chamada de detalhes de cada filme
+    (append_to_response=translations): o número de requisições não cresce com o número de idiomas.
+
+    Os registros são devolvidos um a um (veja iterar_filmes_completos).
+    """
+    import tmdbsimple as tmdb
+    from dotenv import load_dotenv
+
+    invalidas = [lista for lista in listas if lista not in ENDPOINTS_LISTAS]
+    if invalidas:
+        raise ValueError(f"Listas desconhecidas: {invalidas}. Use alguma de {ENDPOINTS_LISTAS}.")
+
+    load_dotenv()
+    TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+
+    if not TMDB_API_KEY:
+        raise ValueError("TMDB_API_KEY não encontrada nas variáveis de ambiente. Por favor, defina-a em um arquivo .env.")
+
+    tmdb.API_KEY = TMDB_API_KEY
+    # O idioma principal já vem nas colunas title/overview
+    idiomas_extras = tuple(dict.fromkeys(idioma for idioma in (idiomas or []) if idioma != language))
+    print(f"Iniciando a busca das listas {', '.join(listas)} do TMDB para {num_pages} página(s) em {language}...")
+    if idiomas_extras:
+        print(f" - Traduções de título e sinopse em: {', '.join(idiomas_extras)} (na mesma chamada de detalhes).")
+
+    def buscar_pagina(lista: str, page: int) -> list[dict]:
+        # Um objeto por chamada: o tmdbsimple guarda a resposta em atributos do objeto
+        response = getattr(tmdb.Movies(), lista)(page=page, language=language)
+        return response.get("results", [])
+
+    if limitador is None:
+        if adaptativo:
+            limitador = ControleAdaptativo(
+                taxa_inicial=requests_per_second,
+                taxa_maxima=max_requests_per_second,
+                concorrencia_inicial=max(1, max_workers // 2),
+                concorrencia_maxima=max_workers,
+            )
+        else:
+            limitador = TokenBucket(taxa_por_segundo=requests_per_second)
+
+    yield from iterar_filmes_completos(
+        buscar_pagina,
+        listas,
+        num_pages,
+        limitador,
+        max_workers=max_workers,
+        cache=cache,
+        forcar_atualizacao=forcar_atualizacao,
+        detalhes_conhecidos=detalhes_conhecidos,
+        checkpoint=checkpoint,
+        language=language,
+        idiomas=idiomas_extras,
+        reprocessar=reprocessar,
+    )
+
+    if isinstance(limitador, ControleAdaptativo):
+        estado = limitador.estado()
+        print(f" - Controle adaptativo no fim da extração: {estado}")
+        definir("controle.aumentos", estado["aumentos"])
+        definir("controle.reducoes", estado["reducoes"])
+
+
+def obter_filmes_tmdb(listas: list[str], num_pages: int, **kwargs) -> pl.DataFrame:
+    """
+    Busca os filmes das listas e devolve tudo em um único DataFrame (schema RAW_SCHEMA).
+    Aceita as mesmas opções de `iterar_filmes_tmdb`.
+    """
+    complete_movies_data = list(iterar_filmes_tmdb(listas, num_pages, **kwargs))
+
+    if not complete_movies_data:
+        print("Nenhum dado de filme coletado (lista básica). Saindo.")
+        return pl.DataFrame()
+
+    return pl.DataFrame(complete_movies_data, schema=RAW_SCHEMA)
+
+
+def salvar_filmes_tmdb_em_partes(
+    listas: list[str],
+    num_pages: int,
+    diretorio: str,
+    tamanho_lote: int = 1000,
+    checkpoint: CheckpointJournal | None = None,
+    **kwargs,
+) -> list[str]:
+    """
+    Modo streaming: busca os filmes das listas e grava em partes Parquet numeradas
+    de `tamanho_lote` linhas, sem acumular o catálogo inteiro em memória.
+    Aceita as mesmas opções de `iterar_filmes_tmdb`.
+
+    Com `checkpoint`, cada parte gravada fica registrada no diário e, ao retomar,
+    as novas partes continuam a numeração das que já existem.
+
+    Returns:
+        list[str]: Caminhos de todas as partes (as anteriores do diário e as novas).
+    """
+    partes_anteriores = list(checkpoint.partes) if checkpoint is not None else []
+    registros = iterar_filmes_tmdb(listas, num_pages, checkpoint=checkpoint, **kwargs)
+    partes = partes_anteriores + escrever_partes_parquet(
+        registros,
+        diretorio,
+        tamanho_lote,
+        parte_inicial=len(partes_anteriores),
+        checkpoint=checkpoint,
+    )
+
+    if not partes:
+        print("Nenhum dado de filme coletado (lista básica). Saindo.")
+    return partes
+
+
+def escrever_partes_parquet(
+    registros: Iterable[dict],
+    diretorio: str,
+    tamanho_lote: int = 1000,
+    parte_inicial: int = 0,
+    checkpoint: CheckpointJournal | None = None,
+) -> list[str]:
+    """
+    Grava os registros em arquivos Parquet numerados (part-00000.parquet, part-00001.parquet, ...)
+    à medida que eles chegam, com no máximo `tamanho_lote` linhas por arquivo.
+
+    Só um lote fica em memória por vez, e o que já foi gravado não se perde se a
+    execução cair no meio.
+
+    Args:
+        registros (Iterable[dict]): Registros completos (por exemplo, de iterar_filmes_completos).
+        diretorio (str): Pasta onde as partes serão gravadas.
+        tamanho_lote (int): Número de linhas por arquivo.
+        parte_inicial (int): Número da primeira parte gravada.
+        checkpoint (CheckpointJournal | None): Diário onde cada parte gravada é registrada.
+
+    Returns:
+        list[str]: Caminhos das partes gravadas, em ordem.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    partes = []
+    lote = []
+
+    def _gravar_lote() -> None:
+        caminho = os.path.join(diretorio, f"part-{parte_inicial + len(partes):05d}.parquet")
+        # Grava num temporário e renomeia: uma parte pela metade nunca fica com o nome final
+        pl.DataFrame(lote, schema=RAW_SCHEMA).write_parquet(caminho + ".tmp")
+        os.replace(caminho + ".tmp", caminho)
+        if checkpoint is not None:
+            checkpoint.registrar_parte(caminho, [registro["id"] for registro in lote])
+        partes.append(caminho)
+        print(f" - Parte {caminho} gravada com {len(lote)} filmes.")
+        lote.clear()
+
+    for registro in registros:
+        lote.append(registro)
+        if len(lote) >= tamanho_lote:
+            _gravar_lote()
+    if lote:
+        _gravar_lote()
+
+    return partes
+
+
+def listar_partes_parquet(diretorio: str) -> list[str]:
+    """Lista as partes Parquet já gravadas em `diretorio`, em ordem."""
+    return sorted(glob.glob(os.path.join(diretorio, "part-*.parquet")))
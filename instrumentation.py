@@ -0,0 +1,287 @@
+import datetime
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError: # Windows não tem o módulo resource: fica sem a memória de pico
+    resource = None
+
+# Instrumentação da pipeline: tempo, linhas, memória e contadores (API, retentativas, cache)
+# de cada etapa, num relatório JSON por execução e numa tabela de resumo.
+#
+# Só usa a biblioteca padrão, para poder ser importado por qualquer etapa sem custo.
+# Fora de uma execução (ex: chamando uma função da pipeline num notebook), medir e
+# contar não fazem nada.
+
+_execucao_atual = None
+
+
+def _rss_atual_mb() -> float | None:
+    """Memória residente atual do processo, em MB (só Linux; None nos outros sistemas)."""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            paginas_residentes = int(arquivo.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas_residentes * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def _rss_pico_mb() -> float | None:
+    """Pico de memória residente do processo desde o início (ou desde o último _zerar_pico), em MB."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # No Linux o valor vem em KB; no macOS, em bytes
+    return pico / 1024 / 1024 if sys.platform == "darwin" else pico / 1024
+
+
+def _zerar_pico() -> bool:
+    """
+    Recomeça a contagem do pico de memória residente a partir do uso atual (só Linux).
+    É o que permite medir o pico de cada etapa, e não só o do processo inteiro.
+
+    Returns:
+        bool: False se não deu para zerar (outro sistema ou /proc sem permissão).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as arquivo:
+            arquivo.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _maior(*valores: float | None) -> float | None:
+    presentes = [valor for valor in valores if valor is not None]
+    return max(presentes) if presentes else None
+
+
+class Etapa:
+    """
+    Medições de uma etapa. Quem mede pode preencher `linhas_entrada` e `linhas_saida` e, nas
+    etapas com memoização, `memo` ("reaproveitada" ou "executada", veja memoizacao.py).
+    """
+
+    def __init__(self, nome: str, nivel: int, linhas_entrada: int | None = None):
+        self.nome = nome
+        self.nivel = nivel
+        self.linhas_entrada = linhas_entrada
+        self.linhas_saida: int | None = None
+        self.status = "ok"
+        self.memo: str | None = None
+        self.segundos = 0.0
+        self.cpu_segundos = 0.0
+        self.rss_inicio_mb = _rss_atual_mb()
+        self.rss_fim_mb: float | None = None
+        # Pico durante a etapa (None se o sistema não deixa zerar o pico no começo dela)
+        self.rss_pico_mb: float | None = None
+        self.contadores: dict[str, int] = {}
+        self._pico_parcial: float | None = None # Pico até uma etapa interna zerar a contagem
+
+    def como_dict(self) -> dict:
+        return {
+            "etapa": self.nome,
+            "nivel": self.nivel,
+            "status": self.status,
+            "memo": self.memo,
+            "segundos": round(self.segundos, 3),
+            "cpu_segundos": round(self.cpu_segundos, 3),
+            "linhas_entrada": self.linhas_entrada,
+            "linhas_saida": self.linhas_saida,
+            "rss_inicio_mb": _arredondar(self.rss_inicio_mb),
+            "rss_fim_mb": _arredondar(self.rss_fim_mb),
+            "rss_pico_mb": _arredondar(self.rss_pico_mb),
+            "contadores": self.contadores,
+        }
+
+
+def _arredondar(valor: float | None) -> float | None:
+    return None if valor is None else round(valor, 1)
+
+
+class Execucao:
+    """
+    Uma execução da pipeline: a lista de etapas medidas e os contadores globais.
+    Os contadores são seguros entre threads (a extração conta de várias ao mesmo tempo).
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.iniciada_em = datetime.datetime.now(datetime.timezone.utc)
+        self.status = "ok"
+        self.etapas: list[Etapa] = []
+        self.contadores: dict[str, int] = {}
+        self._inicio = time.perf_counter()
+        self._pilha: list[Etapa] = []
+        self._lock = threading.Lock()
+        self._pico_processo: float | None = None # Pico antes da última vez que a contagem foi zerada
+
+    def contar(self, nome: str, quantidade: int = 1) -> None:
+        with self._lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def definir(self, nome: str, valor: int) -> None:
+        with self._lock:
+            self.contadores[nome] = valor
+
+    def _recomecar_pico(self) -> bool:
+        """
+        Zera a contagem do pico de memória para uma etapa que começa. O pico até aqui não se
+        perde: vai para as etapas ainda abertas e para o pico do processo.
+        """
+        pico = _rss_pico_mb()
+        self._pico_processo = _maior(self._pico_processo, pico)
+        for aberta in self._pilha:
+            aberta._pico_parcial = _maior(aberta._pico_parcial, pico)
+        return _zerar_pico()
+
+    def pico_processo_mb(self) -> float | None:
+        """Pico de memória residente do processo inteiro, em MB."""
+        return _maior(self._pico_processo, _rss_pico_mb())
+
+    @contextmanager
+    def medir(self, nome: str, linhas_entrada: int | None = None):
+        etapa = Etapa(nome, len(self._pilha), linhas_entrada)
+        pico_por_etapa = self._recomecar_pico()
+        self.etapas.append(etapa)
+        self._pilha.append(etapa)
+        with self._lock:
+            contadores_antes = dict(self.contadores)
+        inicio, cpu_inicio = time.perf_counter(), time.process_time()
+        try:
+            yield etapa
+        except BaseException:
+            etapa.status = "erro"
+            raise
+        finally:
+            self._pilha.pop()
+            etapa.segundos = time.perf_counter() - inicio
+            etapa.cpu_segundos = time.process_time() - cpu_inicio
+            etapa.rss_fim_mb = _rss_atual_mb()
+            if pico_por_etapa:
+                etapa.rss_pico_mb = _maior(etapa._pico_parcial, _rss_pico_mb())
+            with self._lock:
+                etapa.contadores = {
+                    nome_contador: valor - contadores_antes.get(nome_contador, 0)
+                    for nome_contador, valor in self.contadores.items()
+                    if valor != contadores_antes.get(nome_contador, 0)
+                }
+
+    def relatorio(self) -> dict:
+        """O relatório da execução, pronto para virar JSON."""
+        return {
+            "execucao": self.nome,
+            "iniciada_em": self.iniciada_em.isoformat(timespec="seconds"),
+            "status": self.status,
+            "segundos": round(time.perf_counter() - self._inicio, 3),
+            "rss_pico_mb": _arredondar(self.pico_processo_mb()),
+            "etapas": [etapa.como_dict() for etapa in self.etapas],
+            "contadores": dict(sorted(self.contadores.items())),
+        }
+
+    def resumo(self) -> str:
+        """Tabela de resumo legível (uma linha por etapa, mais os contadores)."""
+        def celula(valor, formato="{:,}"):
+            return "-" if valor is None else formato.format(valor).replace(",", ".")
+
+        linhas = [
+            f"{'etapa':<28}{'tempo (s)':>10}{'cpu (s)':>10}{'entrada':>11}{'saída':>11}{'pico RSS (MB)':>15}{'Δ RSS (MB)':>12}",
+        ]
+        for etapa in self.etapas:
+            delta = (
+                None if etapa.rss_inicio_mb is None or etapa.rss_fim_mb is None
+                else etapa.rss_fim_mb - etapa.rss_inicio_mb
+            )
+            marca = " [erro]" if etapa.status == "erro" else " [memo]" if etapa.memo == "reaproveitada" else ""
+            nome = ("  " * etapa.nivel + etapa.nome + marca)[:27]
+            linhas.append(
+                f"{nome:<28}{etapa.segundos:>10.2f}{etapa.cpu_segundos:>10.2f}"
+                f"{celula(etapa.linhas_entrada):>11}{celula(etapa.linhas_saida):>11}"
+                f"{celula(etapa.rss_pico_mb, '{:.1f}'):>15}{celula(delta, '{:+.1f}'):>12}"
+            )
+        pico_processo = self.pico_processo_mb()
+        if pico_processo is not None:
+            linhas.append(f"pico RSS do processo: {pico_processo:.1f} MB")
+        if self.contadores:
+            linhas.append("contadores: " + ", ".join(f"{nome}={valor}" for nome, valor in sorted(self.contadores.items())))
+        return "\n".join(linhas)
+
+
+@contextmanager
+def execucao(nome: str, caminho_relatorio: str | None = None):
+    """
+    Abre uma execução instrumentada. Ao sair (mesmo com erro), mostra o resumo e,
+    se houver `caminho_relatorio`, grava o relatório JSON.
+
+    Exemplo:
+        with execucao("run", "relatorio_execucao.json"):
+            with medir("extract") as etapa:
+                ...
+                etapa.linhas_saida = 400
+    """
+    global _execucao_atual
+    anterior = _execucao_atual
+    atual = Execucao(nome)
+    _execucao_atual = atual
+    try:
+        yield atual
+    except BaseException:
+        atual.status = "erro"
+        raise
+    finally:
+        _execucao_atual = anterior
+        print("\n--- Resumo da execução ---")
+        print(atual.resumo())
+        if caminho_relatorio:
+            diretorio = os.path.dirname(caminho_relatorio)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            with open(caminho_relatorio, "w", encoding="utf-8") as arquivo:
+                json.dump(atual.relatorio(), arquivo, ensure_ascii=False, indent=2)
+            print(f" - Relatório da execução salvo em: {caminho_relatorio}.")
+
+
+@contextmanager
+def medir(nome: str, linhas_entrada: int | None = None):
+    """Mede uma etapa da execução atual. Sem execução aberta, não mede nada (mas devolve uma Etapa)."""
+    if _execucao_atual is None:
+        yield Etapa(nome, 0, linhas_entrada)
+        return
+    with _execucao_atual.medir(nome, linhas_entrada) as etapa:
+        yield etapa
+
+
+def etapa(nome: str):
+    """Decorador: mede cada chamada da função como uma etapa `nome`."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with medir(nome):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def etapa_atual() -> Etapa:
+    """A etapa medida mais interna no momento, para quem está dentro dela preencher as linhas."""
+    if _execucao_atual is None or not _execucao_atual._pilha:
+        return Etapa("(sem execução)", 0)
+    return _execucao_atual._pilha[-1]
+
+
+def contar(nome: str, quantidade: int = 1) -> None:
+    """Soma `quantidade` ao contador `nome` da execução atual (ex: "api.detalhes")."""
+    if _execucao_atual is not None:
+        _execucao_atual.contar(nome, quantidade)
+
+
+def definir(nome: str, valor: int) -> None:
+    """Define o valor de um contador da execução atual (ex: os hits do cache no fim da extração)."""
+    if _execucao_atual is not None:
+        _execucao_atual.definir(nome, valor)
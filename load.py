@@ -1,16 +1,26 @@
 import polars as pl
 import sqlite3
 import os
-from dotenv import load_dotenv
-
-load_dotenv() # Puxa as variáveis do .env
-
-PARQUET_FILE_PATH = os.getenv("DF_FINAL", "filmes_tmdb_transformados.parquet")
+import ast
+import json
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from busca import (
+    FRACAO_RECONSTRUIR_BUSCA,
+    criar_indice_busca,
+    otimizar_indice_busca,
+    reconstruir_indice_busca,
+    remover_gatilhos_busca,
+)
+from encoding import SCHEMA_DICIONARIO, conflitos_dicionario, decodificar_nomes
+from normalizacao import RELACOES, criar_schema_normalizado, gravar_normalizado
+from regras import COLUNA_MOTIVO, MOTIVO_FALHA_BUSCA
+from utils import coluna_idioma
 
 
 def get_sqlite_type(polars_dtype: pl.DataType) -> str:
     """Converte o tipo de dado do Polars para o tipo do SQLite."""
-    if polars_dtype == pl.Int64 or polars_dtype == pl.Int32:
+    if polars_dtype.is_integer():
         return "INTEGER"
     elif polars_dtype == pl.Float64 or polars_dtype == pl.Float32:
         return "REAL"
@@ -20,6 +30,8 @@ def get_sqlite_type(polars_dtype: pl.DataType) -> str:
         return "TEXT" # Data vira texto no SQLite
     elif polars_dtype == pl.Boolean:
         return "INTEGER" # True/False vira 1/0
+    elif isinstance(polars_dtype, (pl.Enum, pl.Categorical)):
+        return "TEXT" # Categorias são gravadas pelo nome
     elif isinstance(polars_dtype, pl.List):
         return "TEXT" # Listas viram texto (tipo JSON)
     else:
@@ -40,50 +52,489 @@ def create_table_schema(df: pl.DataFrame, table_name: str) -> str:
             columns_sql.append(f"{col_name} {sqlite_type}")
     return f"CREATE TABLE IF NOT EXISTS {table_name} (\n    " + ",\n    ".join(columns_sql) + "\n);"
 
-def load_data_to_sqlite(df: pl.DataFrame, db_path: str, table_name: str):
-    """Pega um DataFrame do Polars e joga numa tabela do SQLite."""
+def adicionar_colunas_faltantes(cursor: sqlite3.Cursor, df: pl.DataFrame, table_name: str):
+    """Adiciona na tabela existente as colunas novas do DataFrame (ex: 'Atualizado_Em')."""
+    existentes = {linha[1] for linha in cursor.execute(f"PRAGMA table_info({table_name})")}
+    for col_name, col_dtype in df.schema.items():
+        if col_name not in existentes:
+            print(f" - Adicionando coluna '{col_name}' na tabela '{table_name}'.")
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {col_name} {get_sqlite_type(col_dtype)}")
+
+
+def _texto_para_lista(valor: str | None) -> list:
+    """Converte de volta uma lista gravada como texto no SQLite (JSON ou, em bancos antigos, a repr do Python)."""
+    if not valor:
+        return []
+    try:
+        lista = json.loads(valor)
+    except json.JSONDecodeError:
+        try:
+            lista = ast.literal_eval(valor)
+        except (ValueError, SyntaxError):
+            return [valor]
+    return list(lista) if isinstance(lista, (list, tuple)) else [lista]
+
+
+def ler_detalhes_armazenados(
+    db_path: str, table_name: str, idade_maxima_dias: float, idiomas: list[str] | None = None
+) -> dict[int, dict]:
+    """
+    Lê do banco os detalhes dos filmes que ainda estão atualizados (modo incremental).
+
+    Um filme é considerado atualizado quando 'Atualizado_Em' existe e é mais recente
+    que `idade_maxima_dias`. Os demais (novos ou velhos) precisam ser buscados de novo.
+    Com `idiomas`, as traduções também são lidas; se a tabela ainda não tem as colunas
+    de algum desses idiomas, nada é reaproveitado (todos precisam da tradução nova).
+
+    Args:
+        db_path (str): Caminho do banco SQLite.
+        table_name (str): Nome da tabela de filmes.
+        idade_maxima_dias (float): Idade máxima, em dias, dos detalhes reaproveitados.
+        idiomas (list[str] | None): Idiomas extras cujas colunas Titulo_<idioma>/Sinopse_<idioma> são lidas.
+
+    Returns:
+        dict[int, dict]: Detalhes por ID, no mesmo formato da extração (budget, revenue, ...).
+    """
+    if not os.path.exists(db_path):
+        return {}
+
+    limite = (datetime.now(timezone.utc) - timedelta(days=idade_maxima_dias)).strftime("%Y-%m-%dT%H:%M:%S")
+    conn = sqlite3.connect(db_path)
+    try:
+        colunas = {linha[1] for linha in conn.execute(f"PRAGMA table_info({table_name})")}
+        idiomas = idiomas or []
+        colunas_traducoes = [
+            coluna for idioma in idiomas for coluna in (coluna_idioma("Titulo", idioma), coluna_idioma("Sinopse", idioma))
+        ]
+        if "Atualizado_Em" not in colunas or not set(colunas_traducoes) <= colunas:
+            return {}
+        extras = "".join(f", {coluna}" for coluna in colunas_traducoes)
+        linhas = conn.execute(
+            f"""SELECT Id, Orcamento, Receita, Duração, Status, Produtoras, Diretores, Atualizado_Em{extras}
+                FROM {table_name} WHERE Atualizado_Em IS NOT NULL AND Atualizado_Em >= ?""",
+            (limite,),
+        ).fetchall()
+
+        # Na codificação compacta, Produtoras e Diretores são IDs das tabelas de consulta
+        nomes = {tabela: ler_tabela_de_consulta(conn, tabela) for tabela in ("produtoras", "diretores")}
+    finally:
+        conn.close()
+
+    return {
+        movie_id: {
+            "budget": orcamento,
+            "revenue": receita,
+            "runtime": duracao,
+            "status": status,
+            "production_companies": decodificar_nomes(_texto_para_lista(produtoras), nomes["produtoras"]),
+            "director": decodificar_nomes(_texto_para_lista(diretores), nomes["diretores"]),
+            "details_fetched_at": atualizado_em,
+            "traducoes": [
+                {"idioma": idioma, "title": traducoes[2 * i], "overview": traducoes[2 * i + 1]}
+                for i, idioma in enumerate(idiomas)
+            ],
+        }
+        for movie_id, orcamento, receita, duracao, status, produtoras, diretores, atualizado_em, *traducoes in linhas
+    }
+
+
+def ler_tabela_de_consulta(conn: sqlite3.Connection, tabela: str) -> dict[int, str]:
+    """Lê uma tabela de consulta (id, nome) da codificação compacta; vazia se ela não existir."""
+    existe = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone()
+    if existe is None:
+        return {}
+    return dict(conn.execute(f"SELECT id, nome FROM {tabela}").fetchall())
+
+
+def gravar_tabelas_de_consulta(cursor: sqlite3.Cursor, dicionarios: dict[str, pl.DataFrame]):
+    """
+    Grava as tabelas de consulta (id, nome) da codificação compacta. Como os IDs nunca mudam, só entram os nomes novos.
+
+    Raises:
+        sqlite3.IntegrityError: Se um ID ou nome já está no banco com outro par (dicionários montados
+            sem o banco): os IDs já carregados passariam a decodificar para os nomes errados.
+    """
+    for tabela, dicionario in dicionarios.items():
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {tabela} (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE)")
+        banco = pl.DataFrame(
+            cursor.execute(f"SELECT id, nome FROM {tabela}").fetchall(), schema=SCHEMA_DICIONARIO, orient="row"
+        )
+        conflitos = conflitos_dicionario(dicionario.cast(SCHEMA_DICIONARIO), banco)
+        if not conflitos.is_empty():
+            raise sqlite3.IntegrityError(
+                f"A tabela de consulta '{tabela}' não bate com a do banco em {conflitos.height} nome(s) "
+                f"(ex: {conflitos.row(0)}); rode a transformação de novo para montar os dicionários a partir do banco."
+            )
+        cursor.executemany(f"INSERT OR IGNORE INTO {tabela} (id, nome) VALUES (?, ?)", dicionario.iter_rows())
+        print(f" - Tabela de consulta '{tabela}' com {dicionario.height} nomes.")
+
+
+# Linhas por lote no load: só um lote convertido fica em memória por vez
+TAMANHO_LOTE = 50_000
+
+
+def _json_vetorizado(coluna: str, tipo: pl.DataType) -> pl.Expr:
+    """
+    Expressão que converte uma coluna de listas (ou structs) em texto JSON, dentro do Polars.
+    A coluna vai num struct de um campo ({"v": [...]}) e o json_encode dele é recortado para só o valor.
+    """
+    expressao = pl.col(coluna)
+    if isinstance(tipo, pl.List) and isinstance(tipo.inner, (pl.Enum, pl.Categorical)):
+        expressao = expressao.cast(pl.List(pl.String)) # Categorias vão pelo nome
+    json = pl.struct(expressao.alias("v")).struct.json_encode().str.slice(len('{"v":')).str.head(-1)
+    return pl.when(pl.col(coluna).is_not_null()).then(json).alias(coluna)
+
+
+def conversores_sqlite(schema: pl.Schema) -> list[pl.Expr]:
+    """
+    Uma expressão por coluna que deixa os valores prontos para o SQLite, calculadas uma vez só:
+    listas e structs viram JSON, datas viram texto (AAAA-MM-DD), categorias viram o nome e o resto passa direto.
+    """
+    conversores = []
+    for coluna, tipo in schema.items():
+        if isinstance(tipo, (pl.List, pl.Struct)):
+            conversores.append(_json_vetorizado(coluna, tipo))
+        elif tipo == pl.Date or isinstance(tipo, (pl.Enum, pl.Categorical)):
+            conversores.append(pl.col(coluna).cast(pl.String))
+        else:
+            conversores.append(pl.col(coluna))
+    return conversores
+
+
+def lotes_para_sqlite(df: pl.DataFrame, tamanho_lote: int = TAMANHO_LOTE) -> Iterator[Iterator[tuple]]:
+    """Gera os lotes de linhas (tuplas) já convertidas para o SQLite, convertendo um lote por vez."""
+    conversores = conversores_sqlite(df.schema)
+    for inicio in range(0, df.height, tamanho_lote):
+        yield df.slice(inicio, tamanho_lote).select(conversores).iter_rows()
+
+
+def inserir_em_lotes(
+    cursor: sqlite3.Cursor,
+    sql: str,
+    df: pl.DataFrame,
+    tamanho_lote: int = TAMANHO_LOTE,
+    linhas_por_transacao: int = 0,
+) -> int:
+    """
+    Executa `sql` (um INSERT com um ? por coluna de `df`) em lotes de `tamanho_lote` linhas. Devolve quantas linhas foram.
+    Com `linhas_por_transacao`, faz commit a cada essa quantidade de linhas, mesmo que seja menor
+    que o lote (o lote é cortado na divisa da transação); 0 = tudo na transação de quem chama.
+    """
+    por_transacao = linhas_por_transacao or max(df.height, 1)
+    for inicio in range(0, df.height, por_transacao):
+        for lote in lotes_para_sqlite(df.slice(inicio, por_transacao), tamanho_lote):
+            cursor.executemany(sql, lote)
+        if linhas_por_transacao:
+            cursor.connection.commit()
+    return df.height
+
+
+# Perfil de carga em massa (LOAD_BULK): WAL e sincronização em disco só nos checkpoints
+# (um travamento do sistema pode perder as últimas transações, mas não corrompe o banco),
+# cache e mmap maiores e tabelas temporárias na memória
+PRAGMAS_CARGA_MASSA = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -256_000, # Negativo = em KiB (~250 MB)
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# No perfil de carga em massa, loads com pelo menos essa quantidade de linhas gravadas
+# apagam os índices secundários antes e recriam depois (mais rápido que mantê-los linha a linha)
+MIN_LINHAS_RECRIAR_INDICES = 100_000
+
+
+def aplicar_pragmas(conn: sqlite3.Connection, pragmas: dict) -> None:
+    """Aplica os PRAGMAs (ex: PRAGMAS_CARGA_MASSA) na conexão."""
+    for pragma, valor in pragmas.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+
+
+def criar_indices_filmes(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """Cria os índices secundários da tabela de filmes: 'Atualizado_Em' é o filtro do modo incremental."""
+    colunas = {linha[1] for linha in cursor.execute(f"PRAGMA table_info({table_name})")}
+    if "Atualizado_Em" in colunas:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_atualizado_em ON {table_name} (Atualizado_Em)")
+
+
+def remover_indices(cursor: sqlite3.Cursor, tabelas: list[str]) -> list[tuple[str, str]]:
+    """
+    Apaga os índices secundários (criados com CREATE INDEX) das `tabelas`.
+
+    Returns:
+        list[tuple[str, str]]: (nome, SQL de criação) de cada índice apagado, para recriar_indices.
+    """
+    marcadores = ", ".join("?" for _ in tabelas)
+    indices = cursor.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({marcadores})",
+        tabelas,
+    ).fetchall()
+    for nome, _ in indices:
+        cursor.execute(f"DROP INDEX {nome}")
+    return indices
+
+
+def recriar_indices(cursor: sqlite3.Cursor, indices: list[tuple[str, str]]) -> None:
+    """Recria os índices apagados por remover_indices (os que ainda não existirem)."""
+    for nome, sql in indices:
+        existe = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (nome,)).fetchone()
+        if existe is None:
+            cursor.execute(sql)
+
+
+# Coluna com o hash do conteúdo de cada filme, comparado a cada load para só gravar o que mudou
+COLUNA_HASH = "Hash_Conteudo"
+
+
+def hash_conteudo(schema: pl.Schema) -> pl.Expr:
+    """
+    Expressão com o hash (Int64, para caber no INTEGER do SQLite) do conteúdo de cada linha.
+    É calculado sobre os valores já convertidos para o SQLite (veja conversores_sqlite), que não
+    dependem de como as categorias estão codificadas no Polars. O hash do Polars pode mudar entre
+    versões: depois de atualizar o Polars, o primeiro load atualiza todos os filmes uma vez.
+    """
+    return pl.struct(conversores_sqlite(schema)).hash(seed=0).reinterpret(signed=True).alias(COLUNA_HASH)
+
+
+def separar_mudancas(cursor: sqlite3.Cursor, df: pl.DataFrame, table_name: str) -> tuple[pl.DataFrame, dict[str, int]]:
+    """
+    Compara o hash do conteúdo de cada linha com o que está gravado e separa só o que precisa ir para o banco.
+
+    Os hashes gravados são lidos numa consulta só e juntados com os novos no Polars. Filmes
+    gravados antes de existir COLUNA_HASH (hash nulo) contam como atualizados.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor da conexão do load (a tabela já precisa ter COLUNA_HASH).
+        df (pl.DataFrame): Os dados tratados.
+        table_name (str): Nome da tabela de filmes.
+
+    Returns:
+        tuple[pl.DataFrame, dict[str, int]]: As linhas novas ou alteradas (com COLUNA_HASH) e as
+            contagens {"inseridas", "atualizadas", "inalteradas"}.
+    """
+    armazenados = pl.DataFrame(
+        cursor.execute(f"SELECT Id, {COLUNA_HASH} FROM {table_name}").fetchall(),
+        schema={"Id": df.schema["Id"], "_hash_armazenado": pl.Int64},
+        orient="row",
+    ).with_columns(pl.lit(True).alias("_gravado"))
+    comparados = df.with_columns(hash_conteudo(df.schema)).join(armazenados, on="Id", how="left")
+
+    novos = pl.col("_gravado").is_null()
+    inalterados = pl.col(COLUNA_HASH).eq_missing(pl.col("_hash_armazenado")) & ~novos
+    contagens = comparados.select(
+        inseridas=novos.sum(), atualizadas=(~novos & ~inalterados).sum(), inalteradas=inalterados.sum()
+    ).row(0, named=True)
+    return comparados.filter(~inalterados).drop("_hash_armazenado", "_gravado"), contagens
+
+
+def tabela_quarentena(table_name: str) -> str:
+    """Nome da tabela de quarentena de uma tabela de filmes (ex: movies_quarentena)."""
+    return f"{table_name}_quarentena"
+
+
+def gravar_quarentena(db_path: str, table_name: str, df_quarentena: pl.DataFrame, ids_carregados: list[int]):
+    """
+    Grava as linhas em quarentena (dados brutos + motivo) na tabela de quarentena.
+
+    A tabela guarda a última ocorrência de cada filme: quem voltou a falhar tem a linha
+    trocada pela nova, e quem agora foi carregado limpo (`ids_carregados`) sai dela.
+
+    Args:
+        db_path (str): Caminho do banco SQLite.
+        table_name (str): Nome da tabela de filmes (a quarentena é a tabela_quarentena dela).
+        df_quarentena (pl.DataFrame): Linhas em quarentena (veja regras.linhas_em_quarentena).
+        ids_carregados (list[int]): IDs carregados na tabela de filmes nesta execução.
+    """
+    tabela = tabela_quarentena(table_name)
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        colunas_sql = ", ".join(f"{nome} {get_sqlite_type(tipo)}" for nome, tipo in df_quarentena.schema.items())
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {tabela} ({colunas_sql})")
+        adicionar_colunas_faltantes(cursor, df_quarentena, tabela)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_id ON {tabela} (id)")
+
+        substituidos = list(ids_carregados) + df_quarentena["id"].drop_nulls().to_list()
+        cursor.executemany(f"DELETE FROM {tabela} WHERE id = ?", ((movie_id,) for movie_id in substituidos))
+        placeholders = ", ".join("?" for _ in df_quarentena.columns)
+        inserir_em_lotes(
+            cursor, f"INSERT INTO {tabela} ({', '.join(df_quarentena.columns)}) VALUES ({placeholders})", df_quarentena
+        )
+        conn.commit()
+        total = cursor.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+        print(f" - Quarentena: {df_quarentena.height} linha(s) nova(s); '{tabela}' tem {total} no total.")
+    finally:
+        conn.close()
+
+
+# Colunas da lista (informações básicas) que a extração precisa para buscar de novo um filme
+COLUNAS_BASICAS = (
+    "id", "genre_ids", "title", "release_date", "popularity", "vote_average", "vote_count", "overview",
+    "original_title", "original_language", "poster_path", "backdrop_path", "listas",
+)
+
+
+def ler_fila_reprocessamento(db_path: str, table_name: str) -> list[dict]:
+    """
+    Lê da quarentena os filmes cuja busca de detalhes falhou, para a extração tentar de novo.
+
+    Returns:
+        list[dict]: As informações básicas (como vêm das páginas da lista) de cada filme.
+    """
+    if not os.path.exists(db_path):
+        return []
+
+    tabela = tabela_quarentena(table_name)
+    conn = sqlite3.connect(db_path)
+    try:
+        existentes = [linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")]
+        if COLUNA_MOTIVO not in existentes:
+            return []
+        colunas = [coluna for coluna in COLUNAS_BASICAS if coluna in existentes]
+        cursor = conn.execute(
+            f"SELECT {', '.join(colunas)} FROM {tabela} WHERE {COLUNA_MOTIVO} = ? AND id IS NOT NULL",
+            (MOTIVO_FALHA_BUSCA,),
+        )
+        filmes = [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+    finally:
+        conn.close()
+
+    for filme in filmes:
+        for coluna in ("genre_ids", "listas"):
+            if coluna in filme:
+                filme[coluna] = _texto_para_lista(filme[coluna])
+    return filmes
+
+
+def load_data_to_sqlite(
+    df: pl.DataFrame,
+    db_path: str,
+    table_name: str,
+    dicionarios: dict[str, pl.DataFrame] | None = None,
+    tamanho_lote: int = TAMANHO_LOTE,
+    normalizado: bool = False,
+    busca: bool = False,
+    pragmas: dict | None = None,
+    linhas_por_transacao: int = 0,
+    min_linhas_recriar_indices: int | None = None,
+):
+    """
+    Pega um DataFrame do Polars e joga numa tabela do SQLite.
+    Com `dicionarios` (codificação compacta), grava também as tabelas de consulta de produtoras e diretores.
+    Com `normalizado`, atualiza também as dimensões e pontes de gêneros, diretores e produtoras
+    (veja normalizacao.py), na mesma transação.
+    Com `busca`, mantém o índice de busca de texto (FTS5) de títulos e sinopses (veja busca.py):
+    pelos gatilhos, ou reconstruído no fim quando a carga insere boa parte da tabela.
+
+    Só vai para o banco o que mudou (veja separar_mudancas): filmes novos são inseridos, os que
+    mudaram são atualizados no lugar (UPSERT, sem apagar e inserir de novo) e os que continuam
+    iguais não são tocados.
+
+    As conversões (listas para JSON, datas e categorias para texto) rodam no Polars, coluna a
+    coluna, e as linhas vão para o executemany em lotes de `tamanho_lote`: a memória extra
+    fica em um lote, qualquer que seja o tamanho do DataFrame.
+
+    Para cargas grandes (perfil LOAD_BULK), `pragmas` (ex: PRAGMAS_CARGA_MASSA) ajustam a conexão,
+    `linhas_por_transacao` divide os filmes em várias transações (uma falha no meio deixa os lotes
+    já confirmados; como só o que mudou é gravado, rodar de novo termina o resto) e, se forem
+    gravadas pelo menos `min_linhas_recriar_indices` linhas, os índices secundários são apagados
+    antes e recriados depois, seguidos de ANALYZE. Sem isso, tudo vai numa transação só.
+
+    Returns:
+        dict[str, int]: Quantas linhas foram inseridas, atualizadas e deixadas como estavam
+            ("inseridas", "atualizadas", "inalteradas").
+
+    Raises:
+        sqlite3.Error: Se o load falhar (depois de desfazer a transação aberta).
+    """
     conn = None
     try:
         conn = sqlite3.connect(db_path)
+        if pragmas:
+            aplicar_pragmas(conn, pragmas)
         cursor = conn.cursor()
 
-        # Cria a tabela (se não existir)
-        create_table_sql = create_table_schema(df, table_name)
+        # Cria a tabela (se não existir), já com a coluna do hash do conteúdo
+        esquema = df.head(0).with_columns(pl.lit(None, dtype=pl.Int64).alias(COLUNA_HASH))
+        create_table_sql = create_table_schema(esquema, table_name)
         print(f"\n--- Criando ou verificando tabela '{table_name}' ---")
         print(create_table_sql)
         cursor.execute(create_table_sql)
+        adicionar_colunas_faltantes(cursor, esquema, table_name)
+        criar_indices_filmes(cursor, table_name)
+        if busca and criar_indice_busca(cursor, table_name):
+            print(f" - Índice de busca de texto criado para '{table_name}'.")
+        tabelas = [table_name]
+        normalizado_novo = normalizado and not cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'movie_genres'"
+        ).fetchone()
+        if normalizado:
+            criar_schema_normalizado(cursor, table_name)
+            tabelas += [ponte for _, ponte, _ in RELACOES.values()]
+        if dicionarios:
+            gravar_tabelas_de_consulta(cursor, dicionarios)
         conn.commit()
         print(f" - Tabela '{table_name}' pronta.")
 
-        # Agora, insere os dados
-        columns = ", ".join(df.columns)
-        placeholders = ", ".join(["?" for _ in df.columns])
-        insert_sql = f"INSERT OR REPLACE INTO {table_name} ({columns}) VALUES ({placeholders})"
-
-        # Ajusta os dados pra inserir direitinho
-        data_to_insert = []
-        for row in df.iter_rows():
-            processed_row = []
-            for i, item in enumerate(row):
-                col_name = df.columns[i]
-                col_dtype = df.schema[col_name]
-                if isinstance(col_dtype, pl.List):
-                    processed_row.append(str(item)) # Lista vira string
-                elif col_dtype == pl.Date:
-                    processed_row.append(str(item) if item else None) # Data vira string
-                else:
-                    processed_row.append(item)
-            data_to_insert.append(tuple(processed_row))
-
-        print(f"--- Carregando {len(data_to_insert)} linhas para '{table_name}' ---")
-        cursor.executemany(insert_sql, data_to_insert)
+        # Agora, insere os filmes novos e atualiza os que mudaram
+        mudancas, contagens = separar_mudancas(cursor, df, table_name)
+        columns = ", ".join(mudancas.columns)
+        placeholders = ", ".join(["?" for _ in mudancas.columns])
+        atualizacoes = ", ".join(f"{coluna} = excluded.{coluna}" for coluna in mudancas.columns if coluna != "Id")
+        upsert_sql = (
+            f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT (Id) DO UPDATE SET {atualizacoes}"
+        )
+
+        indices = []
+        if min_linhas_recriar_indices is not None and mudancas.height >= min_linhas_recriar_indices:
+            indices = remover_indices(cursor, tabelas)
+            conn.commit()
+            print(f" - {len(indices)} índice(s) secundário(s) removido(s) durante a carga.")
+        total = cursor.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0] + contagens["inseridas"]
+        reconstruir_busca = busca and contagens["inseridas"] and contagens["inseridas"] >= FRACAO_RECONSTRUIR_BUSCA * total
+        if reconstruir_busca:
+            remover_gatilhos_busca(cursor, table_name)
+            conn.commit()
+
+        print(f"--- Carregando {mudancas.height} de {df.height} linhas para '{table_name}' (lotes de {tamanho_lote}) ---")
+        try:
+            inserir_em_lotes(cursor, upsert_sql, mudancas, tamanho_lote, linhas_por_transacao)
+            if normalizado:
+                # Na primeira vez, as pontes recebem todos os filmes; depois, só os que mudaram
+                ligacoes = gravar_normalizado(cursor, df if normalizado_novo else mudancas, dicionarios)
+                print(f" - Schema normalizado atualizado: {ligacoes}.")
+            conn.commit()
+        finally:
+            if indices or reconstruir_busca:
+                conn.rollback() # Sem efeito se deu tudo certo; se não, desfaz o lote pela metade
+            if indices:
+                recriar_indices(cursor, indices)
+                print(f" - {len(indices)} índice(s) secundário(s) recriado(s).")
+            if reconstruir_busca:
+                criar_indice_busca(cursor, table_name)
+                reconstruir_indice_busca(cursor, table_name)
+                print(" - Índice de busca de texto reconstruído.")
+            conn.commit()
+        if indices:
+            if busca and not reconstruir_busca:
+                otimizar_indice_busca(cursor, table_name)
+            cursor.execute("ANALYZE")
+        elif pragmas:
+            cursor.execute("PRAGMA optimize")
         conn.commit()
-        print(f" - Dados carregados para '{table_name}'.")
+        print(
+            f" - Dados carregados para '{table_name}': {contagens['inseridas']} inserida(s), "
+            f"{contagens['atualizadas']} atualizada(s), {contagens['inalteradas']} inalterada(s)."
+        )
+        return contagens
 
     except sqlite3.Error as e:
         print(f"Deu ruim ao carregar os dados: {e}")
         if conn:
             conn.rollback() # Desfaz se deu erro
+        raise # A etapa falha (e não é memoizada)
     finally:
         if conn:
             conn.close()
@@ -1,63 +1,574 @@
 import os
+import sys
 from dotenv import load_dotenv
-import polars as pl
-from popular_movies import *
-from transform import transform
-from load import load_data_to_sqlite
+from instrumentation import etapa, etapa_atual, execucao, medir
 
-def main():
+# As dependências pesadas (polars, tmdbsimple, requests) são importadas dentro
+# de cada etapa, para que um passo isolado (ex: só o load) não pague por elas.
+
+
+def carregar_configuracao(resume: bool = False) -> dict:
     """
-    Roda o processo todo: pega os dados dos filmes, arruma eles e salva no banco.
+    Lê as configurações do .env (ou usa os padrões) e devolve num dicionário.
     """
     # Carrega as paradas do arquivo .env
     load_dotenv()
-    
-    # Configurações que a gente pega do .env ou usa um padrão
-    # Número de páginas pra buscar lá na API
-    NUM_PAGES = int(os.getenv("NUM_PAGES", "1"))
-    # Idioma que a gente quer os dados
-    LANGUAGE = os.getenv("LANGUAGE", "pt-BR")
-    # Nome do arquivo Parquet onde vai o resultado final
-    OUTPUT_PARQUET = os.getenv("DF_FINAL", "filmes_tmdb_transformados.parquet")
-    # Caminho do arquivo do banco de dados SQLite
-    DB_PATH = os.getenv("DB_PATH", "movies.db")
-    # Nome da tabela que vai ser criada no banco
-    TABLE_NAME = os.getenv("TABLE_NAME", "movies")
 
+    return {
+        # Número de páginas pra buscar lá na API
+        "NUM_PAGES": int(os.getenv("NUM_PAGES", "1")),
+        # Listas do TMDB de onde vêm os filmes (popular, top_rated, now_playing, upcoming)
+        "LISTAS": [lista.strip() for lista in os.getenv("LISTAS", "popular").split(",") if lista.strip()],
+        # Idioma que a gente quer os dados
+        "LANGUAGE": os.getenv("LANGUAGE", "pt-BR"),
+        # Idiomas extras de título e sinopse (ex: "en-US,es-ES"), todos na mesma chamada de detalhes
+        "IDIOMAS": [idioma.strip() for idioma in os.getenv("IDIOMAS", "").split(",") if idioma.strip()],
+        # Quantas requisições de detalhes podem rodar ao mesmo tempo (teto, no modo adaptativo)
+        "MAX_WORKERS": int(os.getenv("MAX_WORKERS", "8")),
+        # Limite global de requisições por segundo (um único token bucket); no modo adaptativo é só o ponto de partida
+        "REQUESTS_PER_SECOND": float(os.getenv("REQUESTS_PER_SECOND", "20")),
+        # Controle adaptativo (AIMD) de concorrência e taxa, e o teto de requisições por segundo
+        "ADAPTATIVO": os.getenv("ADAPTATIVO", "1") == "1",
+        "MAX_REQUESTS_PER_SECOND": float(os.getenv("MAX_REQUESTS_PER_SECOND", "50")),
+        # Cache local das respostas de detalhes (vazio desliga o cache)
+        "CACHE_PATH": os.getenv("CACHE_PATH", "cache_detalhes.db"),
+        "CACHE_TTL_DIAS": float(os.getenv("CACHE_TTL_DIAS", "30")),
+        "CACHE_MAX_ENTRADAS": int(os.getenv("CACHE_MAX_ENTRADAS", "100000")),
+        # IDs que devem ser buscados de novo na API mesmo estando no cache (ex: "550,680")
+        "REFRESH_IDS": {int(i) for i in os.getenv("REFRESH_IDS", "").split(",") if i.strip()},
+        # Nome do arquivo Parquet onde vão os dados brutos
+        "OUTPUT_PARQUET": os.getenv("DF_FINAL", "filmes_tmdb_transformados.parquet"),
+        # Nome do arquivo Parquet onde vão os dados já tratados (entrada do load)
+        "TRANSFORMED_PARQUET": os.getenv("TRANSFORMED_PARQUET", "filmes_tmdb_tratados.parquet"),
+        # Caminho do arquivo do banco de dados SQLite
+        "DB_PATH": os.getenv("DB_PATH", "movies.db"),
+        # Nome da tabela que vai ser criada no banco
+        "TABLE_NAME": os.getenv("TABLE_NAME", "movies"),
+        # Linhas por lote no load (só um lote convertido fica em memória por vez)
+        "LOAD_BATCH_SIZE": int(os.getenv("LOAD_BATCH_SIZE", "50000")),
+        # Perfil de carga em massa (WAL, PRAGMAs de load.PRAGMAS_CARGA_MASSA, índices recriados no fim
+        # das cargas com pelo menos LOAD_REBUILD_INDEX_MIN linhas e ANALYZE) e linhas por transação
+        # (0 = tudo numa transação só). Veja bench_load.py para escolher os valores
+        "LOAD_BULK": os.getenv("LOAD_BULK", "0") == "1",
+        "LOAD_TRANSACTION_ROWS": int(os.getenv("LOAD_TRANSACTION_ROWS", "0")),
+        "LOAD_REBUILD_INDEX_MIN": int(os.getenv("LOAD_REBUILD_INDEX_MIN", "100000")),
+        # Também grava as dimensões (genres, people, companies) e as pontes com índices (normalizacao.py)
+        "NORMALIZADO": os.getenv("NORMALIZADO", "0") == "1",
+        # Índice de busca de texto (FTS5) em títulos e sinopses, mantido pelo load (busca.py)
+        "BUSCA_TEXTO": os.getenv("BUSCA_TEXTO", "1") == "1",
+        # Modo incremental: só busca detalhes de filmes novos ou desatualizados no banco
+        "INCREMENTAL": os.getenv("INCREMENTAL", "0") == "1",
+        # Idade máxima (em dias) dos detalhes reaproveitados do banco no modo incremental
+        "STALE_DAYS": float(os.getenv("STALE_DAYS", "7")),
+        # Modo streaming: grava os dados brutos em partes Parquet enquanto extrai
+        "STREAMING": os.getenv("STREAMING", "0") == "1" or resume,
+        # Dados brutos de entrada da transformação, se não forem os da última extração:
+        # um arquivo Parquet, um padrão (glob) ou uma pasta de partes
+        "RAW_INPUT": os.getenv("RAW_INPUT", ""),
+        # Transformação out-of-core: lê os brutos em streaming e grava com sink_parquet, sem juntar tudo na memória
+        "TRANSFORM_STREAMING": os.getenv("TRANSFORM_STREAMING", "0") == "1",
+        # Pasta das partes Parquet brutas e número de filmes por parte
+        "RAW_PARTS_DIR": os.getenv("RAW_PARTS_DIR", "raw_parts"),
+        "BATCH_SIZE": int(os.getenv("BATCH_SIZE", "1000")),
+        # Validade (em dias) do cache local de gêneros e opção para forçar a atualização
+        "GENEROS_TTL_DIAS": float(os.getenv("GENEROS_TTL_DIAS", "30")),
+        "ATUALIZAR_GENEROS": os.getenv("ATUALIZAR_GENEROS", "0") == "1",
+        # Codificação compacta dos dados tratados (Enum/Categorical e IDs com tabelas de consulta)
+        "COMPACTO": os.getenv("COMPACTO", "0") == "1",
+        "DICIONARIOS_DIR": os.getenv("DICIONARIOS_DIR", "dicionarios"),
+        # Relatório de qualidade dos dados brutos, limites (JSON no formato de data_quality.LIMITES_PADRAO)
+        # e se uma reprovação deve barrar o load
+        "QUALITY_REPORT": os.getenv("QUALITY_REPORT", "relatorio_qualidade.json"),
+        "LIMITES_QUALIDADE": os.getenv("LIMITES_QUALIDADE", ""),
+        "QUALITY_GATE": os.getenv("QUALITY_GATE", "0") == "1",
+        # Linhas brutas que falham nas regras rígidas (regras.py) vão para este Parquet e para a
+        # tabela <TABLE_NAME>_quarentena; as de busca que falhou voltam para a próxima extração
+        "QUARANTINE_PARQUET": os.getenv("QUARANTINE_PARQUET", "filmes_tmdb_quarentena.parquet"),
+        "REPROCESSAR_QUARENTENA": os.getenv("REPROCESSAR_QUARENTENA", "1") == "1",
+        # Dataset particionado por ano de lançamento (e, opcionalmente, idioma) com os dados tratados;
+        # vazio desliga. Cada execução só reescreve as partições que tocou
+        "DATASET_DIR": os.getenv("DATASET_DIR", ""),
+        "PARTICIONAR_POR_IDIOMA": os.getenv("PARTICIONAR_POR_IDIOMA", "0") == "1",
+        "PARQUET_ROW_GROUP": int(os.getenv("PARQUET_ROW_GROUP", "64000")),
+        "PARQUET_COMPRESSAO": os.getenv("PARQUET_COMPRESSAO", "zstd"),
+        # Histórico dos esboços de cada execução (vazio desliga o drift), quantas execuções
+        # anteriores entram na comparação e o mínimo delas para começar a alertar
+        "HISTORICO_QUALIDADE": os.getenv("HISTORICO_QUALIDADE", "historico_qualidade.db"),
+        "DRIFT_JANELA": int(os.getenv("DRIFT_JANELA", "14")),
+        # (pelo menos 2: com uma execução só não há desvio padrão para comparar)
+        "DRIFT_MIN_EXECUCOES": max(int(os.getenv("DRIFT_MIN_EXECUCOES", "3")), 2),
+        # Relatório JSON de cada execução (tempo, linhas, memória e contadores por etapa); vazio desliga
+        "RELATORIO_PATH": os.getenv("RELATORIO_PATH", "relatorio_execucao.json"),
+        # Memória das etapas transform e load (chave = hash das entradas, do código e das configurações):
+        # se nada mudou desde a última execução, a etapa reaproveita as saídas. Vazio desliga
+        "MEMO_PATH": os.getenv("MEMO_PATH", "memo_etapas.json"),
+    }
+
+
+def idiomas_extras(config: dict) -> list[str]:
+    """Idiomas de IDIOMAS que não são o idioma principal (LANGUAGE), sem repetições."""
+    return [idioma for idioma in dict.fromkeys(config["IDIOMAS"]) if idioma != config["LANGUAGE"]]
+
+
+@etapa("extract")
+def extrair(config: dict, resume: bool = False) -> bool:
+    """
+    Etapa de extração: busca os filmes das listas configuradas e salva os dados brutos
+    (um Parquet único ou, no modo streaming, partes Parquet).
+
+    Returns:
+        bool: True se veio algum filme da API.
+    """
+    from cache import DetailCache
+    from checkpoint import CheckpointJournal
+    from extraction import listar_partes_parquet, obter_filmes_tmdb, salvar_filmes_tmdb_em_partes
+    from load import ler_detalhes_armazenados, ler_fila_reprocessamento
+
+    detalhes_conhecidos = None
+    if config["INCREMENTAL"]:
+        detalhes_conhecidos = ler_detalhes_armazenados(
+            config["DB_PATH"], config["TABLE_NAME"], config["STALE_DAYS"], idiomas=idiomas_extras(config)
+        )
+        for movie_id in config["REFRESH_IDS"]:
+            detalhes_conhecidos.pop(movie_id, None)
+        print(f" - Modo incremental: {len(detalhes_conhecidos)} filmes já atualizados no banco serão reaproveitados.")
+
+    reprocessar = None
+    if config["REPROCESSAR_QUARENTENA"]:
+        reprocessar = ler_fila_reprocessamento(config["DB_PATH"], config["TABLE_NAME"])
+        if reprocessar:
+            print(f" - {len(reprocessar)} filme(s) na quarentena por falha na busca serão buscados de novo.")
+
+    cache = None
+    if config["CACHE_PATH"]:
+        cache = DetailCache(
+            config["CACHE_PATH"],
+            ttl_segundos=config["CACHE_TTL_DIAS"] * 24 * 3600,
+            max_entradas=config["CACHE_MAX_ENTRADAS"],
+        )
+
+    opcoes_extracao = dict(
+        language=config["LANGUAGE"],
+        idiomas=idiomas_extras(config),
+        max_workers=config["MAX_WORKERS"],
+        requests_per_second=config["REQUESTS_PER_SECOND"],
+        adaptativo=config["ADAPTATIVO"],
+        max_requests_per_second=config["MAX_REQUESTS_PER_SECOND"],
+        cache=cache,
+        forcar_atualizacao=config["REFRESH_IDS"],
+        detalhes_conhecidos=detalhes_conhecidos,
+        reprocessar=reprocessar,
+    )
+    raw_parts_dir = config["RAW_PARTS_DIR"]
+
+    try:
+        if config["STREAMING"]:
+            checkpoint = CheckpointJournal(os.path.join(raw_parts_dir, "_checkpoint.jsonl"))
+            partes_registradas = {os.path.normpath(parte) for parte in checkpoint.partes}
+            if resume:
+                print(f" - Retomando: {len(checkpoint.paginas)} páginas e {len(checkpoint.ids_concluidos)} filmes já concluídos.")
+            else:
+                checkpoint.limpar()
+                partes_registradas = set()
+            # Partes fora do diário são de outra execução (ou ficaram pela metade) e não podem se misturar
+            for parte_antiga in listar_partes_parquet(raw_parts_dir):
+                if os.path.normpath(parte_antiga) not in partes_registradas:
+                    os.remove(parte_antiga)
+            partes = salvar_filmes_tmdb_em_partes(
+                config["LISTAS"],
+                config["NUM_PAGES"],
+                raw_parts_dir,
+                tamanho_lote=config["BATCH_SIZE"],
+                checkpoint=checkpoint,
+                **opcoes_extracao,
+            )
+        else:
+            df = obter_filmes_tmdb(config["LISTAS"], config["NUM_PAGES"], **opcoes_extracao)
+    finally:
+        if cache is not None:
+            print(f" - Cache de detalhes: {cache.estatisticas()}")
+            cache.fechar()
+
+    if config["STREAMING"]:
+        if not partes:
+            return False
+        etapa_atual().linhas_saida = contar_linhas(partes)
+        print(f" - {len(partes)} partes brutas salvas em: {raw_parts_dir}.")
+        return True
+
+    if df.is_empty():
+        return False
+
+    etapa_atual().linhas_saida = df.shape[0]
+    print(f" - {df.shape[0]} filmes encontrados.")
+
+    # Salvar os dados brutos num arquivo Parquet (tipo um backup)
+    df.write_parquet(config["OUTPUT_PARQUET"])
+    print(f" - Dados brutos salvos em: {config['OUTPUT_PARQUET']}.")
+    return True
+
+
+def contar_linhas(arquivos) -> int:
+    """Número de linhas de um ou mais arquivos Parquet, lido só dos metadados."""
+    import polars as pl
+
+    return pl.scan_parquet(arquivos).select(pl.len()).collect().item()
+
+
+def caminho_dados_brutos(config: dict) -> str:
+    """
+    Onde estão os dados brutos: RAW_INPUT, se configurado (arquivo, glob ou pasta de partes),
+    ou o que a extração gravou (as partes no modo streaming ou o Parquet único).
+    """
+    if config["RAW_INPUT"]:
+        entrada = config["RAW_INPUT"]
+        if os.path.isdir(entrada):
+            entrada = os.path.join(entrada, "*.parquet")
+        return entrada
+    if config["STREAMING"]:
+        return os.path.join(config["RAW_PARTS_DIR"], "part-*.parquet")
+    return config["OUTPUT_PARQUET"]
+
+
+def ler_dados_brutos(config: dict):
+    """Abre (lazy) os dados brutos (veja caminho_dados_brutos)."""
+    import polars as pl
+
+    return pl.scan_parquet(caminho_dados_brutos(config))
+
+
+def arquivos_dados_brutos(config: dict) -> list[str]:
+    """Os arquivos dos dados brutos, em ordem (o glob expandido)."""
+    import glob
+
+    caminho = caminho_dados_brutos(config)
+    return sorted(glob.glob(caminho)) if glob.has_magic(caminho) else [caminho]
+
+
+def abrir_memo(config: dict):
+    """A memória das etapas (memoizacao.MemoEtapas) em MEMO_PATH, ou None se a memoização estiver desligada."""
+    if not config["MEMO_PATH"]:
+        return None
+    from memoizacao import MemoEtapas
+
+    return MemoEtapas(config["MEMO_PATH"])
+
+
+def saidas_transformacao(config: dict) -> list[str]:
+    """Os arquivos gravados pela transformação (as tabelas de consulta só no modo compacto)."""
+    saidas = [config["TRANSFORMED_PARQUET"], config["QUARANTINE_PARQUET"]]
+    if config["COMPACTO"]:
+        from encoding import DICIONARIOS, caminho_dicionario
+
+        saidas += [caminho_dicionario(config["DICIONARIOS_DIR"], coluna) for coluna in DICIONARIOS]
+    return saidas
+
+
+@etapa("transform")
+def transformar(config: dict):
+    """
+    Etapa de transformação: trata os dados brutos e grava o resultado em TRANSFORMED_PARQUET.
+    As linhas que falham nas regras rígidas (regras.py) vão, ainda brutas e com o motivo,
+    para QUARANTINE_PARQUET; as duas saídas saem da mesma leitura dos dados brutos.
+
+    Com TRANSFORM_STREAMING, o plano roda no engine de streaming do Polars e vai direto
+    para os arquivos (sink_parquet), em pedaços: a memória não cresce com o tamanho dos dados.
+
+    Com MEMO_PATH, se os dados brutos (pelo conteúdo), o código e as configurações são os
+    mesmos da última transformação e as saídas dela continuam lá, nada roda de novo.
+
+    Returns:
+        pl.DataFrame | None: Os dados tratados, ou None no modo streaming ou quando as saídas
+            anteriores foram reaproveitadas (aí eles ficam só no arquivo).
+    """
+    import datetime
+    import polars as pl
+    from instrumentation import contar
+    from regras import linhas_em_quarentena, marcar_quarentena, resumo_quarentena
+    from transform import transform
+    from utils import obter_mapeamento_generos
+
+    dados_brutos = ler_dados_brutos(config)
+    etapa_atual().linhas_entrada = dados_brutos.select(pl.len()).collect().item()
+    genero_mapa = obter_mapeamento_generos(
+        config["LANGUAGE"], ttl_dias=config["GENEROS_TTL_DIAS"], forcar_atualizacao=config["ATUALIZAR_GENEROS"]
+    )
+
+    memo, chave = abrir_memo(config), None
+    if memo is not None:
+        with medir("hash das entradas"):
+            chave = memo.chave(
+                arquivos_dados_brutos(config),
+                ["main", "transform", "data_quality", "regras", "encoding", "utils"],
+                {
+                    "idiomas": idiomas_extras(config),
+                    "compacto": config["COMPACTO"],
+                    "generos": genero_mapa,
+                    "saidas": saidas_transformacao(config),
+                    "dataset": [config["DATASET_DIR"], config["PARTICIONAR_POR_IDIOMA"]],
+                },
+            )
+        if memo.reaproveitavel("transform", chave):
+            return reaproveitar_etapa("transform", config["TRANSFORMED_PARQUET"])
+
+    with medir("plano"):
+        marcados = marcar_quarentena(dados_brutos)
+        transformed_lf = transform(marcados, genero_mapa, idiomas=idiomas_extras(config))
+        agora = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        quarentena_lf = linhas_em_quarentena(marcados, agora)
+    if config["COMPACTO"]:
+        from encoding import codificar_compacto
+
+        with medir("codificacao compacta"):
+            transformed_lf = codificar_compacto(
+                transformed_lf, genero_mapa, config["DICIONARIOS_DIR"], config["DB_PATH"]
+            )
+
+    destino, destino_quarentena = config["TRANSFORMED_PARQUET"], config["QUARANTINE_PARQUET"]
+    if config["TRANSFORM_STREAMING"]:
+        with medir("execucao + escrita (streaming)") as medicao:
+            # Um só plano com as duas saídas: os dados brutos são lidos uma vez
+            pl.collect_all(
+                [
+                    transformed_lf.sink_parquet(destino + ".tmp", lazy=True),
+                    quarentena_lf.sink_parquet(destino_quarentena + ".tmp", lazy=True),
+                ],
+                engine="streaming",
+            )
+            os.replace(destino + ".tmp", destino)
+            os.replace(destino_quarentena + ".tmp", destino_quarentena)
+            linhas = medicao.linhas_saida = contar_linhas(destino)
+        etapa_atual().linhas_saida = linhas
+        df_quarentena = pl.read_parquet(destino_quarentena)
+        contar("quarentena.linhas", df_quarentena.height)
+        resumo_quarentena(df_quarentena)
+        print(f" - Transformação feita em streaming. Ficamos com {linhas} linhas.")
+        print(f" - Dados tratados salvos em: {destino}.")
+        registrar_etapa(memo, "transform", chave, saidas_transformacao(config) + atualizar_dataset(config))
+        return None
+
+    # Pega o resultado final da transformação (e a quarentena, na mesma leitura)
+    with medir("execucao") as medicao:
+        df_transformed, df_quarentena = pl.collect_all([transformed_lf, quarentena_lf])
+        medicao.linhas_saida = df_transformed.shape[0]
+    with medir("escrita", linhas_entrada=df_transformed.shape[0]):
+        df_transformed.write_parquet(destino)
+        df_quarentena.write_parquet(destino_quarentena)
+    etapa_atual().linhas_saida = df_transformed.shape[0]
+    contar("quarentena.linhas", df_quarentena.height)
+    resumo_quarentena(df_quarentena)
+    print(f" - Transformação feita. Ficamos com {df_transformed.shape[0]} linhas.")
+    print(f" - Dados tratados salvos em: {destino}.")
+    registrar_etapa(memo, "transform", chave, saidas_transformacao(config) + atualizar_dataset(config))
+    return df_transformed
+
+
+def atualizar_dataset(config: dict) -> list[str]:
+    """
+    Com DATASET_DIR, atualiza o dataset particionado com o que a transformação gravou
+    (só as partições tocadas são reescritas).
+
+    Returns:
+        list[str]: Os arquivos de partição do dataset (vazia se ele estiver desligado).
+    """
+    if not config["DATASET_DIR"]:
+        return []
+    from dataset import gravar_particionado, listar_particoes
+    from instrumentation import contar
+
+    with medir("dataset particionado"):
+        resultado = gravar_particionado(
+            config["TRANSFORMED_PARQUET"],
+            config["DATASET_DIR"],
+            por_idioma=config["PARTICIONAR_POR_IDIOMA"],
+            row_group_size=config["PARQUET_ROW_GROUP"],
+            compressao=config["PARQUET_COMPRESSAO"],
+        )
+    contar("dataset.particoes_reescritas", resultado["reescritas"])
+    print(
+        f" - Dataset particionado em {config['DATASET_DIR']}: {resultado['reescritas']} partição(ões) reescrita(s), "
+        f"{resultado['removidas']} removida(s), {resultado['total']} no total."
+    )
+    return listar_particoes(config["DATASET_DIR"])
+
+
+def reaproveitar_etapa(nome: str, saida_principal: str) -> None:
+    """Marca a etapa atual como reaproveitada da memória (no relatório da execução) e avisa."""
+    from instrumentation import contar
+
+    etapa_atual().memo = "reaproveitada"
+    contar("memo.reaproveitadas")
+    if saida_principal.endswith(".parquet"):
+        etapa_atual().linhas_saida = contar_linhas(saida_principal)
+    print(f" - Nada mudou desde a última execução de '{nome}': saídas reaproveitadas ({saida_principal}).")
+
+
+def registrar_etapa(memo, nome: str, chave: str | None, saidas: list[str]) -> None:
+    """Guarda na memória a execução da etapa que acabou de rodar (se a memoização estiver ligada)."""
+    if memo is None:
+        return
+    etapa_atual().memo = "executada"
+    memo.registrar(nome, chave, saidas)
+
+
+def explicar_transformacao(config: dict, perfil: bool = True) -> None:
+    """
+    Mostra o plano otimizado da transformação sobre os dados brutos e, com `perfil=True`,
+    roda o plano e mostra o tempo de cada nó. Não grava nada.
+    """
+    from transform import explicar_plano, transform
+    from utils import obter_mapeamento_generos
+
+    genero_mapa = obter_mapeamento_generos(config["LANGUAGE"], ttl_dias=config["GENEROS_TTL_DIAS"])
+    explicar_plano(transform(ler_dados_brutos(config), genero_mapa, idiomas=idiomas_extras(config)), perfil=perfil)
+
+
+@etapa("load")
+def carregar(config: dict, df_transformed=None, relatorio: dict | None = None) -> None:
+    """
+    Etapa de carregamento: joga os dados tratados no banco SQLite.
+    Sem `df_transformed`, lê o Parquet gravado pela transformação.
+    Com QUALITY_GATE, não carrega nada se a verificação de qualidade reprovar (usa o `relatorio`
+    já calculado nesta execução ou, sem ele, roda a verificação antes).
+    As linhas em quarentena (QUARANTINE_PARQUET) vão para a tabela de quarentena, não para a de filmes.
+    Com MEMO_PATH, se as saídas da transformação (pelo conteúdo) são as mesmas do último load
+    e o banco não mudou desde então, nada é carregado de novo.
+    """
+    import polars as pl
+    from data_quality import QualidadeReprovada
+    from instrumentation import contar
+    from load import PRAGMAS_CARGA_MASSA, gravar_quarentena, load_data_to_sqlite
+
+    memo, chave = abrir_memo(config), None
+    if memo is not None:
+        with medir("hash das entradas"):
+            chave = memo.chave(
+                saidas_transformacao(config),
+                ["main", "load", "encoding", "regras", "normalizacao", "busca"],
+                {
+                    "db": config["DB_PATH"],
+                    "tabela": config["TABLE_NAME"],
+                    "compacto": config["COMPACTO"],
+                    "normalizado": config["NORMALIZADO"],
+                    "busca": config["BUSCA_TEXTO"],
+                },
+            )
+        if memo.reaproveitavel("load", chave):
+            return reaproveitar_etapa("load", config["DB_PATH"])
+
+    if config["QUALITY_GATE"]:
+        relatorio = relatorio or verificar_qualidade(config)
+        if not relatorio["aprovado"]:
+            raise QualidadeReprovada(relatorio)
+
+    if df_transformed is None:
+        df_transformed = pl.read_parquet(config["TRANSFORMED_PARQUET"])
+    etapa_atual().linhas_entrada = df_transformed.shape[0]
+
+    dicionarios = None
+    if config["COMPACTO"]:
+        from encoding import carregar_dicionarios
+
+        dicionarios = carregar_dicionarios(config["DICIONARIOS_DIR"])
+
+    contagens = load_data_to_sqlite(
+        df_transformed,
+        config["DB_PATH"],
+        config["TABLE_NAME"],
+        dicionarios,
+        tamanho_lote=config["LOAD_BATCH_SIZE"],
+        normalizado=config["NORMALIZADO"],
+        busca=config["BUSCA_TEXTO"],
+        pragmas=PRAGMAS_CARGA_MASSA if config["LOAD_BULK"] else None,
+        linhas_por_transacao=config["LOAD_TRANSACTION_ROWS"],
+        min_linhas_recriar_indices=config["LOAD_REBUILD_INDEX_MIN"] if config["LOAD_BULK"] else None,
+    )
+    print(f" - Dados carregados no banco: {config['DB_PATH']}, tabela: {config['TABLE_NAME']}.")
+    for situacao, quantidade in contagens.items():
+        contar(f"load.{situacao}", quantidade)
+
+    if os.path.exists(config["QUARANTINE_PARQUET"]):
+        gravar_quarentena(
+            config["DB_PATH"],
+            config["TABLE_NAME"],
+            pl.read_parquet(config["QUARANTINE_PARQUET"]),
+            df_transformed["Id"].to_list(),
+        )
+    registrar_etapa(memo, "load", chave, [config["DB_PATH"]])
+
+
+@etapa("quality")
+def verificar_qualidade(config: dict) -> dict:
+    """
+    Etapa de qualidade: calcula o relatório de qualidade dos dados brutos numa única leitura,
+    mostra o resumo e grava o JSON em QUALITY_REPORT. Com HISTORICO_QUALIDADE, compara o esboço
+    dos dados com o das últimas execuções (drift) e guarda o desta no histórico.
+
+    Returns:
+        dict: O relatório (veja data_quality.relatorio_qualidade); "aprovado" diz se passou nos limites.
+    """
+    from data_quality import (
+        carregar_limites,
+        imprimir_relatorio_qualidade,
+        relatorio_qualidade,
+        salvar_relatorio_qualidade,
+    )
+
+    relatorio = relatorio_qualidade(ler_dados_brutos(config), carregar_limites(config["LIMITES_QUALIDADE"]))
+    etapa_atual().linhas_entrada = relatorio["linhas"]
+    imprimir_relatorio_qualidade(relatorio)
+    if config["HISTORICO_QUALIDADE"]:
+        from drift import acompanhar_drift, imprimir_alertas_drift
+
+        relatorio["drift"] = acompanhar_drift(
+            relatorio, config["HISTORICO_QUALIDADE"], config["DRIFT_JANELA"], config["DRIFT_MIN_EXECUCOES"]
+        )
+        imprimir_alertas_drift(relatorio["drift"])
+    if config["QUALITY_REPORT"]:
+        salvar_relatorio_qualidade(relatorio, config["QUALITY_REPORT"])
+        print(f" - Relatório de qualidade salvo em: {config['QUALITY_REPORT']}.")
+    return relatorio
+
+
+def main(resume: bool = False):
+    """
+    Roda o processo todo: pega os dados dos filmes, arruma eles e salva no banco.
+
+    Com `resume=True`, retoma uma extração interrompida a partir do diário de
+    checkpoint (sempre no modo streaming), pulando páginas e filmes já concluídos.
+    """
+    config = carregar_configuracao(resume=resume)
+    with execucao("run", config["RELATORIO_PATH"]):
+        _executar_etl(config, resume)
+
+
+def _executar_etl(config: dict, resume: bool) -> None:
     print("Começando o processo todo (ETL)...")
 
-    # 1. Extração: Buscar os dados dos filmes mais populares
+    # 1. Extração: Buscar os dados dos filmes (por padrão, os mais populares)
     print("\n--- Hora de Extrair os Dados ---")
-    df = get_popular_movies_data(num_pages=NUM_PAGES, language=LANGUAGE)
-    
-    if df.is_empty():
+    if not extrair(config, resume=resume):
         print("Ih, não veio nada da API. Parando por aqui.")
         return
-    
-    print(f" - {df.shape[0]} filmes encontrados.")
 
-    # 2. Salvar os dados brutos num arquivo Parquet (tipo um backup)
-    df.write_parquet(OUTPUT_PARQUET)
-    print(f" - Dados brutos salvos em: {OUTPUT_PARQUET}.")
+    # 2. Qualidade: o mesmo relatório alimenta o histórico de drift e o QUALITY_GATE do load
+    relatorio = None
+    if config["HISTORICO_QUALIDADE"] or config["QUALITY_GATE"]:
+        print("\n--- Hora de Verificar a Qualidade ---")
+        relatorio = verificar_qualidade(config)
 
     # 3. Transformação: Dar um trato nos dados
     print("\n--- Hora de Transformar os Dados ---")
-    lf = df.lazy() 
-    transformed_lf = transform(lf)
-    
-    # Pega o resultado final da transformação
-    df_transformed = transformed_lf.collect()
-    print(f" - Transformação feita. Ficamos com {df_transformed.shape[0]} linhas.")
+    df_transformed = transformar(config)
 
     # 4. Carregamento: Jogar os dados tratados no banco SQLite
     print("\n--- Hora de Carregar os Dados ---")
-    load_data_to_sqlite(df_transformed, DB_PATH, TABLE_NAME)
-    print(f" - Dados carregados no banco: {DB_PATH}, tabela: {TABLE_NAME}.")
+    carregar(config, df_transformed, relatorio)
 
     print("\nProcesso ETL finalizado com sucesso!")
 
 if __name__ == "__main__":
-    try:
-        main()
-    except Exception as e:
-        print(f"Ocorreu um erro feio no meio do caminho: {e}")
\ No newline at end of file
+    from cli import executar
+
+    # `python main.py [--resume]` continua rodando a pipeline inteira
+    sys.exit(executar(["run", *sys.argv[1:]]))
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+
+# Memoização das etapas da pipeline pelo conteúdo das entradas.
+#
+# Cada etapa memoizada calcula uma chave: o hash do conteúdo dos arquivos de entrada,
+# do código dos módulos que ela usa e das configurações que mudam o resultado. Se a
+# chave é a mesma da última execução e as saídas continuam como ficaram, a etapa
+# reaproveita as saídas e não roda. As chaves ficam num arquivo JSON pequeno.
+
+# Suba este número quando uma mudança (ex: no formato das saídas) invalidar todas as memórias
+VERSAO = 1
+
+TAMANHO_BLOCO = 1024 * 1024
+
+
+def hash_arquivos(caminhos: list[str]) -> str:
+    """Hash (BLAKE2b) do conteúdo dos arquivos, na ordem dada, lidos em blocos. Arquivo ausente entra como ausente."""
+    resumo = hashlib.blake2b(digest_size=20)
+    for caminho in caminhos:
+        resumo.update(os.path.basename(caminho).encode())
+        if not os.path.exists(caminho):
+            resumo.update(b"\0ausente")
+            continue
+        with open(caminho, "rb") as arquivo:
+            while bloco := arquivo.read(TAMANHO_BLOCO):
+                resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def hash_codigo(modulos: list[str]) -> str:
+    """Hash do código-fonte dos módulos (pelo nome, ex: "transform"), a "versão" do código de uma etapa."""
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    return hash_arquivos([os.path.join(diretorio, f"{modulo}.py") for modulo in modulos])
+
+
+def impressao_digital(caminhos: list[str]) -> list:
+    """Tamanho e data de modificação das saídas: um jeito barato de ver se alguém mexeu nelas depois."""
+    return [
+        [caminho, os.path.getsize(caminho), os.stat(caminho).st_mtime_ns] if os.path.exists(caminho) else [caminho, None, None]
+        for caminho in caminhos
+    ]
+
+
+class MemoEtapas:
+    """
+    As chaves e as saídas da última execução de cada etapa, guardadas em JSON.
+
+    Exemplo:
+        memo = MemoEtapas("memo_etapas.json")
+        chave = memo.chave(["raw.parquet"], ["transform"], {"LANGUAGE": "pt-BR"})
+        if not memo.reaproveitavel("transform", chave):
+            ...  # roda a etapa, que grava "tratados.parquet"
+            memo.registrar("transform", chave, ["tratados.parquet"])
+    """
+
+    def __init__(self, caminho: str = "memo_etapas.json"):
+        self.caminho = caminho
+        self._etapas: dict[str, dict] = {}
+        if os.path.exists(caminho):
+            try:
+                with open(caminho, encoding="utf-8") as arquivo:
+                    self._etapas = json.load(arquivo)
+            except (OSError, json.JSONDecodeError):
+                self._etapas = {} # Memória corrompida: as etapas rodam de novo
+
+    @staticmethod
+    def chave(entradas: list[str], modulos: list[str], configuracao: dict) -> str:
+        """
+        A chave de uma execução da etapa.
+
+        Args:
+            entradas (list[str]): Arquivos de entrada (o conteúdo entra no hash).
+            modulos (list[str]): Módulos cujo código define o resultado da etapa.
+            configuracao (dict): Configurações que mudam o resultado (precisam virar JSON).
+
+        Returns:
+            str: O hash de tudo isso junto com VERSAO.
+        """
+        partes = {
+            "versao": VERSAO,
+            "entradas": hash_arquivos(entradas),
+            "codigo": hash_codigo(modulos),
+            "configuracao": configuracao,
+        }
+        return hashlib.blake2b(json.dumps(partes, sort_keys=True, default=str).encode(), digest_size=20).hexdigest()
+
+    def reaproveitavel(self, etapa: str, chave: str) -> bool:
+        """True se a última execução de `etapa` teve a mesma chave e as saídas dela não mudaram desde então."""
+        anterior = self._etapas.get(etapa)
+        if anterior is None or anterior["chave"] != chave:
+            return False
+        saidas = anterior["saidas"]
+        return all(os.path.exists(caminho) for caminho in saidas) and anterior["impressao"] == impressao_digital(saidas)
+
+    def registrar(self, etapa: str, chave: str, saidas: list[str]) -> None:
+        """Guarda a chave e as saídas da execução de `etapa` que acabou de rodar."""
+        self._etapas[etapa] = {
+            "chave": chave,
+            "saidas": list(saidas),
+            "impressao": impressao_digital(saidas),
+        }
+        self._salvar()
+
+    def _salvar(self) -> None:
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with open(self.caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+            json.dump(self._etapas, arquivo, ensure_ascii=False, indent=2)
+        os.replace(self.caminho + ".tmp", self.caminho)
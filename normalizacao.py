@@ -0,0 +1,135 @@
+import sqlite3
+import polars as pl
+from encoding import DICIONARIOS
+
+# Schema normalizado (opcional) ao lado da tabela de filmes:
+# - dimensões genres, people e companies: (id, nome), com nome único;
+# - pontes movie_genres, movie_directors e movie_companies: (movie_id, <dimensão>_id, ordem).
+#
+# As pontes são WITHOUT ROWID com chave (movie_id, <dimensão>_id) e têm um índice
+# (<dimensão>_id, movie_id): "filmes do diretor X" e "filmes por gênero" viram buscas
+# em índice que já têm tudo o que a consulta precisa, sem LIKE na tabela de filmes.
+
+# Coluna da tabela de filmes -> (dimensão, ponte, coluna do ID da dimensão na ponte)
+RELACOES = {
+    "Generos": ("genres", "movie_genres", "genre_id"),
+    "Diretores": ("people", "movie_directors", "person_id"),
+    "Produtoras": ("companies", "movie_companies", "company_id"),
+}
+
+# Valores que os tratamentos usam quando não há nome: não viram linha nas dimensões
+NOMES_DESCONHECIDOS = ("Diretor Desconhecido", "Empresa Desconhecida", "Não Disponível")
+
+
+def criar_schema_normalizado(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """Cria (se não existirem) as dimensões, as pontes e os índices delas."""
+    for dimensao, ponte, coluna_id in RELACOES.values():
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {dimensao} (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE)")
+        cursor.execute(
+            f"""CREATE TABLE IF NOT EXISTS {ponte} (
+                movie_id INTEGER NOT NULL REFERENCES {table_name} (Id),
+                {coluna_id} INTEGER NOT NULL REFERENCES {dimensao} (id),
+                ordem INTEGER NOT NULL,
+                PRIMARY KEY (movie_id, {coluna_id})
+            ) WITHOUT ROWID"""
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{ponte}_{coluna_id} ON {ponte} ({coluna_id}, movie_id)")
+
+
+def pares_filme_nome(df: pl.DataFrame, coluna: str, dicionario: pl.DataFrame | None = None) -> pl.DataFrame:
+    """
+    Explode uma coluna de listas em pares (movie_id, nome, ordem), sem nomes repetidos por filme.
+
+    Args:
+        df (pl.DataFrame): Os dados tratados (com 'Id').
+        coluna (str): Coluna de listas (Generos, Diretores ou Produtoras).
+        dicionario (pl.DataFrame | None): Tabela de consulta (id, nome), quando a coluna tem IDs
+            da codificação compacta em vez de nomes.
+
+    Returns:
+        pl.DataFrame: Os pares, com a posição do nome na lista original em 'ordem'.
+    """
+    nomes = pl.col(coluna)
+    tipo = df.schema[coluna]
+    if isinstance(tipo, pl.List) and tipo.inner.is_integer() and dicionario is not None:
+        nomes = nomes.list.eval(
+            pl.element().replace_strict(dicionario["id"], dicionario["nome"], default=None, return_dtype=pl.String)
+        )
+    elif isinstance(tipo, pl.List) and isinstance(tipo.inner, (pl.Enum, pl.Categorical)):
+        nomes = nomes.cast(pl.List(pl.String))
+    return (
+        df.select(pl.col("Id").alias("movie_id"), nomes.alias("nome"))
+        .with_columns(pl.int_ranges(pl.col("nome").list.len()).alias("ordem"))
+        .explode("nome", "ordem")
+        .filter(pl.col("nome").is_not_null() & ~pl.col("nome").is_in(NOMES_DESCONHECIDOS))
+        .unique(["movie_id", "nome"], keep="first", maintain_order=True)
+    )
+
+
+def gravar_normalizado(
+    cursor: sqlite3.Cursor,
+    df: pl.DataFrame,
+    dicionarios: dict[str, pl.DataFrame] | None = None,
+) -> dict[str, int]:
+    """
+    Atualiza as dimensões e as pontes com os filmes de `df`, em lote (dentro da transação de quem chama).
+    As tabelas precisam existir (veja criar_schema_normalizado).
+
+    Os pares (movie_id, nome, ordem) de cada coluna vão para uma tabela temporária; a partir
+    dela, um INSERT ... SELECT acrescenta os nomes novos à dimensão e outro monta a ponte,
+    juntando pelo índice único do nome. As ligações antigas dos filmes de `df` são apagadas antes.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor da conexão do load.
+        df (pl.DataFrame): Os dados tratados.
+        dicionarios (dict | None): Tabelas de consulta da codificação compacta, por nome (produtoras, diretores).
+
+    Returns:
+        dict[str, int]: Quantas ligações foram gravadas em cada ponte.
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _ids_carga (id INTEGER PRIMARY KEY)")
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _pares_carga (movie_id INTEGER, nome TEXT, ordem INTEGER)")
+    cursor.execute("DELETE FROM _ids_carga")
+    cursor.executemany("INSERT OR IGNORE INTO _ids_carga (id) VALUES (?)", ((movie_id,) for movie_id in df["Id"]))
+
+    ligacoes = {}
+    for coluna, (dimensao, ponte, coluna_id) in RELACOES.items():
+        dicionario = (dicionarios or {}).get(DICIONARIOS.get(coluna))
+        pares = pares_filme_nome(df, coluna, dicionario)
+        cursor.execute("DELETE FROM _pares_carga")
+        cursor.executemany("INSERT INTO _pares_carga (movie_id, nome, ordem) VALUES (?, ?, ?)", pares.iter_rows())
+
+        cursor.execute(f"INSERT OR IGNORE INTO {dimensao} (nome) SELECT DISTINCT nome FROM _pares_carga")
+        cursor.execute(f"DELETE FROM {ponte} WHERE movie_id IN (SELECT id FROM _ids_carga)")
+        cursor.execute(
+            f"""INSERT INTO {ponte} (movie_id, {coluna_id}, ordem)
+                SELECT p.movie_id, d.id, p.ordem FROM _pares_carga p JOIN {dimensao} d ON d.nome = p.nome"""
+        )
+        ligacoes[ponte] = pares.height
+
+    cursor.execute("DROP TABLE _pares_carga")
+    cursor.execute("DROP TABLE _ids_carga")
+    return ligacoes
+
+
+def filmes_por_diretor(conn: sqlite3.Connection, nome: str, table_name: str = "movies") -> list[tuple]:
+    """(Id, Titulo, Data_Lancamento) dos filmes de um diretor, do mais novo para o mais velho."""
+    return conn.execute(
+        f"""SELECT m.Id, m.Titulo, m.Data_Lancamento
+            FROM people p
+            JOIN movie_directors md ON md.person_id = p.id
+            JOIN {table_name} m ON m.Id = md.movie_id
+            WHERE p.nome = ?
+            ORDER BY m.Data_Lancamento DESC""",
+        (nome,),
+    ).fetchall()
+
+
+def filmes_por_genero(conn: sqlite3.Connection) -> list[tuple]:
+    """(gênero, número de filmes), do gênero com mais filmes para o com menos."""
+    return conn.execute(
+        """SELECT g.nome, COUNT(*) AS filmes
+           FROM movie_genres mg JOIN genres g ON g.id = mg.genre_id
+           GROUP BY mg.genre_id
+           ORDER BY filmes DESC"""
+    ).fetchall()
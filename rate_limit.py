@@ -0,0 +1,213 @@
+import statistics
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    Limitador de taxa do tipo token bucket, compartilhado entre todas as threads
+    que fazem requisições para a API do TMDB.
+
+    Cada requisição consome um token. Os tokens são repostos continuamente
+    na taxa `taxa_por_segundo`, até o limite de `capacidade` (rajada máxima).
+    """
+
+    def __init__(self, taxa_por_segundo: float, capacidade: int | None = None):
+        if taxa_por_segundo <= 0:
+            raise ValueError("A taxa do limitador precisa ser maior que zero.")
+
+        self.taxa_por_segundo = taxa_por_segundo
+        self.capacidade = capacidade if capacidade else max(1, int(taxa_por_segundo))
+        self._tokens = float(self.capacidade)
+        self._ultima_reposicao = time.monotonic()
+        self._pausado_ate = 0.0
+        self._lock = threading.Lock()
+
+    def _repor(self, agora: float) -> None:
+        decorrido = agora - self._ultima_reposicao
+        self._tokens = min(self.capacidade, self._tokens + decorrido * self.taxa_por_segundo)
+        self._ultima_reposicao = agora
+
+    def adquirir(self) -> None:
+        """Bloqueia até existir um token disponível (e a pausa global ter acabado)."""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                if agora < self._pausado_ate:
+                    espera = self._pausado_ate - agora
+                else:
+                    self._repor(agora)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    espera = (1 - self._tokens) / self.taxa_por_segundo
+            time.sleep(espera)
+
+    def pausar(self, segundos: float) -> None:
+        """
+        Suspende a emissão de tokens para todas as threads por `segundos`.
+        Usado quando a API responde 429 com Retry-After: o limite é global,
+        então não adianta só a thread que levou o 429 esperar.
+        """
+        with self._lock:
+            self._pausado_ate = max(self._pausado_ate, time.monotonic() + segundos)
+            self._tokens = 0.0
+            self._ultima_reposicao = self._pausado_ate
+
+    def ajustar_taxa(self, taxa_por_segundo: float) -> None:
+        """Muda a taxa de reposição (e a rajada máxima) sem perder os tokens já acumulados."""
+        with self._lock:
+            self._repor(max(time.monotonic(), self._ultima_reposicao))
+            self.taxa_por_segundo = taxa_por_segundo
+            self.capacidade = max(1, int(taxa_por_segundo))
+            self._tokens = min(self._tokens, self.capacidade)
+
+    def liberar(self, latencia: float, sucesso: bool = True) -> None:
+        """Avisa que uma requisição terminou. O bucket simples não usa essa informação."""
+
+
+class ControleAdaptativo(TokenBucket):
+    """
+    Limitador adaptativo (AIMD) para as requisições ao TMDB.
+
+    Controla duas coisas: quantas requisições podem estar em andamento ao mesmo
+    tempo (concorrência) e a taxa do token bucket. Enquanto as respostas vêm
+    saudáveis, as duas sobem devagar (aumento aditivo: +1 de concorrência e
+    +`passo_taxa` req/s a cada "janela" de respostas boas). Num 429/Retry-After,
+    ou se a latência ficar congestionada (veja `latencia_congestionada`) por
+    `amostras_elevadas` respostas seguidas, as duas caem pela metade (redução
+    multiplicativa), no máximo uma vez a cada `intervalo_reducao` segundos, para uma
+    rajada de 429 não derrubar tudo para o mínimo.
+
+    A latência observada é a mediana das últimas `amostras_mediana` respostas (uma resposta
+    lenta ou rápida por acaso não mexe nela), e a referência é a menor dessas medianas nas
+    últimas `janela_referencia` respostas: lembra a latência de antes de a taxa subir, mas
+    acompanha uma mudança duradoura. A latência só conta como congestionada acima de
+    `limiar_latencia` vezes a referência e, ao mesmo tempo, acima da referência mais
+    `folga_latencia` segundos: em endpoints de poucos ms, variação normal dobra a latência
+    sem ser congestionamento.
+
+    O estado atual fica disponível em `estado()`.
+    """
+
+    def __init__(
+        self,
+        taxa_inicial: float,
+        taxa_minima: float = 1.0,
+        taxa_maxima: float = 50.0,
+        concorrencia_inicial: int = 4,
+        concorrencia_minima: int = 1,
+        concorrencia_maxima: int = 16,
+        fator_reducao: float = 0.5,
+        passo_taxa: float = 1.0,
+        limiar_latencia: float = 2.0,
+        folga_latencia: float = 0.1,
+        amostras_elevadas: int = 5,
+        amostras_mediana: int = 50,
+        janela_referencia: int = 300,
+        intervalo_reducao: float = 2.0,
+    ):
+        super().__init__(min(max(taxa_inicial, taxa_minima), taxa_maxima))
+        self.taxa_minima = taxa_minima
+        self.taxa_maxima = taxa_maxima
+        self.concorrencia = float(min(max(concorrencia_inicial, concorrencia_minima), concorrencia_maxima))
+        self.concorrencia_minima = concorrencia_minima
+        self.concorrencia_maxima = concorrencia_maxima
+        self.fator_reducao = fator_reducao
+        self.passo_taxa = passo_taxa
+        self.limiar_latencia = limiar_latencia
+        self.folga_latencia = folga_latencia
+        self.amostras_elevadas = amostras_elevadas
+        self.intervalo_reducao = intervalo_reducao
+
+        self._cond = threading.Condition()
+        self._em_andamento = 0
+        self._sucessos_na_janela = 0
+        self._latencia_media = None
+        self._latencias_recentes = deque(maxlen=amostras_mediana)
+        self._medianas = deque(maxlen=janela_referencia)
+        self._elevadas_seguidas = 0
+        self._ultima_reducao = 0.0
+        self.aumentos = 0
+        self.reducoes = 0
+
+    def adquirir(self) -> None:
+        """Espera uma vaga de concorrência e depois um token do bucket."""
+        with self._cond:
+            while self._em_andamento >= int(self.concorrencia):
+                self._cond.wait()
+            self._em_andamento += 1
+        super().adquirir()
+
+    def liberar(self, latencia: float, sucesso: bool = True) -> None:
+        """
+        Devolve a vaga de concorrência e usa a latência da resposta para ajustar os limites.
+
+        Args:
+            latencia (float): Duração da requisição, em segundos.
+            sucesso (bool): False quando a requisição falhou (a latência não entra na média).
+        """
+        with self._cond:
+            self._em_andamento -= 1
+            if sucesso:
+                self._registrar_latencia(latencia)
+            self._cond.notify_all()
+
+    def pausar(self, segundos: float) -> None:
+        """429/Retry-After: pausa o bucket para todos e reduz concorrência e taxa."""
+        super().pausar(segundos)
+        with self._cond:
+            self._reduzir("rate limit (429)")
+
+    def latencia_congestionada(self, latencia: float, referencia: float) -> bool:
+        """True se `latencia` passou tanto do limiar relativo quanto da folga absoluta sobre `referencia`."""
+        return latencia > max(referencia * self.limiar_latencia, referencia + self.folga_latencia)
+
+    def _registrar_latencia(self, latencia: float) -> None:
+        if self._latencia_media is None:
+            self._latencia_media = latencia
+        else:
+            self._latencia_media = 0.8 * self._latencia_media + 0.2 * latencia
+        self._latencias_recentes.append(latencia)
+        mediana = statistics.median(self._latencias_recentes)
+        referencia = min(self._medianas, default=mediana)
+        self._medianas.append(mediana)
+
+        if self.latencia_congestionada(mediana, referencia):
+            self._elevadas_seguidas += 1
+            if self._elevadas_seguidas >= self.amostras_elevadas:
+                self._elevadas_seguidas = 0
+                self._reduzir("latência subindo")
+            return
+        self._elevadas_seguidas = 0
+
+        self._sucessos_na_janela += 1
+        if self._sucessos_na_janela >= int(self.concorrencia):
+            self._sucessos_na_janela = 0
+            if self.concorrencia < self.concorrencia_maxima or self.taxa_por_segundo < self.taxa_maxima:
+                self.concorrencia = min(self.concorrencia_maxima, self.concorrencia + 1)
+                self.ajustar_taxa(min(self.taxa_maxima, self.taxa_por_segundo + self.passo_taxa))
+                self.aumentos += 1
+
+    def _reduzir(self, motivo: str) -> None:
+        agora = time.monotonic()
+        if agora - self._ultima_reducao < self.intervalo_reducao:
+            return
+        self._ultima_reducao = agora
+        self._sucessos_na_janela = 0
+        self.concorrencia = max(self.concorrencia_minima, self.concorrencia * self.fator_reducao)
+        self.ajustar_taxa(max(self.taxa_minima, self.taxa_por_segundo * self.fator_reducao))
+        self.reducoes += 1
+        print(f"Controle adaptativo: reduzindo por {motivo} -> {self.estado()}")
+
+    def estado(self) -> dict:
+        """Concorrência e taxa atuais, mais as estatísticas do controle."""
+        return {
+            "concorrencia": int(self.concorrencia),
+            "em_andamento": self._em_andamento,
+            "taxa_por_segundo": round(self.taxa_por_segundo, 2),
+            "latencia_media_ms": round(self._latencia_media * 1000, 1) if self._latencia_media is not None else None,
+            "aumentos": self.aumentos,
+            "reducoes": self.reducoes,
+        }
@@ -0,0 +1,68 @@
+import polars as pl
+from data_quality import texto_ou_padrao
+
+# Regras rígidas de validação dos dados brutos, avaliadas como expressões Polars
+# (vetorizadas, linha a linha, então continuam rodando em streaming).
+#
+# Uma linha que falha em alguma regra não segue para o load: vai para a quarentena com
+# o código da primeira regra em que falhou. Os tratamentos "macios" (orçamento 0,
+# "Sem sinopse", datas inválidas viram nulo...) continuam no transform.
+
+COLUNA_MOTIVO = "motivo_quarentena"
+COLUNA_DATA = "quarentenado_em"
+
+# Falhas na busca de detalhes: o filme volta para a fila da próxima extração
+MOTIVO_FALHA_BUSCA = "FALHA_BUSCA"
+
+
+def regras_padrao() -> dict[str, tuple[str, pl.Expr]]:
+    """
+    As regras rígidas, na ordem de avaliação: {código: (descrição, expressão que é True quando a linha falha)}.
+    A ordem importa: a linha fica com o código da primeira regra em que falhou.
+    """
+    status = pl.col("status")
+    return {
+        "ID_INVALIDO": ("'id' ausente ou não numérico", pl.col("id").cast(pl.Int64, strict=False).is_null()),
+        MOTIVO_FALHA_BUSCA: (
+            "a busca de detalhes falhou ('status' começando com \"Erro\" ou \"Falha\")",
+            status.str.starts_with("Erro") | status.str.starts_with("Falha"),
+        ),
+        "SEM_TITULO": ("'title' nulo ou vazio", texto_ou_padrao(pl.col("title"), None).is_null()),
+    }
+
+
+def expressao_motivo(regras: dict[str, tuple[str, pl.Expr]] | None = None) -> pl.Expr:
+    """Expressão com o código da primeira regra em que a linha falha, ou nulo se ela passa em todas."""
+    regras = regras_padrao() if regras is None else regras
+    return pl.coalesce(
+        pl.when(falha).then(pl.lit(codigo)) for codigo, (_, falha) in regras.items()
+    ).alias(COLUNA_MOTIVO)
+
+
+def marcar_quarentena(lf: pl.LazyFrame, regras: dict[str, tuple[str, pl.Expr]] | None = None) -> pl.LazyFrame:
+    """Acrescenta aos dados brutos a coluna COLUNA_MOTIVO (nula nas linhas que passam nas regras)."""
+    return lf.with_columns(expressao_motivo(regras))
+
+
+def linhas_validas(lf_marcado: pl.LazyFrame) -> pl.LazyFrame:
+    """As linhas marcadas que passaram em todas as regras, sem a coluna do motivo."""
+    return lf_marcado.filter(pl.col(COLUNA_MOTIVO).is_null()).drop(COLUNA_MOTIVO)
+
+
+def linhas_em_quarentena(lf_marcado: pl.LazyFrame, quarentenado_em: str) -> pl.LazyFrame:
+    """As linhas marcadas que falharam em alguma regra, com o motivo e a data da quarentena."""
+    return lf_marcado.filter(pl.col(COLUNA_MOTIVO).is_not_null()).with_columns(
+        pl.lit(quarentenado_em).alias(COLUNA_DATA)
+    )
+
+
+def resumo_quarentena(df_quarentena: pl.DataFrame, regras: dict[str, tuple[str, pl.Expr]] | None = None) -> None:
+    """Mostra quantas linhas foram para a quarentena por regra."""
+    if df_quarentena.is_empty():
+        print(" - Quarentena: nenhuma linha falhou nas regras.")
+        return
+    regras = regras_padrao() if regras is None else regras
+    print(f" - Quarentena: {df_quarentena.height} linha(s) fora do load:")
+    for codigo, quantidade in df_quarentena[COLUNA_MOTIVO].value_counts(sort=True).iter_rows():
+        descricao = regras[codigo][0] if codigo in regras else ""
+        print(f"   {codigo}: {quantidade} ({descricao})")
@@ -0,0 +1,99 @@
+import sqlite3
+import pytest
+from busca import buscar, consulta_fts, criar_indice_busca, reconstruir_indice_busca, remover_gatilhos_busca
+
+
+@pytest.mark.parametrize(
+    "texto, esperada",
+    [
+        # Palavras vazias saem e a última palavra vale como prefixo
+        ("o poderoso chef", '"poderoso" "chef"*'),
+        ("The Lord of the Rings", '"Lord" "Rings"*'),
+        # Só palavras vazias: ficam todas (melhor que uma consulta vazia)
+        ("de do", '"de" "do"*'),
+        # Letra solta no fim (ainda sendo digitada) sai; número solto fica, como palavra inteira
+        ("star w", '"star"'),
+        ("toy story 2", '"toy" "story" "2"'),
+        ("x", '"x"'),
+        # Sintaxe do FTS5 digitada pelo usuário vira só palavras entre aspas
+        ('"matrix" OR neo* -smith', '"matrix" "OR" "neo" "smith"*'),
+        ("Ação", '"Ação"*'),
+        ("", ""),
+        ("  ?!  ", ""),
+    ],
+)
+def test_consulta_fts(texto, esperada):
+    assert consulta_fts(texto) == esperada
+
+
+def test_consulta_fts_sem_prefixo():
+    assert consulta_fts("o poderoso chef", prefixo=False) == '"poderoso" "chef"'
+    assert consulta_fts("star w", prefixo=False) == '"star" "w"'
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """CREATE TABLE movies (
+            Id INTEGER PRIMARY KEY, Titulo TEXT, Titulo_Original TEXT, Sinopse TEXT,
+            Data_Lancamento TEXT, Popularidade REAL
+        )"""
+    )
+    conn.executemany(
+        "INSERT INTO movies VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (1, "O Poderoso Chefão", "The Godfather", "A família Corleone e a máfia em Nova York.", "1972-03-14", 1.0),
+            (2, "Ação Total", "Total Action", "Um policial contra a máfia.", "1999-01-01", 2.0),
+            (3, "Toy Story 2", "Toy Story 2", "Os brinquedos voltam.", "1999-11-24", 3.0),
+        ],
+    )
+    criar_indice_busca(conn.cursor(), "movies")
+    yield conn
+    conn.close()
+
+
+def ids(resultados: list[dict]) -> list[int]:
+    return [filme["Id"] for filme in resultados]
+
+
+def test_indice_criado_com_os_filmes_existentes(conn):
+    assert ids(buscar(conn, "poderoso chefao")) == [1]
+    # Acentos e maiúsculas não importam
+    assert ids(buscar(conn, "ACAO")) == [2]
+    assert ids(buscar(conn, "toy story 2")) == [3]
+    assert buscar(conn, "") == []
+
+
+def test_titulo_vale_mais_que_sinopse(conn):
+    conn.execute("INSERT INTO movies VALUES (4, 'Máfia', 'Mafia', 'Uma história qualquer.', '2000-01-01', 0.0)")
+    resultados = buscar(conn, "mafia")
+    assert ids(resultados)[0] == 4
+    assert set(ids(resultados)) == {1, 2, 4}
+    assert "[" in resultados[0]["trecho"]
+
+
+def test_gatilhos_mantem_o_indice_em_dia(conn):
+    conn.execute("INSERT INTO movies VALUES (5, 'Matrix', 'The Matrix', 'Neo descobre a verdade.', '1999-03-31', 5.0)")
+    assert ids(buscar(conn, "matr")) == [5]
+
+    conn.execute("UPDATE movies SET Titulo = 'Matrix Reloaded' WHERE Id = 5")
+    assert ids(buscar(conn, "reloaded")) == [5]
+
+    # Atualização que não mexe no texto não tira o filme do índice
+    conn.execute("UPDATE movies SET Popularidade = 99 WHERE Id = 5")
+    assert ids(buscar(conn, "reloaded")) == [5]
+
+    conn.execute("DELETE FROM movies WHERE Id = 5")
+    assert buscar(conn, "matrix") == []
+
+
+def test_reconstruir_sem_gatilhos(conn):
+    cursor = conn.cursor()
+    remover_gatilhos_busca(cursor, "movies")
+    conn.execute("INSERT INTO movies VALUES (6, 'Interestelar', 'Interstellar', 'Viagem espacial.', '2014-11-06', 6.0)")
+    assert buscar(conn, "interestelar") == []
+    reconstruir_indice_busca(cursor, "movies")
+    assert ids(buscar(conn, "interestelar")) == [6]
+    # Criar de novo só recoloca os gatilhos (o índice já existe)
+    assert criar_indice_busca(cursor, "movies") is False
@@ -0,0 +1,78 @@
+import pytest
+import cache
+from cache import DetailCache
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio virtual (epoch) para a validade e o LRU do cache."""
+    agora = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: agora[0])
+    return agora
+
+
+@pytest.fixture
+def abrir(tmp_path):
+    abertos = []
+
+    def abrir(**kwargs) -> DetailCache:
+        detalhes = DetailCache(str(tmp_path / "cache.db"), **kwargs)
+        abertos.append(detalhes)
+        return detalhes
+
+    yield abrir
+    for detalhes in abertos:
+        detalhes.fechar()
+
+
+def test_resposta_guardada_e_lida_de_novo(relogio, abrir):
+    detalhes = abrir()
+    detalhes.salvar(1, "pt-BR", "credits,translations", {"id": 1, "title": "Filme"})
+    # A ordem do append_to_response não importa
+    assert detalhes.obter(1, "pt-BR", "translations, credits") == {"id": 1, "title": "Filme"}
+    assert detalhes.obter(1, "en-US", "credits,translations") is None
+    assert detalhes.obter_com_data(1, "pt-BR", "credits,translations")[1] == relogio[0]
+    # Continua lá numa nova execução
+    assert abrir().obter(1, "pt-BR", "credits,translations") == {"id": 1, "title": "Filme"}
+    assert detalhes.estatisticas() == {"hits": 2, "misses": 1, "taxa_acerto": 0.6667, "entradas": 1}
+
+
+def test_entrada_vencida_conta_como_ausente(relogio, abrir):
+    detalhes = abrir(ttl_segundos=3600)
+    detalhes.salvar(1, "pt-BR", "credits", {"id": 1})
+    relogio[0] += 3599
+    assert detalhes.obter(1, "pt-BR", "credits") == {"id": 1}
+    relogio[0] += 2
+    assert detalhes.obter(1, "pt-BR", "credits") is None
+    # Ler não renova a validade: ela conta de quando a resposta veio da API
+    detalhes.salvar(1, "pt-BR", "credits", {"id": 1, "novo": True})
+    assert detalhes.obter(1, "pt-BR", "credits") == {"id": 1, "novo": True}
+
+
+def test_lru_remove_as_menos_usadas(relogio, abrir):
+    detalhes = abrir(max_entradas=10)
+    for movie_id in range(10):
+        relogio[0] += 1
+        detalhes.salvar(movie_id, "pt-BR", "credits", {"id": movie_id})
+    # Os filmes 0 e 1 são lidos de novo: passam a ser os mais recentes
+    relogio[0] += 1
+    detalhes.obter(0, "pt-BR", "credits")
+    detalhes.obter(1, "pt-BR", "credits")
+
+    relogio[0] += 1
+    detalhes.salvar(10, "pt-BR", "credits", {"id": 10})
+    # Passou do limite: cai para 90% dele, começando pelos menos usados (2 e 3)
+    assert detalhes.estatisticas()["entradas"] == 9
+    presentes = [movie_id for movie_id in range(11) if detalhes.obter(movie_id, "pt-BR", "credits") is not None]
+    assert presentes == [0, 1, 4, 5, 6, 7, 8, 9, 10]
+
+
+def test_invalidar_remove_todos_os_idiomas(relogio, abrir):
+    detalhes = abrir()
+    detalhes.salvar(1, "pt-BR", "credits", {"id": 1})
+    detalhes.salvar(1, "en-US", "credits", {"id": 1})
+    detalhes.salvar(2, "pt-BR", "credits", {"id": 2})
+    assert detalhes.invalidar([1]) == 2
+    assert detalhes.obter(1, "en-US", "credits") is None
+    assert detalhes.obter(2, "pt-BR", "credits") == {"id": 2}
+    assert detalhes.estatisticas()["entradas"] == 1
@@ -0,0 +1,65 @@
+import polars as pl
+import pytest
+from checkpoint import CheckpointJournal
+from extraction import escrever_partes_parquet, iterar_filmes_completos
+from rate_limit import TokenBucket
+
+CONHECIDOS = {movie_id: {"status": "Released"} for movie_id in range(100)}
+
+
+def test_diario_sobrevive_a_reabertura(tmp_path):
+    caminho = str(tmp_path / "diario.jsonl")
+    diario = CheckpointJournal(caminho)
+    diario.registrar_pagina("popular", 1, [{"id": 1}, {"id": 2}])
+    diario.registrar_parte("part-00000.parquet", [1, 2])
+
+    reaberto = CheckpointJournal(caminho)
+    assert reaberto.paginas == {("popular", 1): [{"id": 1}, {"id": 2}]}
+    assert reaberto.partes == ["part-00000.parquet"]
+    assert reaberto.ids_concluidos == {1, 2}
+
+    reaberto.limpar()
+    assert CheckpointJournal(caminho).paginas == {}
+
+
+def test_linha_cortada_no_fim_e_ignorada(tmp_path):
+    caminho = tmp_path / "diario.jsonl"
+    CheckpointJournal(str(caminho)).registrar_pagina("popular", 1, [{"id": 1}])
+    with open(caminho, "a", encoding="utf-8") as arquivo:
+        arquivo.write('{"tipo": "parte", "arquivo": "part-0')  # Caiu no meio da escrita
+    diario = CheckpointJournal(str(caminho))
+    assert list(diario.paginas) == [("popular", 1)]
+    assert diario.partes == []
+
+
+def test_retomar_nao_repete_paginas_nem_filmes(tmp_path):
+    caminho, pasta = str(tmp_path / "diario.jsonl"), str(tmp_path / "partes")
+    chamadas = []
+
+    def buscar_pagina(lista, page, cair_na=None):
+        chamadas.append(page)
+        if page == cair_na:
+            raise KeyboardInterrupt
+        return [{"id": page * 10 + i, "title": f"Filme {page * 10 + i}"} for i in range(2)]
+
+    def extrair(diario, cair_na=None):
+        registros = iterar_filmes_completos(
+            lambda lista, page: buscar_pagina(lista, page, cair_na), ["popular"], 4, TokenBucket(1000),
+            page_workers=1, detalhes_conhecidos=CONHECIDOS, checkpoint=diario,
+        )
+        return escrever_partes_parquet(registros, pasta, tamanho_lote=2, parte_inicial=len(diario.partes), checkpoint=diario)
+
+    # Primeira execução: cai ao buscar a página 3, com as páginas 1 e 2 já gravadas em partes
+    with pytest.raises(KeyboardInterrupt):
+        extrair(CheckpointJournal(caminho), cair_na=3)
+
+    diario = CheckpointJournal(caminho)
+    assert sorted(diario.ids_concluidos) == [10, 11, 20, 21]
+    chamadas.clear()
+    novas = extrair(diario)
+    # As páginas do diário não são buscadas de novo (a 4 pode ter chegado antes da queda)
+    assert 3 in chamadas and not {1, 2} & set(chamadas)
+    assert novas[0] == f"{pasta}/part-00002.parquet"  # A numeração continua
+
+    ids = pl.read_parquet(f"{pasta}/part-*.parquet")["id"].to_list()
+    assert sorted(ids) == [10, 11, 20, 21, 30, 31, 40, 41]  # Sem repetidos
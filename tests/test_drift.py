@@ -0,0 +1,57 @@
+import pytest
+from drift import HistoricoEsbocos, acompanhar_drift, calcular_drift, montar_esboco
+
+
+def relatorio(linhas: int = 100, nulos: int = 0, media: float = 7.0) -> dict:
+    """Relatório de qualidade mínimo, no formato de data_quality.relatorio_qualidade."""
+    return {"linhas": linhas, "colunas": {"nota": {"nulos": nulos, "media": media, "minimo": 0.0}}}
+
+
+def test_montar_esboco_converte_contagens_em_taxas():
+    esboco = montar_esboco(relatorio(linhas=200, nulos=50))
+    assert esboco[("*", "linhas")] == 200.0
+    assert esboco[("nota", "taxa_nulos")] == 0.25
+    assert esboco[("nota", "media")] == 7.0
+    # Métricas que não estão em METRICAS_TAXA nem em METRICAS_VALOR ficam de fora
+    assert ("nota", "minimo") not in esboco
+
+
+def test_historico_estavel_nao_alerta():
+    historico = [montar_esboco(relatorio(media=media)) for media in (7.0, 7.1, 6.9, 7.0)]
+    assert calcular_drift(montar_esboco(relatorio(media=7.05)), historico) == []
+
+
+def test_mudanca_grande_alerta():
+    historico = [montar_esboco(relatorio(nulos=nulos)) for nulos in (1, 2, 1, 2)]
+    alertas = calcular_drift(montar_esboco(relatorio(nulos=40)), historico)
+    assert [(a["coluna"], a["metrica"]) for a in alertas] == [("nota", "taxa_nulos")]
+    assert alertas[0]["execucoes_comparadas"] == 4
+
+
+def test_historico_curto_nao_avalia():
+    historico = [montar_esboco(relatorio(nulos=1))] * 2
+    assert calcular_drift(montar_esboco(relatorio(nulos=90)), historico, min_execucoes=3) == []
+
+
+@pytest.mark.parametrize("min_execucoes", [0, 1])
+def test_uma_execucao_anterior_nao_quebra(min_execucoes):
+    # Com uma execução só não há desvio padrão: a métrica não é avaliada (antes, ZeroDivisionError)
+    historico = [montar_esboco(relatorio(nulos=1))]
+    assert calcular_drift(montar_esboco(relatorio(nulos=90)), historico, min_execucoes=min_execucoes) == []
+
+
+def test_acompanhar_drift_guarda_um_esboco_por_execucao(tmp_path):
+    caminho = str(tmp_path / "historico.db")
+    for _ in range(3):
+        assert acompanhar_drift(relatorio(nulos=1), caminho, min_execucoes=3) == []
+    alertas = acompanhar_drift(relatorio(nulos=60), caminho, min_execucoes=3)
+    assert [a["metrica"] for a in alertas] == ["taxa_nulos"]
+
+    historico = HistoricoEsbocos(caminho)
+    try:
+        ultimas = historico.ultimas(10)
+    finally:
+        historico.fechar()
+    assert len(ultimas) == 4
+    # Da mais nova para a mais velha
+    assert ultimas[0][("nota", "taxa_nulos")] == 0.6
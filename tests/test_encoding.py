@@ -0,0 +1,68 @@
+import sqlite3
+import polars as pl
+import pytest
+from encoding import SCHEMA_DICIONARIO, codificar_compacto, salvar_dicionario
+from load import gravar_tabelas_de_consulta
+
+GENEROS = {28: "Ação", 18: "Drama"}
+
+
+def dados(produtoras: list[list[str]]) -> pl.LazyFrame:
+    return pl.LazyFrame(
+        {
+            "Generos": [["Ação"]] * len(produtoras),
+            "Status": ["Released"] * len(produtoras),
+            "Idioma_Original": ["en"] * len(produtoras),
+            "Produtoras": produtoras,
+            "Diretores": [["Diretor X"]] * len(produtoras),
+        }
+    )
+
+
+def dicionario(pares: list[tuple[int, str]]) -> pl.DataFrame:
+    return pl.DataFrame(pares, schema=SCHEMA_DICIONARIO, orient="row")
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Banco de uma carga anterior: 'Estúdio A' tem ID 0 e 'Estúdio B', ID 1."""
+    db_path = str(tmp_path / "movies.db")
+    conn = sqlite3.connect(db_path)
+    gravar_tabelas_de_consulta(
+        conn.cursor(), {"produtoras": dicionario([(0, "Estúdio A"), (1, "Estúdio B")]), "diretores": dicionario([])}
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_pasta_de_dicionarios_apagada_reaproveita_os_ids_do_banco(tmp_path, banco):
+    pasta = str(tmp_path / "dicionarios")  # Não existe: foi apagada
+    codificado = codificar_compacto(dados([["Estúdio B", "Estúdio C"]]), GENEROS, pasta, banco).collect()
+    assert codificado["Produtoras"].to_list() == [[1, 2]]
+    assert pl.read_parquet(f"{pasta}/produtoras.parquet").rows() == [(0, "Estúdio A"), (1, "Estúdio B"), (2, "Estúdio C")]
+
+
+def test_sem_banco_numera_do_zero(tmp_path):
+    codificado = codificar_compacto(dados([["Estúdio B"]]), GENEROS, str(tmp_path / "dicionarios"), None).collect()
+    assert codificado["Produtoras"].to_list() == [[0]]
+
+
+def test_arquivo_que_nao_bate_com_o_banco_falha(tmp_path, banco):
+    pasta = tmp_path / "dicionarios"
+    salvar_dicionario(dicionario([(0, "Estúdio B")]), str(pasta / "produtoras.parquet"))
+    with pytest.raises(ValueError, match="produtoras"):
+        codificar_compacto(dados([["Estúdio B"]]), GENEROS, str(pasta), banco)
+
+
+def test_load_recusa_ids_em_conflito(banco):
+    conn = sqlite3.connect(banco)
+    try:
+        with pytest.raises(sqlite3.IntegrityError, match="produtoras"):
+            # Dicionários renumerados do zero: o ID 0 agora seria 'Estúdio B'
+            gravar_tabelas_de_consulta(conn.cursor(), {"produtoras": dicionario([(0, "Estúdio B")])})
+        # Nomes novos com IDs novos entram normalmente
+        gravar_tabelas_de_consulta(conn.cursor(), {"produtoras": dicionario([(0, "Estúdio A"), (2, "Estúdio C")])})
+        assert conn.execute("SELECT id, nome FROM produtoras ORDER BY id").fetchall()[-1] == (2, "Estúdio C")
+    finally:
+        conn.close()
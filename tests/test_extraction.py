@@ -0,0 +1,115 @@
+import threading
+import time
+from types import SimpleNamespace
+import requests
+import extraction
+from extraction import iterar_filmes_completos
+from rate_limit import TokenBucket
+
+
+class PaginasFalsas:
+    """buscar_pagina falso: cada página demora `demora` segundos e guarda o pico de páginas em andamento."""
+
+    def __init__(self, paginas: dict[tuple[str, int], list[int]], demora: float = 0.0):
+        self.paginas = paginas
+        self.demora = demora
+        self.chamadas: list[tuple[str, int]] = []
+        self.em_andamento = 0
+        self.pico = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, lista: str, page: int) -> list[dict]:
+        with self._lock:
+            self.chamadas.append((lista, page))
+            self.em_andamento += 1
+            self.pico = max(self.pico, self.em_andamento)
+        try:
+            time.sleep(self.demora)
+            return [{"id": movie_id, "title": f"Filme {movie_id}"} for movie_id in self.paginas.get((lista, page), [])]
+        finally:
+            with self._lock:
+                self.em_andamento -= 1
+
+
+def coletar(buscar_pagina, listas, num_pages, **kwargs) -> list[dict]:
+    # Todos os filmes "já conhecidos": o teste mede só a coleta das páginas, sem requisições de detalhes
+    conhecidos = {movie_id: {"status": "Released"} for movie_id in range(1000)}
+    return list(
+        iterar_filmes_completos(
+            buscar_pagina, listas, num_pages, TokenBucket(1000), detalhes_conhecidos=conhecidos, **kwargs
+        )
+    )
+
+
+def test_paginas_de_uma_lista_sao_buscadas_em_paralelo():
+    paginas = PaginasFalsas({("popular", page): [page] for page in range(1, 9)}, demora=0.2)
+    inicio = time.monotonic()
+    registros = coletar(paginas, ["popular"], 8, page_workers=4)
+    assert [registro["id"] for registro in registros] == list(range(1, 9))
+    assert paginas.pico == 4
+    # Em série seriam 1,6 s
+    assert time.monotonic() - inicio < 1.0
+
+
+def test_filme_repetido_entre_paginas_sai_uma_vez():
+    # A lista muda enquanto é paginada: o mesmo filme aparece em duas páginas
+    paginas = PaginasFalsas({("popular", 1): [1, 2, 3], ("popular", 2): [3, 4], ("popular", 3): [2, 5]}, demora=0.01)
+    registros = coletar(paginas, ["popular"], 3)
+    ids = [registro["id"] for registro in registros]
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+    assert all(registro["listas"] == ["popular"] for registro in registros)
+
+
+def test_varias_listas_juntam_filmes_repetidos_na_ordem_da_primeira_aparicao():
+    paginas = PaginasFalsas({
+        ("popular", 1): [1, 2], ("popular", 2): [3],
+        ("top_rated", 1): [2, 4], ("top_rated", 2): [1, 5],
+    })
+    registros = coletar(paginas, ["popular", "top_rated"], 2)
+    assert [(registro["id"], registro["listas"]) for registro in registros] == [
+        (1, ["popular", "top_rated"]),
+        (2, ["popular", "top_rated"]),
+        (3, ["popular"]),
+        (4, ["top_rated"]),
+        (5, ["top_rated"]),
+    ]
+
+
+def test_pagina_que_falha_fica_de_fora_sozinha(monkeypatch):
+    # Sem esperar o backoff de verdade
+    monkeypatch.setattr(extraction, "time", SimpleNamespace(monotonic=time.monotonic, sleep=lambda segundos: None))
+    paginas = PaginasFalsas({("popular", 1): [1], ("popular", 2): [2], ("popular", 3): [3]})
+    tentativas = {}
+
+    def buscar_pagina(lista, page):
+        tentativas[page] = tentativas.get(page, 0) + 1
+        if page == 2 or (page == 3 and tentativas[page] == 1):
+            raise requests.exceptions.ConnectionError("falhou")
+        return paginas(lista, page)
+
+    registros = coletar(buscar_pagina, ["popular"], 3)
+    assert [registro["id"] for registro in registros] == [1, 3]  # A 3 passou na segunda tentativa
+    assert tentativas == {1: 1, 2: 3, 3: 2}
+
+
+def test_detalhes_comecam_antes_de_todas_as_paginas_chegarem(monkeypatch):
+    eventos = []
+    lock = threading.Lock()
+
+    def detalhes(movie_id, **kwargs):
+        with lock:
+            eventos.append(("detalhe", movie_id))
+        return {"status": "Released"}
+
+    class PaginasLentas(PaginasFalsas):
+        def __call__(self, lista, page):
+            resultado = super().__call__(lista, page)
+            with lock:
+                eventos.append(("pagina", page))
+            return resultado
+
+    monkeypatch.setattr(extraction, "obter_detalhes_completos_filme_unificado", detalhes)
+    paginas = PaginasLentas({("popular", page): [page] for page in range(1, 7)}, demora=0.1)
+    registros = list(iterar_filmes_completos(paginas, ["popular"], 6, TokenBucket(1000), page_workers=2))
+    assert [registro["id"] for registro in registros] == list(range(1, 7))
+    assert eventos.index(("detalhe", 1)) < eventos.index(("pagina", 6))
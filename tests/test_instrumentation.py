@@ -0,0 +1,28 @@
+import pytest
+from instrumentation import Execucao, _zerar_pico
+
+MB = 1024 * 1024
+
+
+@pytest.mark.skipif(not _zerar_pico(), reason="o sistema não deixa zerar o pico de memória (só Linux)")
+def test_pico_rss_e_de_cada_etapa():
+    execucao = Execucao("teste")
+    with execucao.medir("pesada"):
+        with execucao.medir("interna"):
+            bloco = bytearray(200 * MB)
+            bloco[::4096] = b"x" * len(bloco[::4096])  # Toca as páginas para elas ficarem residentes
+            del bloco
+        with execucao.medir("interna leve"):
+            pass
+    with execucao.medir("leve"):
+        pass
+
+    pesada, interna, interna_leve, leve = execucao.etapas
+    assert interna.rss_pico_mb - interna.rss_inicio_mb > 150
+    # A etapa de fora inclui o pico da interna, mesmo depois de outra interna zerar a contagem
+    assert pesada.rss_pico_mb >= interna.rss_pico_mb
+    # As etapas depois da pesada mostram o pico delas, não o do processo
+    assert interna_leve.rss_pico_mb < interna.rss_pico_mb - 150
+    assert leve.rss_pico_mb < interna.rss_pico_mb - 150
+    assert execucao.relatorio()["rss_pico_mb"] >= round(interna.rss_pico_mb, 1)
+    assert "pico RSS do processo" in execucao.resumo()
@@ -0,0 +1,132 @@
+import contextlib
+import datetime
+import io
+import json
+import sqlite3
+import polars as pl
+import pytest
+from bench_load import alterar, filmes_sinteticos
+from load import COLUNA_HASH, _texto_para_lista, inserir_em_lotes, load_data_to_sqlite, lotes_para_sqlite
+
+
+class ContaCommits(sqlite3.Connection):
+    """Conexão que conta os commits (para ver o tamanho das transações)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commits = 0
+        self.linhas_por_commit: list[int] = []
+
+    def commit(self):
+        self.commits += 1
+        self.linhas_por_commit.append(self.execute("SELECT COUNT(*) FROM t").fetchone()[0])
+        super().commit()
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:", factory=ContaCommits)
+    conn.execute("CREATE TABLE t (Id INTEGER PRIMARY KEY, nome TEXT)")
+    yield conn
+    conn.close()
+
+
+def filmes(quantidade: int) -> pl.DataFrame:
+    return pl.DataFrame({"Id": range(quantidade), "nome": [f"Filme {i}" for i in range(quantidade)]})
+
+
+@pytest.mark.parametrize(
+    "tamanho_lote, linhas_por_transacao, total_por_commit",
+    [
+        # Transação menor que o lote: o lote é cortado (antes, um commit só a cada lote de 50)
+        (50, 10, [10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 105]),
+        # Transação maior que o lote: vários lotes por transação, sem passar do tamanho pedido
+        (10, 25, [25, 50, 75, 100, 105]),
+        (50, 50, [50, 100, 105]),
+    ],
+)
+def test_linhas_por_transacao_respeitadas(conn, tamanho_lote, linhas_por_transacao, total_por_commit):
+    sql = "INSERT INTO t (Id, nome) VALUES (?, ?)"
+    assert inserir_em_lotes(conn.cursor(), sql, filmes(105), tamanho_lote, linhas_por_transacao) == 105
+    assert conn.linhas_por_commit == total_por_commit
+
+
+def test_sem_linhas_por_transacao_nao_faz_commit(conn):
+    inserir_em_lotes(conn.cursor(), "INSERT INTO t (Id, nome) VALUES (?, ?)", filmes(105), 10)
+    assert conn.commits == 0
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 105
+
+
+def test_listas_e_structs_viram_json_valido():
+    df = pl.DataFrame(
+        {
+            "Diretores": [["Christopher Nolan"], ['Aspas "duplas" e \\ barra', "Ação, ç"], [], None],
+            "Ids": [[1, 2], [3], [], None],
+            "Generos": [["Drama"], ["Ação", "Drama"], [], None],
+            "Traducoes": [[{"idioma": "en-US", "title": "Hi"}], [], [], None],
+            "Data": [datetime.date(2020, 1, 2), None, None, None],
+        },
+        schema_overrides={"Generos": pl.List(pl.Enum(["Ação", "Drama"]))},
+    )
+    linhas = [linha for lote in lotes_para_sqlite(df, tamanho_lote=3) for linha in lote]
+    diretores, ids, generos, traducoes, data = zip(*linhas)
+    assert [json.loads(valor) if valor is not None else None for valor in diretores] == df["Diretores"].to_list()
+    assert [json.loads(valor) if valor is not None else None for valor in ids] == df["Ids"].to_list()
+    assert json.loads(generos[1]) == ["Ação", "Drama"]  # Categorias vão pelo nome
+    assert json.loads(traducoes[0]) == [{"idioma": "en-US", "title": "Hi"}]
+    assert data == ("2020-01-02", None, None, None)
+
+
+@pytest.mark.parametrize(
+    "texto, lista",
+    [
+        ('["Ação", "Drama"]', ["Ação", "Drama"]),
+        ("['Ação', 'Drama']", ["Ação", "Drama"]),  # Bancos antigos: repr do Python
+        ("[]", []),
+        ("", []),
+        (None, []),
+        ("texto solto", ["texto solto"]),
+    ],
+)
+def test_texto_para_lista(texto, lista):
+    assert _texto_para_lista(texto) == lista
+
+
+def carregar(df: pl.DataFrame, db_path: str, **kwargs) -> dict[str, int]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return load_data_to_sqlite(df, db_path, "movies", **kwargs)
+
+
+def test_load_so_grava_o_que_mudou(tmp_path):
+    db_path = str(tmp_path / "movies.db")
+    df = filmes_sinteticos(100)
+    assert carregar(df, db_path) == {"inseridas": 100, "atualizadas": 0, "inalteradas": 0}
+    assert carregar(df, db_path) == {"inseridas": 0, "atualizadas": 0, "inalteradas": 100}
+
+    # 10 filmes mudam (popularidade e votos) e 5 são novos
+    diario = pl.concat([alterar(df, 0.1), filmes_sinteticos(105).tail(5)])
+    assert carregar(diario, db_path, linhas_por_transacao=7) == {"inseridas": 5, "atualizadas": 10, "inalteradas": 90}
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM movies").fetchone()[0] == 105
+        assert conn.execute("SELECT Popularidade FROM movies WHERE Id = 10").fetchone()[0] == df["Popularidade"][10] + 1
+
+
+def test_hash_nao_depende_da_codificacao_das_categorias(tmp_path):
+    db_path = str(tmp_path / "movies.db")
+    df = filmes_sinteticos(20)
+    carregar(df, db_path)
+    categorias = df.with_columns(
+        pl.col("Generos").cast(pl.List(pl.Enum(sorted(df["Generos"].explode().unique().to_list())))),
+        pl.col("Status").cast(pl.Categorical),
+    )
+    assert carregar(categorias, db_path)["inalteradas"] == 20
+
+
+def test_filmes_gravados_antes_do_hash_contam_como_atualizados(tmp_path):
+    db_path = str(tmp_path / "movies.db")
+    df = filmes_sinteticos(10)
+    carregar(df, db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"UPDATE movies SET {COLUNA_HASH} = NULL WHERE Id < 4")
+    assert carregar(df, db_path) == {"inseridas": 0, "atualizadas": 4, "inalteradas": 6}
+    assert carregar(df, db_path)["inalteradas"] == 10
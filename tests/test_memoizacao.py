@@ -0,0 +1,108 @@
+import sqlite3
+import pytest
+import load
+import main
+from memoizacao import MemoEtapas, hash_arquivos
+
+
+@pytest.fixture
+def arquivos(tmp_path):
+    entrada = tmp_path / "brutos.parquet"
+    saida = tmp_path / "tratados.parquet"
+    entrada.write_bytes(b"dados brutos")
+    saida.write_bytes(b"dados tratados")
+    return str(entrada), str(saida)
+
+
+def test_hash_arquivos_pelo_conteudo(tmp_path, arquivos):
+    entrada, _ = arquivos
+    antes = hash_arquivos([entrada])
+    assert hash_arquivos([entrada]) == antes
+    (tmp_path / "brutos.parquet").write_bytes(b"outros dados")
+    assert hash_arquivos([entrada]) != antes
+    # Arquivo ausente entra no hash (e é diferente de um arquivo vazio)
+    (tmp_path / "vazio").write_bytes(b"")
+    assert hash_arquivos([str(tmp_path / "nao_existe")]) != hash_arquivos([str(tmp_path / "vazio")])
+
+
+def test_chave_muda_com_entradas_e_configuracao(tmp_path, arquivos):
+    entrada, _ = arquivos
+    chave = MemoEtapas.chave([entrada], ["memoizacao"], {"LANGUAGE": "pt-BR"})
+    assert MemoEtapas.chave([entrada], ["memoizacao"], {"LANGUAGE": "pt-BR"}) == chave
+    assert MemoEtapas.chave([entrada], ["memoizacao"], {"LANGUAGE": "en-US"}) != chave
+    assert MemoEtapas.chave([entrada], ["memoizacao", "drift"], {"LANGUAGE": "pt-BR"}) != chave
+    (tmp_path / "brutos.parquet").write_bytes(b"dados novos")
+    assert MemoEtapas.chave([entrada], ["memoizacao"], {"LANGUAGE": "pt-BR"}) != chave
+
+
+def test_registrar_e_reaproveitar(tmp_path, arquivos):
+    entrada, saida = arquivos
+    caminho = str(tmp_path / "memo.json")
+    chave = MemoEtapas.chave([entrada], ["memoizacao"], {})
+    memo = MemoEtapas(caminho)
+    assert not memo.reaproveitavel("transform", chave)
+    memo.registrar("transform", chave, [saida])
+
+    # A memória vale para uma nova execução (lida do JSON)
+    assert MemoEtapas(caminho).reaproveitavel("transform", chave)
+    assert not MemoEtapas(caminho).reaproveitavel("transform", "outra chave")
+    assert not MemoEtapas(caminho).reaproveitavel("load", chave)
+
+
+def test_saida_alterada_ou_apagada_invalida(tmp_path, arquivos):
+    entrada, saida = arquivos
+    caminho = str(tmp_path / "memo.json")
+    chave = MemoEtapas.chave([entrada], ["memoizacao"], {})
+    MemoEtapas(caminho).registrar("transform", chave, [saida])
+
+    (tmp_path / "tratados.parquet").write_bytes(b"mexeram na saida depois")
+    assert not MemoEtapas(caminho).reaproveitavel("transform", chave)
+
+    MemoEtapas(caminho).registrar("transform", chave, [saida])
+    (tmp_path / "tratados.parquet").unlink()
+    assert not MemoEtapas(caminho).reaproveitavel("transform", chave)
+
+
+def test_memoria_corrompida_roda_de_novo(tmp_path, arquivos):
+    _, saida = arquivos
+    caminho = tmp_path / "memo.json"
+    caminho.write_text('{"transform": {"chave": ', encoding="utf-8")
+    memo = MemoEtapas(str(caminho))
+    assert not memo.reaproveitavel("transform", "qualquer")
+    # E a próxima execução regrava um JSON válido
+    memo.registrar("transform", "chave", [saida])
+    assert MemoEtapas(str(caminho)).reaproveitavel("transform", "chave")
+
+
+def test_load_que_falhou_nao_e_memoizado(tmp_path, monkeypatch):
+    from bench_load import filmes_sinteticos
+
+    config = main.carregar_configuracao()
+    config.update(
+        TRANSFORMED_PARQUET=str(tmp_path / "tratados.parquet"),
+        QUARANTINE_PARQUET=str(tmp_path / "quarentena.parquet"),
+        DB_PATH=str(tmp_path / "movies.db"),
+        MEMO_PATH=str(tmp_path / "memo.json"),
+        QUALITY_GATE=False,
+        COMPACTO=False,
+        NORMALIZADO=False,
+    )
+    filmes_sinteticos(5).write_parquet(config["TRANSFORMED_PARQUET"])
+
+    # Outra conexão segura o banco: o load falha com "database is locked" (sem esperar os 5 s padrão)
+    conectar = sqlite3.connect
+    trava = conectar(config["DB_PATH"], isolation_level=None)
+    trava.execute("BEGIN EXCLUSIVE")
+    with monkeypatch.context() as m:
+        m.setattr(load.sqlite3, "connect", lambda caminho, *args, **kwargs: conectar(caminho, timeout=0))
+        with pytest.raises(sqlite3.Error):
+            main.carregar(config)
+    trava.rollback()
+    trava.close()
+    assert not MemoEtapas(config["MEMO_PATH"])._etapas.get("load")
+
+    # A próxima execução carrega de verdade e aí, sim, fica memoizada
+    main.carregar(config)
+    with sqlite3.connect(config["DB_PATH"]) as conn:
+        assert conn.execute(f"SELECT COUNT(*) FROM {config['TABLE_NAME']}").fetchone()[0] == 5
+    assert MemoEtapas(config["MEMO_PATH"])._etapas["load"]["saidas"] == [config["DB_PATH"]]
@@ -0,0 +1,134 @@
+import math
+import random
+import threading
+import pytest
+import requests
+import rate_limit
+from rate_limit import ControleAdaptativo
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio virtual para o controle (o intervalo entre reduções depende de time.monotonic)."""
+    agora = [0.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: agora[0])
+    return agora
+
+
+def simular(relogio, latencia, respostas: int = 3000, semente: int = 1) -> ControleAdaptativo:
+    """Manda `respostas` respostas para o controle, uma a cada 1/taxa segundos, com a latência de `latencia(taxa)`."""
+    gerador = random.Random(semente)
+    controle = ControleAdaptativo(20, taxa_maxima=50, concorrencia_maxima=16)
+    for _ in range(respostas):
+        relogio[0] += 1 / controle.taxa_por_segundo
+        controle._em_andamento += 1
+        controle.liberar(latencia(gerador, controle.taxa_por_segundo))
+    return controle
+
+
+@pytest.mark.parametrize("mediana", [0.150, 0.003])
+@pytest.mark.parametrize("sigma", [0.5, 1.0])
+def test_variacao_normal_de_latencia_nao_reduz(relogio, mediana, sigma):
+    controle = simular(relogio, lambda g, taxa: g.lognormvariate(math.log(mediana), sigma))
+    assert controle.taxa_por_segundo == 50
+    assert controle.reducoes <= 1
+
+
+def test_congestionamento_segura_a_taxa_perto_da_capacidade(relogio):
+    # Acima de 25 req/s a API enfileira: a latência cresce com o excesso
+    def latencia(gerador, taxa):
+        return gerador.lognormvariate(math.log(0.15 * (1 + max(0, taxa - 25) / 25 * 6)), 0.3)
+
+    controle = simular(relogio, latencia)
+    assert controle.reducoes >= 5
+    assert controle.taxa_por_segundo < 40
+
+
+def test_latencia_congestionada_exige_limiar_e_folga():
+    controle = ControleAdaptativo(10)
+    assert not controle.latencia_congestionada(0.008, 0.003) # 2,7x, mas só 5 ms a mais
+    assert not controle.latencia_congestionada(0.250, 0.150) # 100 ms a mais, mas menos de 2x
+    assert controle.latencia_congestionada(0.400, 0.150)
+
+
+def test_pico_isolado_nao_reduz(relogio):
+    controle = simular(relogio, lambda g, taxa: 2.0 if g.random() < 0.02 else 0.15)
+    assert controle.reducoes == 0
+
+
+def test_429_reduz_concorrencia_e_taxa(relogio):
+    relogio[0] = 100.0
+    controle = ControleAdaptativo(20, concorrencia_inicial=8)
+    controle.pausar(0)
+    assert controle.reducoes == 1
+    assert controle.taxa_por_segundo == 10
+    assert int(controle.concorrencia) == 4
+
+
+def test_concorrencia_limita_as_requisicoes_em_andamento():
+    controle = ControleAdaptativo(1000, concorrencia_inicial=2)
+    controle.adquirir()
+    controle.adquirir()
+    terceira = threading.Thread(target=controle.adquirir)
+    terceira.start()
+    terceira.join(0.2)
+    assert terceira.is_alive()  # Sem vaga: a terceira espera
+    controle.liberar(0.01)
+    terceira.join(1.0)
+    assert not terceira.is_alive()
+    assert controle.estado()["em_andamento"] == 2
+
+
+def test_aumento_aditivo_ate_os_tetos(relogio):
+    controle = ControleAdaptativo(10, taxa_maxima=12, concorrencia_inicial=2, concorrencia_maxima=3)
+    for _ in range(2):  # Uma janela (a concorrência atual) de respostas boas
+        controle._em_andamento += 1
+        controle.liberar(0.1)
+    assert (int(controle.concorrencia), controle.taxa_por_segundo, controle.aumentos) == (3, 11, 1)
+    for _ in range(30):
+        controle._em_andamento += 1
+        controle.liberar(0.1)
+    assert (int(controle.concorrencia), controle.taxa_por_segundo) == (3, 12)
+
+
+def test_falhas_nao_contam_como_latencia(relogio):
+    controle = ControleAdaptativo(10, concorrencia_inicial=2)
+    for _ in range(10):
+        controle._em_andamento += 1
+        controle.liberar(30.0, sucesso=False)
+    assert controle.estado()["latencia_media_ms"] is None
+    assert controle.aumentos == controle.reducoes == 0
+    assert controle.estado()["em_andamento"] == 0
+
+
+def test_rajada_de_429_reduz_uma_vez_por_intervalo(relogio):
+    relogio[0] = 100.0
+    controle = ControleAdaptativo(40, concorrencia_inicial=16, intervalo_reducao=2.0)
+    for _ in range(5):
+        controle.pausar(0)
+    assert controle.reducoes == 1
+    relogio[0] += 2.5
+    controle.pausar(0)
+    assert (controle.reducoes, controle.taxa_por_segundo, int(controle.concorrencia)) == (2, 10, 4)
+    # Nunca abaixo dos mínimos
+    for _ in range(10):
+        relogio[0] += 2.5
+        controle.pausar(0)
+    assert (controle.taxa_por_segundo, int(controle.concorrencia)) == (1.0, 1)
+
+
+def test_retentativa_de_rede_devolve_a_vaga(monkeypatch):
+    import extraction
+
+    controle = ControleAdaptativo(1000, concorrencia_inicial=1)
+    vagas_no_backoff = []
+    monkeypatch.setattr(extraction.time, "sleep", lambda segundos: vagas_no_backoff.append(controle._em_andamento))
+
+    def rede_fora(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("sem rede")
+
+    monkeypatch.setattr(extraction, "obter_detalhes_completos_filme_unificado", rede_fora)
+    detalhes = extraction.buscar_detalhes_com_retentativas(1, controle, max_retries=3)
+    assert detalhes["status"] == "Erro de Requisição"
+    assert vagas_no_backoff == [0, 0]  # O backoff espera sem segurar a vaga
+    assert controle.estado()["em_andamento"] == 0
@@ -0,0 +1,64 @@
+import sqlite3
+import polars as pl
+from extraction import RAW_SCHEMA, montar_registro_completo
+from load import gravar_quarentena, ler_fila_reprocessamento, tabela_quarentena
+from regras import COLUNA_DATA, COLUNA_MOTIVO, linhas_em_quarentena, linhas_validas, marcar_quarentena
+from transform import transform
+
+GENEROS = {28: "Ação"}
+
+
+def brutos(*filmes: tuple[int | None, str | None, str]) -> pl.LazyFrame:
+    """Dados brutos com um filme por (id, título, status da busca de detalhes)."""
+    registros = [
+        montar_registro_completo(
+            {"id": movie_id, "title": titulo, "genre_ids": [28], "release_date": "2020-01-01", "listas": ["popular"]},
+            {"status": status},
+        )
+        for movie_id, titulo, status in filmes
+    ]
+    return pl.DataFrame(registros, schema=RAW_SCHEMA).lazy()
+
+
+def test_cada_linha_vai_para_um_lado_so():
+    marcados = marcar_quarentena(brutos(
+        (1, "Bom", "Released"),
+        (None, "Sem ID", "Erro HTTP 404"),  # Falha em duas regras: fica com a primeira
+        (3, "Busca falhou", "Falha Max Tentativas RL"),
+        (4, "  ", "Released"),
+        (5, "Também bom", "Released"),
+    ))
+    validas = linhas_validas(marcados).collect()
+    quarentena = linhas_em_quarentena(marcados, "2026-01-01T00:00:00").collect()
+
+    assert validas["id"].to_list() == [1, 5]
+    assert COLUNA_MOTIVO not in validas.columns
+    assert quarentena.select("title", COLUNA_MOTIVO).rows() == [
+        ("Sem ID", "ID_INVALIDO"),
+        ("Busca falhou", "FALHA_BUSCA"),
+        ("  ", "SEM_TITULO"),
+    ]
+    assert quarentena[COLUNA_DATA].unique().to_list() == ["2026-01-01T00:00:00"]
+
+
+def test_transform_nao_deixa_passar_linhas_em_quarentena():
+    tratados = transform(brutos((1, "Bom", "Released"), (2, "Falhou", "Erro de Requisição")), GENEROS).collect()
+    assert tratados["Id"].to_list() == [1]
+
+
+def test_quarentena_no_banco_e_fila_de_reprocessamento(tmp_path):
+    db_path = str(tmp_path / "movies.db")
+    marcados = marcar_quarentena(brutos((2, "Falhou", "Erro HTTP 500"), (3, "  ", "Released")))
+    gravar_quarentena(db_path, "movies", linhas_em_quarentena(marcados, "2026-01-01T00:00:00").collect(), [])
+
+    # Só as falhas de busca voltam para a extração, com as listas de volta como listas
+    fila = ler_fila_reprocessamento(db_path, "movies")
+    assert [(filme["id"], filme["genre_ids"], filme["listas"]) for filme in fila] == [(2, [28], ["popular"])]
+
+    # Na execução seguinte o filme 2 foi carregado limpo e o 3 falhou de novo: a tabela fica com a última ocorrência
+    marcados = marcar_quarentena(brutos((3, "", "Released")))
+    gravar_quarentena(db_path, "movies", linhas_em_quarentena(marcados, "2026-01-02T00:00:00").collect(), [2])
+    assert ler_fila_reprocessamento(db_path, "movies") == []
+    with sqlite3.connect(db_path) as conn:
+        linhas = conn.execute(f"SELECT id, {COLUNA_DATA} FROM {tabela_quarentena('movies')}").fetchall()
+    assert linhas == [(3, "2026-01-02T00:00:00")]
@@ -0,0 +1,70 @@
+import datetime
+import json
+import pytest
+import requests
+import utils
+from utils import GENEROS_CACHE_VERSAO, obter_mapeamento_generos
+
+
+def gravar(caminho, generos: dict, obtido_em: str | None = None) -> None:
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    conteudo = {"versao": GENEROS_CACHE_VERSAO, "idioma": "pt-BR", "obtido_em": obtido_em, "generos": generos}
+    caminho.write_text(json.dumps(conteudo), encoding="utf-8")
+
+
+@pytest.fixture
+def pastas(tmp_path, monkeypatch):
+    """Semente com {28: Ação}, cache local vazio e uma API falsa que conta as chamadas."""
+    semente, local = tmp_path / "cache_generos", tmp_path / "cache_generos_local"
+    gravar(semente / "generos_pt-BR.json", {"28": "Ação"})
+    chamadas = []
+
+    def api(api_key, language):
+        chamadas.append(api_key)
+        return {28: "Ação", 18: "Drama"}
+
+    monkeypatch.setattr(utils, "mapeamento_genero", api)
+    monkeypatch.setenv("TMDB_API_KEY", "chave-secreta")
+    return {"diretorio": str(local), "diretorio_semente": str(semente)}, semente, local, chamadas
+
+
+def test_semente_vale_sem_ir_na_api(pastas):
+    opcoes, _, local, chamadas = pastas
+    assert obter_mapeamento_generos(**opcoes) == {28: "Ação"}
+    assert chamadas == []
+    assert not local.exists()
+
+
+def test_atualizacao_vai_para_o_cache_local_e_nao_mexe_na_semente(pastas):
+    opcoes, semente, local, chamadas = pastas
+    semente_antes = (semente / "generos_pt-BR.json").read_text(encoding="utf-8")
+    assert obter_mapeamento_generos(forcar_atualizacao=True, **opcoes) == {28: "Ação", 18: "Drama"}
+    assert (semente / "generos_pt-BR.json").read_text(encoding="utf-8") == semente_antes
+    assert json.loads((local / "generos_pt-BR.json").read_text(encoding="utf-8"))["obtido_em"]
+    # Daqui em diante vale o cache local, dentro da validade
+    assert obter_mapeamento_generos(**opcoes) == {28: "Ação", 18: "Drama"}
+    assert len(chamadas) == 1
+
+
+def test_cache_local_vencido_vai_na_api(pastas):
+    opcoes, _, local, chamadas = pastas
+    vencido = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=40)).isoformat()
+    gravar(local / "generos_pt-BR.json", {"28": "Ação"}, vencido)
+    assert obter_mapeamento_generos(ttl_dias=30, **opcoes) == {28: "Ação", 18: "Drama"}
+    assert len(chamadas) == 1
+
+
+def test_falha_na_api_usa_a_semente_sem_mostrar_a_chave(pastas, monkeypatch, capsys):
+    opcoes, _, local, _ = pastas
+
+    def api_fora(api_key, language):
+        resposta = requests.Response()
+        resposta.status_code = 401
+        raise requests.HTTPError(f"401 Client Error for url: https://api/genre?api_key={api_key}", response=resposta)
+
+    monkeypatch.setattr(utils, "mapeamento_genero", api_fora)
+    assert obter_mapeamento_generos(forcar_atualizacao=True, **opcoes) == {28: "Ação"}
+    saida = capsys.readouterr().out
+    assert "HTTPError 401" in saida
+    assert "chave-secreta" not in saida
+    assert not local.exists()
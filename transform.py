@@ -1,26 +1,130 @@
 import polars as pl
-import os
-from dotenv import load_dotenv
-from data_quality import * 
-from utils import mapeamento_genero 
+from data_quality import (
+    expressoes_avaliacoes,
+    expressoes_datas,
+    expressoes_diretores,
+    expressoes_duracao_em_minutos,
+    expressoes_empresas_produtoras,
+    expressoes_financas,
+    expressoes_generos,
+    expressoes_linguagem_e_titulo_originais,
+    expressoes_overview,
+    expressoes_popularidade,
+    expressoes_status_do_filme,
+    expressoes_titulos,
+    texto_ou_padrao,
+)
+from regras import COLUNA_MOTIVO, linhas_validas, marcar_quarentena
+from utils import coluna_idioma, obter_mapeamento_generos
+
+
+# Colunas de saída, na ordem final, com o nome que vão ter depois da transformação
+COLUNAS_SAIDA = {
+    'id': 'Id',
+    'title': 'Titulo',
+    'original_title': 'Titulo_Original',
+    'director': 'Diretores',
+    'genero': 'Generos',
+    'release_date': 'Data_Lancamento',
+    'popularity': 'Popularidade',
+    'vote_average': 'Media_Votos',
+    'vote_count': 'Numero_Votos',
+    'overview': 'Sinopse',
+    'production_companies': 'Produtoras',
+    'budget': 'Orcamento',
+    'revenue': 'Receita',
+    'runtime': 'Duração',
+    'original_language': 'Idioma_Original',
+    'status': 'Status',
+    'poster_path': 'poster_path',
+    'backdrop_path': 'backdrop_path',
+    'listas': 'Listas',
+    'details_fetched_at': 'Atualizado_Em',
+}
+
+TIPO_TRADUCOES = pl.List(pl.Struct({"idioma": pl.String, "title": pl.String, "overview": pl.String}))
 
-load_dotenv()
 
-TMDB_API_KEY = os.getenv("TMDB_API_KEY") #type: ignore
-if TMDB_API_KEY is None:
-    raise ValueError(
-        "A variável de ambiente 'TMDB_API_KEY' não está definida. Por favor, configure-a no seu arquivo .env."
+def montar_plano(colunas_brutas: list[str], genero_mapa: dict, idiomas: list[str] | None = None) -> dict[str, pl.Expr]:
+    """
+    Monta o plano de transformação: uma expressão por coluna de saída, vinda das
+    funções expressoes_* de data_quality. Nada é executado aqui.
+
+    Args:
+        colunas_brutas (list[str]): Colunas disponíveis nos dados brutos (para tratar dados antigos).
+        genero_mapa (dict): Mapeamento {ID: Nome do Gênero}.
+        idiomas (list[str] | None): Idiomas extras com título e sinopse traduzidos.
+
+    Returns:
+        dict[str, pl.Expr]: {nome final da coluna: expressão}, na ordem final.
+    """
+    expressoes = {
+        "id": pl.col("id").cast(pl.Int64, strict=False),
+        "poster_path": pl.col("poster_path"),
+        "backdrop_path": pl.col("backdrop_path"),
+    }
+    for contribuicao in (
+        expressoes_titulos(),
+        expressoes_generos(genero_mapa),
+        expressoes_datas(),
+        expressoes_popularidade(),
+        expressoes_avaliacoes(),
+        expressoes_duracao_em_minutos(),
+        expressoes_status_do_filme(),
+        expressoes_overview(),
+        expressoes_financas(),
+        expressoes_linguagem_e_titulo_originais(),
+        expressoes_diretores(),
+        expressoes_empresas_produtoras(),
+    ):
+        expressoes.update(contribuicao)
+
+    # Dados brutos antigos não têm a data de atualização dos detalhes, nem as listas de origem
+    expressoes["details_fetched_at"] = (
+        pl.col("details_fetched_at").cast(pl.String)
+        if "details_fetched_at" in colunas_brutas
+        else pl.lit(None, dtype=pl.String)
     )
-TMDB_API_KEY: str
+    expressoes["listas"] = (
+        pl.col("listas") if "listas" in colunas_brutas else pl.lit([], dtype=pl.List(pl.String))
+    )
+
+    plano = {COLUNAS_SAIDA[coluna]: expressoes[coluna] for coluna in COLUNAS_SAIDA}
+
+    # Títulos e sinopses traduzidos: uma coluna por idioma e campo
+    traducoes = pl.col("traducoes") if "traducoes" in colunas_brutas else pl.lit([], dtype=TIPO_TRADUCOES)
+    for idioma in idiomas or []:
+        traducao = traducoes.list.eval(pl.element().filter(pl.element().struct.field("idioma") == idioma)).list.first()
+        plano[coluna_idioma("Titulo", idioma)] = texto_ou_padrao(traducao.struct.field("title"), None)
+        plano[coluna_idioma("Sinopse", idioma)] = texto_ou_padrao(traducao.struct.field("overview"), None)
+
+    return plano
 
 
 # --- Função de Transformação Principal ---
-def transform(lf: pl.LazyFrame) -> pl.LazyFrame:
+def transform(
+    lf: pl.LazyFrame,
+    genero_mapa: dict | None = None,
+    idiomas: list[str] | None = None,
+    regras: dict[str, tuple[str, pl.Expr]] | None = None,
+) -> pl.LazyFrame:
     """
     Realiza o pipeline de transformação dos dados do TMDB.
 
+    Primeiro as regras rígidas (veja regras.py) tiram as linhas que não podem seguir
+    (ID inválido, busca de detalhes que falhou, filme sem título); depois todos os
+    tratamentos viram uma única projeção (um select com o nome final de cada coluna),
+    em vez de um with_columns por etapa. Use explicar_plano para ver o plano otimizado
+    e o tempo de cada nó.
+
     Args:
         lf (pl.LazyFrame): O LazyFrame de entrada.
+        genero_mapa (dict | None): Mapeamento {ID: Nome do Gênero}. Se não for passado,
+            vem do cache local de gêneros (pt-BR), sem precisar da API.
+        idiomas (list[str] | None): Idiomas extras (ex: ["en-US"]). Para cada um, a coluna
+            'traducoes' vira as colunas Titulo_<idioma> e Sinopse_<idioma> (ex: Titulo_en_US).
+        regras (dict | None): Regras rígidas (padrão: regras.regras_padrao()). Se `lf` já vem
+            de regras.marcar_quarentena, as marcas dele são usadas e `regras` é ignorado.
 
     Returns:
         pl.LazyFrame: O LazyFrame transformado.
@@ -28,93 +132,40 @@ def transform(lf: pl.LazyFrame) -> pl.LazyFrame:
 
     print("\n--- Iniciando Transformações ---")
 
-    # 1. Tratamento da coluna 'id'
-    # Garante que 'id' é um número inteiro e remove linhas onde não é possível converter
-    lf = lf.filter(pl.col("id").cast(pl.Int64, strict=False).is_not_null())
-    print(" - IDs tratados (garantindo que são números inteiros).")
-
-    # 2. Tratamento da coluna 'title'
-    lf = tratar_titulos(lf)
-    print(" - Títulos limpos e padronizados.")
-
-    # 3. Tratamento da coluna 'genre_ids' para 'genero'
-    # Obtém o mapeamento de gêneros
-    genero_mapa = mapeamento_genero(TMDB_API_KEY)
+    if genero_mapa is None:
+        genero_mapa = obter_mapeamento_generos()
     print(f" - Mapeamento de gêneros obtido (primeiros 5: {list(genero_mapa.items())[:5]}).")
 
-    # Aplica o tratamento de gênero, passando o LazyFrame já com títulos tratados
-    lf = tratar_generos(lf, genero_mapa)
-
-    # 4. Tratamento da coluna 'release_date'
-    lf = tratar_datas(lf)
-
-    # 5. Tratamento de dados de 'popularity', 'vote_average' e 'vote_count'
-    lf = tratar_popularidade(lf)
-    lf = tratar_avaliacoes(lf)
-
-    # 6. Aplica as funções tratar_duracao_em_minutos e tratar_status_do_filme
-    lf = tratar_duracao_em_minutos(lf)
-    lf = tratar_status_do_filme(lf)
-
-    # 7. Aplica as funções tratar_overview
-    lf = tratar_overview(lf)
-
-    # 8. Tratamento de dados financeiros
-    lf = tratar_financas(lf)
-
-    # 9. Tratamento de linguagem e títulos originais
-    lf = tratar_linguagem_e_titulo_originais(lf)
-
-    # 10. Tratar diretores
-    lf = tratar_diretores(lf)
-
-    # 11. Tratamento de 'production_companies'
-    lf = tratar_empresas_produtoras(lf)
-
-    # 12. Reorganizar colunas
-    nova_ordem_colunas = [
-        'id',
-        'title',
-        'original_title',
-        'director',
-        'genero',
-        'release_date',
-        'popularity',
-        'vote_average',
-        'vote_count',
-        'overview',
-        'production_companies',
-        'budget',
-        'revenue',
-        'runtime',
-        'original_language',
-        'status',
-        'poster_path',
-        'backdrop_path'
-        ]
-    lf_reogarnizado = lf.select(nova_ordem_colunas)
-
-    # 13. Renomear colunas
-    mapa_renomear = {
-    'id': 'Id',
-    'title': 'Titulo',
-    'original_title': 'Titulo_Original',
-    'release_date': 'Data_Lancamento',
-    'popularity': 'Popularidade',
-    'vote_average': 'Media_Votos',
-    'vote_count': 'Numero_Votos',
-    'overview': 'Sinopse',
-    'budget': 'Orcamento',
-    'revenue': 'Receita',
-    'runtime': 'Duração',
-    'original_language': 'Idioma_Original',
-    'production_companies': 'Produtoras', 
-    'status': 'Status',
-    'director': 'Diretores',           
-    'poster_path': 'poster_path',
-    'backdrop_path': 'backdrop_path',
-    'genero': 'Generos'
-    }
-    lf_final = lf_reogarnizado.rename(mapa_renomear)
+    colunas_brutas = lf.collect_schema().names()
+    if COLUNA_MOTIVO not in colunas_brutas:
+        lf = marcar_quarentena(lf, regras)
+    plano = montar_plano(colunas_brutas, genero_mapa, idiomas)
+    # Só as linhas que passaram nas regras seguem; as outras ficam para a quarentena
+    lf_final = linhas_validas(lf).select(**plano)
+    print(f" - Plano montado: {len(plano)} colunas numa única projeção.")
     print("--- Transformações Concluídas ---")
-    return lf_final
\ No newline at end of file
+    return lf_final
+
+
+def explicar_plano(lf: pl.LazyFrame, perfil: bool = True) -> pl.DataFrame | None:
+    """
+    Mostra o plano otimizado de um LazyFrame (LazyFrame.explain) e, com `perfil=True`,
+    executa o plano com LazyFrame.profile e mostra o tempo de cada nó.
+
+    Returns:
+        pl.DataFrame | None: Os tempos por nó (colunas node, start, end, duracao_ms), se `perfil=True`.
+    """
+    print("--- Plano otimizado ---")
+    print(lf.explain(optimized=True))
+
+    if not perfil:
+        return None
+
+    _, tempos = lf.profile()
+    tempos = tempos.with_columns(((pl.col("end") - pl.col("start")) / 1000).alias("duracao_ms")).sort(
+        "duracao_ms", descending=True
+    )
+    print("\n--- Tempo por nó (ms) ---")
+    with pl.Config(tbl_rows=-1, fmt_str_lengths=80):
+        print(tempos)
+    return tempos
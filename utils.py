@@ -1,35 +1,99 @@
-import polars as pl
-import tmdbsimple as tmdb
 import datetime
+import json
+import os
+from dotenv import load_dotenv
 
+# tmdbsimple e requests são importados dentro das funções que chamam a API,
+# para que só ler o cache de gêneros (na transformação) não precise deles.
 
-def obter_detalhes_completos_filme_unificado(movie_id):
+
+# Idioma e dados extras pedidos na chamada unificada de detalhes
+IDIOMA_DETALHES = "pt-BR"
+APPEND_DETALHES = "credits"
+# Pedido junto quando há idiomas extras: todas as traduções vêm na mesma chamada
+APPEND_TRADUCOES = "translations"
+
+
+def montar_append(idiomas: list[str] | tuple[str, ...] = ()) -> str:
+    """Monta o `append_to_response` da chamada de detalhes: com traduções só se houver idiomas extras."""
+    return f"{APPEND_DETALHES},{APPEND_TRADUCOES}" if idiomas else APPEND_DETALHES
+
+
+def coluna_idioma(prefixo: str, idioma: str) -> str:
+    """Nome da coluna localizada de um idioma (ex: coluna_idioma("Titulo", "en-US") -> "Titulo_en_US")."""
+    return f"{prefixo}_{idioma.replace('-', '_')}"
+
+
+def extrair_traducoes(details_with_credits: dict, idiomas: list[str] | tuple[str, ...]) -> list[dict]:
+    """
+    Extrai título e sinopse de cada idioma pedido (ex: "en-US") do bloco `translations` da resposta.
+
+    Procura primeiro o idioma e país exatos e, se não houver, qualquer tradução do mesmo idioma.
+    Campos vazios (o TMDB devolve "" quando não há tradução) viram None.
+    """
+    traducoes = details_with_credits.get("translations", {}).get("translations", [])
+    resultado = []
+    for idioma in idiomas:
+        lingua, _, pais = idioma.partition("-")
+        candidatas = [t for t in traducoes if t.get("iso_639_1") == lingua]
+        exata = [t for t in candidatas if t.get("iso_3166_1") == pais]
+        dados = (exata or candidatas or [{}])[0].get("data", {})
+        resultado.append({
+            "idioma": idioma,
+            "title": dados.get("title") or None,
+            "overview": dados.get("overview") or None,
+        })
+    return resultado
+
+
+def extrair_detalhes_filme(details_with_credits: dict, idiomas: list[str] | tuple[str, ...] = ()) -> dict:
+    """
+    Extrai os campos usados pela pipeline da resposta de detalhes (com créditos) do TMDB.
+    Com `idiomas`, inclui também os títulos e sinopses traduzidos (veja extrair_traducoes).
+    """
+    production_companies = [
+        company["name"] for company in details_with_credits.get("production_companies", [])
+    ]
+
+    diretores = [
+        crew["name"] for crew in details_with_credits.get("credits", {}).get("crew", []) if crew["job"] == "Director"
+    ]
+    diretores_final = diretores if diretores else ["Não Disponível"]
+
+    return {
+        "budget": details_with_credits.get("budget", 0),
+        "revenue": details_with_credits.get("revenue", 0),
+        "runtime": details_with_credits.get("runtime", 0),
+        "status": details_with_credits.get("status", "Desconhecido"),
+        "production_companies": production_companies,
+        "director": diretores_final,
+        "traducoes": extrair_traducoes(details_with_credits, idiomas),
+    }
+
+
+def obter_detalhes_completos_filme_unificado(movie_id, cache=None, language=IDIOMA_DETALHES, idiomas=()):
     """
     Busca detalhes do filme e informações de diretor em uma única chamada API.
     Certifique-se de que tmdb.API_KEY está configurado antes de chamar esta função.
+    Erros de requisição (HTTP/rede) são repassados para quem chamou decidir se tenta de novo.
+    Se `cache` (um cache.DetailCache) for passado, a resposta da API é guardada nele.
+    Com `idiomas` extras, as traduções vêm na mesma chamada (append_to_response=translations).
     """
+    import requests
+    import tmdbsimple as tmdb
+
+    append = montar_append(idiomas)
     try:
         movie_obj = tmdb.Movies(movie_id)
 
-        details_with_credits = movie_obj.info(language="pt-BR", append_to_response="credits")
+        details_with_credits = movie_obj.info(language=language, append_to_response=append)
 
-        production_companies = [
-            company["name"] for company in details_with_credits.get("production_companies", [])
-        ]
+        if cache is not None:
+            cache.salvar(movie_id, language, append, details_with_credits)
 
-        diretores = [
-            crew["name"] for crew in details_with_credits.get("credits", {}).get("crew", []) if crew["job"] == "Director"
-        ]
-        diretores_final = diretores if diretores else ["Não Disponível"]
-
-        return {
-            "budget": details_with_credits.get("budget", 0),
-            "revenue": details_with_credits.get("revenue", 0),
-            "runtime": details_with_credits.get("runtime", 0),
-            "status": details_with_credits.get("status", "Desconhecido"),
-            "production_companies": production_companies,
-            "director": diretores_final,
-        }
+        return extrair_detalhes_filme(details_with_credits, idiomas)
+    except requests.exceptions.RequestException:
+        raise # Quem chama cuida do 429/Retry-After e do backoff
     except Exception as e:
         print(f"Erro ao obter detalhes completos unificados para o filme {movie_id}: {e}")
         return {
@@ -39,15 +103,107 @@ def obter_detalhes_completos_filme_unificado(movie_id):
             "status": "Erro",
             "production_companies": [],
             "director": ["Não disponível"], # Manter a estrutura
+            "traducoes": [],
         }
 
 # Requisição para obter o mapeamento de IDS de gêneros para nomes
-def mapeamento_genero(api_key: str):
+def mapeamento_genero(api_key: str, language: str = "pt-BR"):
+    import tmdbsimple as tmdb
+
     tmdb.API_KEY = api_key
     genre = tmdb.Genres()
-    response = genre.movie_list()
+    response = genre.movie_list(language=language)
 
     id_nome = {g["id"]: g["name"] for g in response["genres"]}
 
     return id_nome
 
+
+# Mapeamento de gêneros (um arquivo JSON por idioma): a semente versionada em cache_generos,
+# só de leitura e sem validade, e o cache local (fora do git) com as atualizações da API
+GENEROS_SEMENTE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_generos")
+GENEROS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_generos_local")
+GENEROS_CACHE_VERSAO = 1
+
+
+def _ler_generos(caminho: str) -> dict | None:
+    """O conteúdo de um arquivo de gêneros, ou None se ele não existe ou é de outra versão."""
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as arquivo:
+        conteudo = json.load(arquivo)
+    return conteudo if conteudo.get("versao") == GENEROS_CACHE_VERSAO else None
+
+
+def obter_mapeamento_generos(
+    language: str = "pt-BR",
+    ttl_dias: float = 30,
+    forcar_atualizacao: bool = False,
+    diretorio: str = GENEROS_CACHE_DIR,
+    diretorio_semente: str = GENEROS_SEMENTE_DIR,
+) -> dict[int, str]:
+    """
+    Devolve o mapeamento {ID: Nome do Gênero} a partir do cache local, indo na API
+    só quando o cache venceu (`ttl_dias`) ou `forcar_atualizacao=True`. Sem cache local,
+    vale a semente versionada (que não vence); as atualizações da API vão só para o cache local.
+
+    Sem TMDB_API_KEY (ou sem rede), o cache vencido (ou a semente) ainda é usado, com aviso,
+    para que a transformação rode offline.
+
+    Args:
+        language (str): Idioma dos nomes dos gêneros.
+        ttl_dias (float): Validade do cache local, em dias.
+        forcar_atualizacao (bool): Busca na API mesmo com o cache válido.
+        diretorio (str): Pasta do cache local (gravada a cada atualização).
+        diretorio_semente (str): Pasta da semente versionada (só lida).
+
+    Returns:
+        dict[int, str]: O mapeamento de IDs para nomes.
+    """
+    arquivo_idioma = f"generos_{language}.json"
+    caminho = os.path.join(diretorio, arquivo_idioma)
+    em_cache = _ler_generos(caminho)
+    semente = _ler_generos(os.path.join(diretorio_semente, arquivo_idioma))
+
+    if not forcar_atualizacao:
+        if em_cache is not None:
+            obtido_em = datetime.datetime.fromisoformat(em_cache["obtido_em"])
+            if datetime.datetime.now(datetime.timezone.utc) - obtido_em < datetime.timedelta(days=ttl_dias):
+                return {int(genero_id): nome for genero_id, nome in em_cache["generos"].items()}
+        elif semente is not None:
+            return {int(genero_id): nome for genero_id, nome in semente["generos"].items()}
+
+    load_dotenv()
+    api_key = os.getenv("TMDB_API_KEY")
+    try:
+        if not api_key:
+            raise ValueError(
+                "A variável de ambiente 'TMDB_API_KEY' não está definida. Por favor, configure-a no seu arquivo .env."
+            )
+        generos = mapeamento_genero(api_key, language)
+    except Exception as e:
+        reserva = em_cache or semente
+        if reserva is None:
+            raise
+        # Só o tipo do erro (e o status HTTP): a mensagem do requests traz a URL, com a api_key
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        motivo = f"{type(e).__name__} {status}" if status else type(e).__name__
+        origem = caminho if em_cache else os.path.join(diretorio_semente, arquivo_idioma)
+        print(f"Aviso: não deu para atualizar os gêneros ({motivo}). Usando o arquivo local {origem}.")
+        return {int(genero_id): nome for genero_id, nome in reserva["generos"].items()}
+
+    os.makedirs(diretorio, exist_ok=True)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(
+            {
+                "versao": GENEROS_CACHE_VERSAO,
+                "idioma": language,
+                "obtido_em": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "generos": {str(genero_id): nome for genero_id, nome in generos.items()},
+            },
+            arquivo,
+            ensure_ascii=False,
+            indent=2,
+        )
+    os.replace(caminho + ".tmp", caminho)
+    return generos